@@ -0,0 +1,48 @@
+"""Cost of allocation tracing: creating and releasing handles with tracing off, and on at several sampling rates."""
+
+import argparse
+import time
+from typing import Any
+
+from cffi import FFI
+
+from refcount import alloctrace
+from refcount.interop import DeletableCffiNativeHandle
+
+ffi = FFI()
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def cycles_per_second(pointer: Any, n: int, repeat: int) -> float:
+    """Best throughput of handle creation followed by release, over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            DeletableCffiNativeHandle(pointer, no_release, "SERIES_PTR").release()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=200_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pointer = ffi.new("char[1]")
+    print(f"{'tracing':<16}{'create+release/s':>18}")
+    for rate in [None, 0.001, 0.01, 0.1, 1.0]:
+        if rate is not None:
+            alloctrace.start(sample_rate=rate)
+        label = "off" if rate is None else f"sample {rate:g}"
+        print(f"{label:<16}{cycles_per_second(pointer, args.num_handles, args.repeat):>18,.0f}")
+        alloctrace.stop()
+
+
+if __name__ == "__main__":
+    main()
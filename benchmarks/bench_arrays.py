@@ -0,0 +1,91 @@
+"""Getting native `double*` arrays and `double**` matrices into Python: element-wise copies versus refcount.arrays handles.
+
+Reports the time and the peak of Python heap allocations. The native arrays are allocated by cffi, standing for
+buffers returned by a C API.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import numpy as np
+from cffi import FFI
+
+from refcount.arrays import NativeArrayHandle, RowPointerMatrixHandle, StridedArrayHandle
+
+ffi = FFI()
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def measure(get: Callable[[], Any]) -> Tuple[float, int]:
+    """Best time over a few runs, and the peak of Python heap allocations of one run."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = get()
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = get()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-values", type=int, default=5_000_000)
+    parser.add_argument("-m", "--members", type=int, default=100, help="number of rows of the matrices")
+    args = parser.parse_args()
+
+    n = args.num_values
+    memory = ffi.new(f"double[{n}]")
+    pointer = ffi.cast("double*", memory)
+    handle = NativeArrayHandle(pointer, n, no_release)
+    cases = {
+        "list, element-wise": lambda: [pointer[i] for i in range(n)],
+        "numpy from ffi.unpack": lambda: np.array(ffi.unpack(pointer, n)),
+        "numpy copy of buffer": lambda: np.frombuffer(ffi.buffer(pointer, n * 8)).copy(),
+        "NativeArrayHandle view": handle.as_array,
+    }
+    print(f"{n:,} values, {n * 8 / 1e6:,.0f} MB native")
+    print(f"{'method':<26}{'ms':>10}{'peak MB':>10}")
+    for name, get in cases.items():
+        seconds, peak = measure(get)
+        print(f"{name:<26}{seconds * 1e3:>10,.2f}{peak / 1e6:>10,.1f}")
+    handle.release()
+
+    # an ensemble of members x time steps, as a contiguous block and as row pointers
+    m = args.members
+    t = n // m
+    rows = ffi.new(f"double*[{m}]")
+    for i in range(m):
+        rows[i] = pointer + i * t
+    matrix = RowPointerMatrixHandle(ffi.cast("double**", rows), m, t, no_release)
+    block = StridedArrayHandle(pointer, (m, t), (t * 8, 8), no_release)
+    cases = {
+        "nested lists, element-wise": lambda: [[rows[i][j] for j in range(t)] for i in range(m)],
+        "rows via ffi.unpack": lambda: np.array([ffi.unpack(rows[i], t) for i in range(m)]),
+        "row pointers to_array": matrix.to_array,
+        "row pointers, row views": lambda: list(matrix.rows()),
+        "strided block view": block.as_array,
+    }
+    print(f"{m} x {t:,} matrix")
+    print(f"{'method':<26}{'ms':>10}{'peak MB':>10}")
+    for name, get in cases.items():
+        seconds, peak = measure(get)
+        print(f"{name:<26}{seconds * 1e3:>10,.2f}{peak / 1e6:>10,.1f}")
+    matrix.release()
+    block.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Cost of passing a handle to a native function in a tight loop: defensive add_ref/release, `ptr` property, borrowed view."""
+
+import argparse
+import time
+from typing import Any, Callable
+
+from benchmarks.native import ut_dll
+from refcount.interop import enable_borrow_debug, wrap_cffi_native_handle
+
+
+def calls_per_second(loop: Callable[[Any, int], None], handle: Any, n: int) -> float:
+    """Best throughput over a few runs."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        loop(handle, n)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def defensive(handle: Any, n: int) -> None:
+    """Reference count incremented and decremented around each call, as defensive helpers do."""
+    get_dog_refcount = ut_dll.get_dog_refcount
+    for _ in range(n):
+        handle.add_ref()
+        try:
+            get_dog_refcount(handle.ptr)
+        finally:
+            handle.release()
+
+
+def property_access(handle: Any, n: int) -> None:
+    """The `ptr` property read on each call."""
+    get_dog_refcount = ut_dll.get_dog_refcount
+    for _ in range(n):
+        get_dog_refcount(handle.ptr)
+
+
+def borrowed(handle: Any, n: int) -> None:
+    """The `ptr` attribute of a borrowed view read on each call."""
+    get_dog_refcount = ut_dll.get_dog_refcount
+    with handle.borrow() as view:
+        for _ in range(n):
+            get_dog_refcount(view.ptr)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    handle = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    print(f"{'access':<28}{'calls/s':>14}")
+    for name, loop in [("add_ref/release", defensive), ("ptr property", property_access), ("borrowed view", borrowed)]:
+        print(f"{name:<28}{calls_per_second(loop, handle, args.num_calls):>14,.0f}")
+    enable_borrow_debug()
+    print(f"{'borrowed view, debug':<28}{calls_per_second(borrowed, handle, args.num_calls):>14,.0f}")
+    handle.release()
+
+
+if __name__ == "__main__":
+    main()
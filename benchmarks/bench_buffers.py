@@ -0,0 +1,86 @@
+"""Native calls with an out-parameter: a fresh `ffi.new` per call versus buffers from a `refcount.buffers` pool.
+
+Reports calls per second for a `date_time_interop` struct filled by the native library, and for `double` arrays of a
+few sizes, which stand for values written by a C API.
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from benchmarks.native import ut_dll, ut_ffi
+from refcount.buffers import BufferPool
+
+
+def best_rate(f: Callable[[int], None], n: int, repeat: int = 5) -> float:
+    """Best number of operations per second over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(n)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-calls", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.num_calls
+    pool = BufferPool(ut_ffi)
+    create_date = ut_dll.create_date
+    new = ut_ffi.new
+
+    def date_new(n: int) -> None:
+        for _ in range(n):
+            create_date(new("date_time_interop*"), 2024, 1, 2, 3, 4, 5)
+
+    def date_pool(n: int) -> None:
+        acquire = pool.acquire
+        for _ in range(n):
+            with acquire("date_time_interop*") as date:
+                create_date(date.ptr, 2024, 1, 2, 3, 4, 5)
+
+    def date_pool_no_zero(n: int) -> None:
+        acquire = pool.acquire
+        for _ in range(n):
+            with acquire("date_time_interop*", zero=False) as date:
+                create_date(date.ptr, 2024, 1, 2, 3, 4, 5)
+
+    print(f"{'case':<40}{'calls/s':>14}{'speedup':>10}")
+    reference = best_rate(date_new, n)
+    print(f"{'date_time_interop*, ffi.new':<40}{reference:>14,.0f}{1:>10.2f}")
+    for name, f in (
+        ("date_time_interop*, pool", date_pool),
+        ("date_time_interop*, pool, no zeroing", date_pool_no_zero),
+    ):
+        rate = best_rate(f, n)
+        print(f"{name:<40}{rate:>14,.0f}{rate / reference:>10.2f}")
+
+    for length in (16, 1024, 65536):
+        m = max(1000, n * 16 // length)
+
+        def array_new(m: int, length: int = length) -> None:
+            for _ in range(m):
+                values = new("double[]", length)
+                values[length - 1] = 1.0
+
+        def array_pool(m: int, length: int = length, zero: bool = True) -> None:
+            acquire = pool.acquire
+            for _ in range(m):
+                with acquire("double[]", length, zero) as values:
+                    values.ptr[length - 1] = 1.0
+
+        reference = best_rate(array_new, m)
+        print(f"{f'double[{length}], ffi.new':<40}{reference:>14,.0f}{1:>10.2f}")
+        rate = best_rate(array_pool, m)
+        print(f"{f'double[{length}], pool':<40}{rate:>14,.0f}{rate / reference:>10.2f}")
+        rate = best_rate(lambda m, length=length: array_pool(m, length, False), m)
+        print(f"{f'double[{length}], pool, no zeroing':<40}{rate:>14,.0f}{rate / reference:>10.2f}")
+    stats = pool.statistics()
+    print(f"pool hit rate {stats.hit_rate:.4f}, {stats.pooled_bytes:,} bytes idle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Wrapping arrays of native pointers: a loop over `create_wrapper` versus `create_wrappers`.
+
+The lazy variant is timed at creation, and after accessing every element.
+"""
+
+import argparse
+import time
+from typing import Any, Callable
+
+from cffi import FFI
+
+from refcount.interop import CffiWrapperFactory, DeletableCffiNativeHandle
+
+ffi = FFI()
+TYPE_ID = "SERIES_PTR"
+
+
+class Series(DeletableCffiNativeHandle):
+    """A wrapper class as found in generated bindings, with the four arguments constructor."""
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """Best time over a few runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-exponent", type=int, default=6)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    factory = CffiWrapperFactory({TYPE_ID: Series}, strict_wrapping=True)
+    target = ffi.new("char[1]")
+
+    def loop(pointers: Any, n: int) -> list:
+        return [factory.create_wrapper(pointers[i], TYPE_ID, no_release) for i in range(n)]
+
+    def lazy_all(pointers: Any, n: int) -> list:
+        return factory.create_wrappers(pointers, n, TYPE_ID, no_release, lazy=True).materialize()
+
+    cases = {
+        "create_wrapper loop": loop,
+        "create_wrappers": lambda p, n: factory.create_wrappers(p, n, TYPE_ID, no_release),
+        "lazy, creation": lambda p, n: factory.create_wrappers(p, n, TYPE_ID, no_release, lazy=True),
+        "lazy, all accessed": lazy_all,
+    }
+    print(f"{'elements':>10}" + "".join(f"{name:>22}" for name in cases) + "   (ms)")
+    for exponent in range(3, args.max_exponent + 1):
+        n = 10**exponent
+        pointers = ffi.new("void*[]", [target] * n)
+        row = [best_time(lambda c=case, p=pointers, k=n: c(p, k), args.repeat) for case in cases.values()]
+        print(f"{n:>10}" + "".join(f"{t * 1e3:>22.2f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
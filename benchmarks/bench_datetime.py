@@ -0,0 +1,88 @@
+"""Converting arrays of native `date_time_interop` structs to and from `datetime64[s]`: per struct Python loops versus `refcount.datetime_interop`.
+
+The struct arrays are allocated by cffi, standing for time axes returned by, or passed to, a C API. The loops are only
+timed on a subset of the values, and extrapolated.
+"""
+
+import argparse
+import datetime as dt
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from benchmarks.native import ut_ffi
+from refcount.datetime_interop import (
+    date_time_interop_dtype,
+    from_datetime64,
+    structured_view,
+    time_axis_to_structs,
+    to_datetime64,
+)
+
+
+def best_time(f: Callable[[], Any], repeat: int = 3) -> float:
+    """Best time over a few runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-values", type=int, default=10_000_000)
+    parser.add_argument("--loop-values", type=int, default=100_000, help="number of values converted by the loops")
+    args = parser.parse_args()
+
+    n = args.num_values
+    m = min(args.loop_values, n)
+    step = np.timedelta64(3600, "s")
+    values = np.datetime64("1990-01-01T00:00:00", "s") + np.arange(n, dtype=np.int64) * step
+    dates = ut_ffi.new(f"date_time_interop[{n}]")
+    view = structured_view(dates, n, date_time_interop_dtype())
+    from_datetime64(values, view)
+
+    def loop_to() -> None:
+        result = np.empty(m, dtype="datetime64[s]")
+        for i in range(m):
+            d = dates[i]
+            result[i] = dt.datetime(d.year, d.month, d.day, d.hour, d.minute, d.second)  # noqa: DTZ001
+
+    def loop_from() -> None:
+        for i, t in enumerate(values[:m].tolist()):
+            d = dates[i]
+            d.year, d.month, d.day, d.hour, d.minute, d.second = (
+                t.year,
+                t.month,
+                t.day,
+                t.hour,
+                t.minute,
+                t.second,
+            )
+
+    scale = n / m
+    cases = {
+        "to datetime64, loop": loop_to,
+        "to datetime64, vectorized": lambda: to_datetime64(view),
+        "to datetime64, regular": lambda: to_datetime64(view, regular=True),
+        "from datetime64, loop": loop_from,
+        "from datetime64, vectorized": lambda: from_datetime64(values, view),
+        "from time axis, regular": lambda: time_axis_to_structs(values[0], step, n, view),
+    }
+    print(f"{n:,} date_time_interop structs")
+    print(f"{'case':<32}{'seconds':>12}{'ns/value':>12}")
+    for name, f in cases.items():
+        t = best_time(f, 1 if "loop" in name else 3)
+        if "loop" in name:
+            t *= scale
+        print(f"{name:<32}{t:>12.3f}{t / n * 1e9:>12.1f}")
+    if not (to_datetime64(view) == values).all():
+        raise RuntimeError("The conversions do not round trip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Latency of `release()` on the calling thread, with synchronous and deferred native releases.
+
+The native release is made artificially slow, as is the case for native objects flushing buffers on release.
+"""
+
+import argparse
+import statistics
+import time
+from typing import List
+
+from benchmarks.native import ut_dll
+from refcount.deferred import disable_deferred_release, enable_deferred_release, flush
+from refcount.interop import DeletableCffiNativeHandle
+
+
+def release_latencies(n: int, release_cost: float) -> List[float]:
+    """Time taken by each `release()` call, in seconds."""
+
+    def slow_release(pointer: object) -> None:
+        end = time.perf_counter() + release_cost
+        while time.perf_counter() < end:
+            pass
+        ut_dll.release(pointer)
+
+    handles = [DeletableCffiNativeHandle(ut_dll.create_dog(), slow_release, "DOG_PTR") for _ in range(n)]
+    latencies = []
+    for h in handles:
+        start = time.perf_counter()
+        h.release()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=2000)
+    parser.add_argument("-c", "--release-cost-us", type=float, default=200.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'median (us)':>12}{'p99 (us)':>10}{'wall incl. drain (ms)':>24}")
+    for mode in ["synchronous", "deferred"]:
+        if mode == "deferred":
+            enable_deferred_release(max_queue_depth=args.num_handles)
+        start = time.perf_counter()
+        latencies = release_latencies(args.num_handles, args.release_cost_us * 1e-6)
+        flush()
+        wall = time.perf_counter() - start
+        disable_deferred_release()
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{mode:<12}{statistics.median(latencies) * 1e6:>12.1f}{p99 * 1e6:>10.1f}{wall * 1e3:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
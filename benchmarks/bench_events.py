@@ -0,0 +1,54 @@
+"""Cost of lifecycle event recording: creating, referencing and releasing handles with recording off and on."""
+
+import argparse
+import time
+from typing import Any
+
+from cffi import FFI
+
+from refcount import events
+from refcount.interop import DeletableCffiNativeHandle
+
+ffi = FFI()
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def cycles_per_second(pointer: Any, n: int, repeat: int) -> float:
+    """Best throughput of handle creation, add_ref and two releases, over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            h = DeletableCffiNativeHandle(pointer, no_release, "SERIES_PTR")
+            h.add_ref()
+            h.release()
+            h.release()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=200_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-c", "--capacity", type=int, default=65536)
+    args = parser.parse_args()
+
+    pointer = ffi.new("char[1]")
+    print(f"{'recording':<16}{'cycles/s':>18}{'events/s':>18}")
+    off = cycles_per_second(pointer, args.num_handles, args.repeat)
+    print(f"{'off':<16}{off:>18,.0f}{0:>18,.0f}")
+    events.start_recording(args.capacity)
+    try:
+        on = cycles_per_second(pointer, args.num_handles, args.repeat)
+    finally:
+        events.stop_recording()
+    print(f"{'on':<16}{on:>18,.0f}{5 * on:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
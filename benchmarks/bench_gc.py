@@ -0,0 +1,82 @@
+"""Garbage collection pauses on a workload of handles caught in reference cycles.
+
+Compares handles released from `__del__` (`DeletableCffiNativeHandle`) with handles
+released by a `weakref.finalize` (`FinalizerCffiNativeHandle`).
+"""
+
+import argparse
+import gc
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.native import ut_dll
+from refcount.interop import DeletableCffiNativeHandle, FinalizerCffiNativeHandle
+
+
+class DelNode(DeletableCffiNativeHandle):
+    """Handle released from `__del__`, with an instance dictionary to hold a peer."""
+
+
+class FinalizerNode(FinalizerCffiNativeHandle):
+    """Handle released by a finalizer, with an instance dictionary to hold a peer."""
+
+
+class PauseRecorder:
+    """Records the duration of every garbage collection, via `gc.callbacks`."""
+
+    def __init__(self) -> None:
+        self.pauses: List[float] = []
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: Dict) -> None:  # noqa: ARG002
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._start)
+
+
+def cyclic_workload(node_type: Callable, n_pairs: int, group: int) -> None:
+    """Allocate pairs of handles referring to each other, dropping them by groups."""
+    for _ in range(n_pairs // group):
+        pairs = []
+        for _ in range(group):
+            a = node_type(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+            b = node_type(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+            a.peer = b
+            b.peer = a
+            pairs.append(a)
+        del pairs, a, b
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-pairs", type=int, default=100_000)
+    parser.add_argument("-g", "--group", type=int, default=1000)
+    args = parser.parse_args()
+
+    init_dogs = ut_dll.num_dogs()
+    print(f"{'backend':<12}{'collections':>12}{'total (ms)':>12}{'max (ms)':>10}{'final (ms)':>12}{'wall (s)':>10}")
+    for name, node_type in {"__del__": DelNode, "finalize": FinalizerNode}.items():
+        gc.collect()
+        recorder = PauseRecorder()
+        gc.callbacks.append(recorder)
+        start = time.perf_counter()
+        try:
+            cyclic_workload(node_type, args.num_pairs, args.group)
+            final_start = time.perf_counter()
+            gc.collect()
+            final = time.perf_counter() - final_start
+        finally:
+            gc.callbacks.remove(recorder)
+        wall = time.perf_counter() - start
+        print(
+            f"{name:<12}{len(recorder.pauses):>12}{sum(recorder.pauses) * 1e3:>12.1f}"
+            f"{max(recorder.pauses) * 1e3:>10.2f}{final * 1e3:>12.2f}{wall:>10.2f}",
+        )
+        if ut_dll.num_dogs() != init_dogs:
+            print(f"  warning: {ut_dll.num_dogs() - init_dogs} native objects were not released")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Repeated getter workload: the same few native pointers wrapped many times, with and without the identity map.
+
+Each call of the getter returns one of a few shared children; all wrappers are kept alive until the end,
+as when they are stored in Python objects.
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, List
+
+from cffi import FFI
+
+from refcount.interop import disable_identity_map, enable_identity_map, identity_map_stats, wrap_cffi_native_handle
+
+ffi = FFI()
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def getter_workload(children: List[Any], n: int) -> List[Any]:
+    """Wrap the result of `n` getter calls, cycling over the children."""
+    k = len(children)
+    return [wrap_cffi_native_handle(children[i % k], "CHILD_PTR", no_release) for i in range(n)]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-calls", type=int, default=200_000)
+    parser.add_argument("-k", "--num-children", type=int, default=10)
+    args = parser.parse_args()
+
+    children = [ffi.new("char[1]") for _ in range(args.num_children)]
+    print(f"{'identity map':<14}{'calls/s':>12}{'distinct wrappers':>20}{'peak (MB)':>12}{'hits':>10}{'misses':>10}")
+    for enabled in [False, True]:
+        if enabled:
+            enable_identity_map()
+        start = time.perf_counter()
+        wrappers = getter_workload(children, args.num_calls)
+        elapsed = time.perf_counter() - start
+        stats = identity_map_stats()
+        del wrappers
+        # memory is measured on a separate run, tracing allocations slowing down the workload
+        tracemalloc.start()
+        wrappers = getter_workload(children, args.num_calls)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        distinct = len({id(w) for w in wrappers})
+        hits, misses = (stats.hits, stats.misses) if stats is not None else ("-", "-")
+        print(
+            f"{'on' if enabled else 'off':<14}{args.num_calls / elapsed:>12,.0f}{distinct:>20,}{peak / 1e6:>12.1f}{hits:>10}{misses:>10}",
+        )
+        del wrappers
+        disable_identity_map()
+
+
+if __name__ == "__main__":
+    main()
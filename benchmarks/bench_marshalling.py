@@ -0,0 +1,66 @@
+"""Per call cost of bindings written by hand, as generated glue code does, versus marshalled from a signature."""
+
+import argparse
+import timeit
+from typing import Any
+
+from benchmarks.native import ut_dll
+from refcount.interop import (
+    cffi_arg_error_external_obj_type,
+    is_cffi_native_handle,
+    unwrap_cffi_native_handle,
+    wrap_as_pointer_handle,
+    wrap_cffi_native_handle,
+)
+from refcount.marshalling import marshalled
+
+
+def glue_get_dog_refcount(dog: Any) -> int:
+    """Hand written glue: type check, then unwrapping."""
+    if not is_cffi_native_handle(dog, "DOG_PTR"):
+        raise TypeError(cffi_arg_error_external_obj_type(dog, "DOG_PTR"))
+    return ut_dll.get_dog_refcount(unwrap_cffi_native_handle(dog))
+
+
+def glue_unchecked_get_dog_refcount(dog: Any) -> int:
+    """Hand written glue as generated without type checks."""
+    dog_xptr = wrap_as_pointer_handle(dog)
+    return ut_dll.get_dog_refcount(dog_xptr.ptr)
+
+
+def glue_create_owner(dog: Any) -> Any:
+    """Hand written glue unwrapping the argument and wrapping the result."""
+    if not is_cffi_native_handle(dog, "DOG_PTR"):
+        raise TypeError(cffi_arg_error_external_obj_type(dog, "DOG_PTR"))
+    result = ut_dll.create_owner(unwrap_cffi_native_handle(dog))
+    return wrap_cffi_native_handle(result, "DOG_OWNER_PTR", ut_dll.release)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    get_dog_refcount = marshalled(ut_dll.get_dog_refcount, ["DOG_PTR"])
+    create_owner = marshalled(ut_dll.create_owner, ["DOG_PTR"], "DOG_OWNER_PTR", ut_dll.release)
+    dog = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    pointer = dog.ptr
+
+    cases = {
+        "get_dog_refcount, raw cffi": lambda: ut_dll.get_dog_refcount(pointer),
+        "get_dog_refcount, glue unchecked": lambda: glue_unchecked_get_dog_refcount(dog),
+        "get_dog_refcount, glue checked": lambda: glue_get_dog_refcount(dog),
+        "get_dog_refcount, marshalled": lambda: get_dog_refcount(dog),
+        "create_owner + release, glue": lambda: glue_create_owner(dog).release(),
+        "create_owner + release, marshalled": lambda: create_owner(dog).release(),
+    }
+    print(f"{'case':<38}{'ns/call':>10}")
+    for name, case in cases.items():
+        ns = min(timeit.repeat(case, number=args.number, repeat=5)) / args.number * 1e9
+        print(f"{name:<38}{ns:>10,.0f}")
+    dog.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Memory footprint of handles, and cost of the hot accessors.
+
+Compares the slotted layout of `DeletableCffiNativeHandle` with a replica of the former
+layout, where each instance carried a `__dict__`.
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+from benchmarks.native import ut_dll
+from refcount.interop import DeletableCffiNativeHandle
+
+
+class DictLayoutHandle:
+    """Replica of the attributes stored by a `DeletableCffiNativeHandle` before `__slots__` were introduced."""
+
+    def __init__(self, handle: Any, release_native: Optional[Callable], type_id: Optional[str] = None):
+        self._ref_count = 1
+        self._finalizing = False
+        self._handle = handle
+        self._type_id = type_id
+        self._release_native = release_native
+
+    @property
+    def ptr(self) -> Any:
+        return self._handle
+
+    def get_handle(self) -> Any:
+        return self._handle
+
+
+def bytes_per_handle(factory: Callable[[Any], Any], pointers: List[Any]) -> float:
+    """Python heap bytes allocated per wrapper, excluding the cffi pointers themselves."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    wrappers = [factory(p) for p in pointers]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the wrappers is not part of the cost of a handle
+    list_bytes = wrappers.__sizeof__()
+    result = (after - before - list_bytes) / len(pointers)
+    for w in wrappers:
+        if isinstance(w, DeletableCffiNativeHandle):
+            w._release_native = None  # pointers are released by the caller
+    return result
+
+
+def accessor_ns(handle: Any, number: int) -> dict:
+    """Nanoseconds per call of the `ptr` property and `get_handle()` method."""
+    ptr_t = min(timeit.repeat(lambda: handle.ptr, number=number, repeat=5))
+    get_t = min(timeit.repeat(handle.get_handle, number=number, repeat=5))
+    return {"ptr": ptr_t / number * 1e9, "get_handle": get_t / number * 1e9}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    pointers = [ut_dll.create_dog() for _ in range(args.num_handles)]
+    try:
+        layouts = {
+            "dict (before)": lambda p: DictLayoutHandle(p, ut_dll.release, "DOG_PTR"),
+            "slots (after)": lambda p: DeletableCffiNativeHandle(p, ut_dll.release, "DOG_PTR"),
+        }
+        print(f"{'layout':<16}{'bytes/handle':>14}{'ptr (ns)':>12}{'get_handle (ns)':>18}")
+        for name, factory in layouts.items():
+            nbytes = bytes_per_handle(factory, pointers)
+            h = factory(pointers[0])
+            timings = accessor_ns(h, 1_000_000)
+            if isinstance(h, DeletableCffiNativeHandle):
+                h._release_native = None
+            print(f"{name:<16}{nbytes:>14.1f}{timings['ptr']:>12.1f}{timings['get_handle']:>18.1f}")
+    finally:
+        for p in pointers:
+            ut_dll.release(p)
+
+
+if __name__ == "__main__":
+    main()
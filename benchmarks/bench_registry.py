@@ -0,0 +1,51 @@
+"""Cost of the live handle registry: creating and releasing handles with the registry disabled and enabled."""
+
+import argparse
+import time
+from typing import Any
+
+from cffi import FFI
+
+from refcount.interop import DeletableCffiNativeHandle
+from refcount.registry import disable_handle_registry, enable_handle_registry, register_size_of
+
+ffi = FFI()
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def cycles_per_second(pointer: Any, n: int, repeat: int) -> float:
+    """Best throughput of handle creation followed by release, over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            DeletableCffiNativeHandle(pointer, no_release, "SERIES_PTR").release()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=200_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pointer = ffi.new("char[1]")
+    print(f"{'registry':<22}{'create+release/s':>18}")
+    for case in ["disabled", "enabled", "enabled, with size_of"]:
+        if case != "disabled":
+            enable_handle_registry()
+        if case == "enabled, with size_of":
+            register_size_of("SERIES_PTR", lambda ptr: 8)
+        rate = cycles_per_second(pointer, args.num_handles, args.repeat)
+        print(f"{case:<22}{rate:>18,.0f}")
+        disable_handle_registry()
+        register_size_of("SERIES_PTR", None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Teardown of many handles: one native call per handle versus one bulk native call.
+
+Compares calling `release()` on each handle with `release_many`, with and without a bulk
+release function registered for the type of the handles.
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from benchmarks.native import ut_dll
+from refcount.interop import DeletableCffiNativeHandle, register_bulk_release, release_many
+
+TYPE_ID = "DOG_PTR"
+
+
+def make_handles(n: int) -> List[DeletableCffiNativeHandle]:
+    """Handles over native objects from the test library."""
+    return [DeletableCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, TYPE_ID) for _ in range(n)]
+
+
+def release_each(handles: List[DeletableCffiNativeHandle]) -> None:
+    """Baseline: one `release()`, hence one native call, per handle."""
+    for h in handles:
+        h.release()
+
+
+def time_teardown(teardown: Callable[[List[DeletableCffiNativeHandle]], None], n: int, repeat: int) -> float:
+    """Best time, in seconds, to tear down `n` handles."""
+    best = float("inf")
+    for _ in range(repeat):
+        handles = make_handles(n)
+        start = time.perf_counter()
+        teardown(handles)
+        best = min(best, time.perf_counter() - start)
+        if ut_dll.num_dogs() != 0:
+            raise RuntimeError("native objects were not all released")
+    return best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-handles", type=int, default=50_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = {
+        "release() each": (release_each, False),
+        "release_many, no bulk": (release_many, False),
+        "release_many, bulk": (release_many, True),
+    }
+    print(f"{'teardown':<24}{'total (ms)':>12}{'per handle (ns)':>18}")
+    for name, (teardown, bulk) in cases.items():
+        register_bulk_release(TYPE_ID, ut_dll.release_many if bulk else None, ut_dll.release)
+        elapsed = time_teardown(teardown, args.num_handles, args.repeat)
+        print(f"{name:<24}{elapsed * 1e3:>12.2f}{elapsed / args.num_handles * 1e9:>18.1f}")
+    register_bulk_release(TYPE_ID, None)
+
+
+if __name__ == "__main__":
+    main()
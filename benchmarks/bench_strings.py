@@ -0,0 +1,57 @@
+"""Passing the same string identifiers as `char*` arguments many times: encoding on each call versus the string cache.
+
+Reports calls per second of `wrap_as_pointer_handle` for a workload cycling over a few identifiers, as bindings do with
+series and library identifiers, without and with `refcount.strings.enable_string_cache`.
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from refcount.interop import wrap_as_pointer_handle
+from refcount.strings import disable_string_cache, enable_string_cache
+
+
+def best_rate(f: Callable[[], None], n: int, repeat: int = 5) -> float:
+    """Best number of operations per second over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-calls", type=int, default=1_000_000)
+    parser.add_argument("-k", "--num-identifiers", type=int, default=16)
+    args = parser.parse_args()
+    identifiers: List[str] = [f"subarea.{i}.runoff_catchment_ensemble_member" for i in range(args.num_identifiers)]
+    workload = identifiers * (args.num_calls // len(identifiers))
+    n = len(workload)
+
+    def encode_per_call() -> None:
+        for s in workload:
+            s.encode("utf-8")
+
+    def wrap_all() -> None:
+        for s in workload:
+            wrap_as_pointer_handle(s).ptr  # noqa: B018
+
+    print(f"{n:,} calls over {len(identifiers)} identifiers")
+    print(f"{'case':<36}{'calls/s':>14}{'speedup':>10}")
+    reference = best_rate(wrap_all, n)
+    print(f"{'wrap_as_pointer_handle, encode':<36}{reference:>14,.0f}{1:>10.2f}")
+    rate = best_rate(encode_per_call, n)
+    print(f"{'str.encode alone':<36}{rate:>14,.0f}{rate / reference:>10.2f}")
+    cache = enable_string_cache()
+    rate = best_rate(wrap_all, n)
+    print(f"{'wrap_as_pointer_handle, cache':<36}{rate:>14,.0f}{rate / reference:>10.2f}")
+    print(f"cache hit rate {cache.statistics().hit_rate:.4f}")
+    disable_string_cache()
+
+
+if __name__ == "__main__":
+    main()
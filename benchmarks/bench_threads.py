@@ -0,0 +1,90 @@
+"""Cost of reference counting from several threads over shared handles.
+
+Reports the uncontended cost of an `add_ref`/`release` pair, then scales the number of threads
+working on a shared pool of handles, with and without atomic reference counting.
+"""
+
+import argparse
+import threading
+import time
+import timeit
+from typing import List
+
+from cffi import FFI
+
+from refcount.base import disable_atomic_ref_counting, enable_atomic_ref_counting
+from refcount.interop import OwningCffiNativeHandle
+
+ffi = FFI()
+
+
+def make_handles(n: int) -> List[OwningCffiNativeHandle]:
+    """Handles over pointers allocated by cffi."""
+    return [OwningCffiNativeHandle(ffi.new("char[1]")) for _ in range(n)]
+
+
+def uncontended_ns(number: int) -> float:
+    """Nanoseconds per `add_ref` + `release` pair on a single thread."""
+    h = make_handles(1)[0]
+
+    def pair() -> None:
+        h.add_ref()
+        h.release()
+
+    return min(timeit.repeat(pair, number=number, repeat=5)) / number * 1e9
+
+
+def contended_ops_per_second(n_threads: int, handles: List[OwningCffiNativeHandle], n_iter: int) -> float:
+    """Throughput of `add_ref` + `release` pairs, all threads cycling over the same handles."""
+    barrier = threading.Barrier(n_threads + 1)
+
+    def work() -> None:
+        barrier.wait()
+        for _ in range(n_iter):
+            for h in handles:
+                h.add_ref()
+                h.release()
+
+    threads = [threading.Thread(target=work) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if any(h.reference_count != 1 for h in handles):
+        print("  warning: reference counts were corrupted by concurrent updates")
+    return n_threads * n_iter * len(handles) / elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-t", "--max-threads", type=int, default=8)
+    parser.add_argument("-n", "--num-handles", type=int, default=256)
+    parser.add_argument("-i", "--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    modes = {"unsynchronized": disable_atomic_ref_counting, "atomic": enable_atomic_ref_counting}
+    print("Uncontended add_ref + release pair:")
+    for name, switch in modes.items():
+        switch()
+        print(f"  {name:<16}{uncontended_ns(200_000):>10.1f} ns")
+
+    print(f"\nThroughput over {args.num_handles} shared handles (pairs per second):")
+    print(f"  {'threads':<10}" + "".join(f"{name:>18}" for name in modes))
+    handles = make_handles(args.num_handles)
+    n_threads = 1
+    while n_threads <= args.max_threads:
+        row = []
+        for switch in modes.values():
+            switch()
+            row.append(contended_ops_per_second(n_threads, handles, args.iterations))
+        print(f"  {n_threads:<10}" + "".join(f"{x:>18,.0f}" for x in row))
+        n_threads *= 2
+    disable_atomic_ref_counting()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cost of unwrapping the arguments of native calls, from 1 to 10 arguments.
+
+"isinstance chain" replicates `unwrap_cffi_native_handle` before it dispatched on the exact type of its argument.
+"""
+
+import argparse
+import timeit
+from typing import Any
+
+from cffi import FFI
+
+from refcount.interop import CffiNativeHandle, DeletableCffiNativeHandle, unwrap_cffi_native_handle, unwrap_many
+
+ffi = FFI()
+
+
+def isinstance_chain(obj_wrapper: Any, stringent: bool = False) -> Any:
+    """Replica of the former `unwrap_cffi_native_handle`."""
+    if obj_wrapper is None:
+        return None
+    if isinstance(obj_wrapper, CffiNativeHandle):
+        return obj_wrapper.get_handle()
+    if isinstance(obj_wrapper, FFI.CData):
+        return obj_wrapper
+    if stringent:
+        raise TypeError("Argument is neither a CffiNativeHandle nor a CFFI external pointer")
+    return obj_wrapper
+
+
+def no_release(pointer: Any) -> None:
+    """Release function for pointers owned by cffi."""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    pointer = ffi.new("char[1]")
+    # the mix found in generated glue code: handles, raw pointers, numbers and strings
+    pool = [DeletableCffiNativeHandle(pointer, no_release, "SERIES_PTR"), pointer, 1.5, b"name", None]
+
+    def per_call_ns(stmt: Any) -> float:
+        return min(timeit.repeat(stmt, number=args.number, repeat=5)) / args.number * 1e9
+
+    print(f"{'arguments':>10}{'isinstance chain':>18}{'dispatch':>12}{'unwrap_many':>14}  (ns per call)")
+    for num_args in range(1, 11):
+        call_args = tuple(pool[i % len(pool)] for i in range(num_args))
+        chain = per_call_ns(lambda call_args=call_args: [isinstance_chain(a) for a in call_args])
+        dispatch = per_call_ns(lambda call_args=call_args: [unwrap_cffi_native_handle(a) for a in call_args])
+        many = per_call_ns(lambda call_args=call_args: unwrap_many(call_args))
+        print(f"{num_args:>10}{chain:>18,.0f}{dispatch:>12,.0f}{many:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Access to the native test library used by the benchmarks.
+
+The library is the one built for the unit tests, see `tests/Readme.md` for build instructions.
+"""
+
+import os
+import sys
+
+from cffi import FFI
+
+from refcount.putils import library_short_filename
+
+pkg_dir = os.path.join(os.path.dirname(__file__), "..")
+fname = library_short_filename("test_native_library")
+if sys.platform == "win32":
+    dir_path = os.path.join(pkg_dir, "tests", "test_native_library", "build", "Debug")
+    if not os.path.exists(os.path.join(dir_path, fname)):
+        dir_path = os.path.join(pkg_dir, "tests", "test_native_library", "x64", "Debug")
+else:
+    dir_path = os.path.join(pkg_dir, "tests", "test_native_library", "build")
+
+native_lib_path = os.path.join(dir_path, fname)
+
+ut_ffi = FFI()
+
+ut_ffi.cdef(
+    """
+typedef struct _date_time_interop
+{
+    int year;
+    int month;
+    int day;
+    int hour;
+    int minute;
+    int second;
+} date_time_interop;
+
+typedef struct _interval_interop
+{
+    date_time_interop start;
+    date_time_interop end;
+} interval_interop;
+""",
+)
+
+ut_ffi.cdef(
+    "extern void create_date(date_time_interop* start, int year, int month, int day, int hour, int min, int sec);",
+)
+ut_ffi.cdef("extern void* create_dog();")
+ut_ffi.cdef("extern int get_dog_refcount( void* obj);")
+ut_ffi.cdef("extern int remove_dog_reference( void* obj);")
+ut_ffi.cdef("extern int add_dog_reference( void* obj);")
+ut_ffi.cdef("extern void* create_owner( void* d);")
+ut_ffi.cdef("extern int num_dogs();")
+ut_ffi.cdef("extern void release( void* obj);")
+ut_ffi.cdef("extern void release_many( void** objects, int n);")
+
+ut_dll = ut_ffi.dlopen(native_lib_path, ut_ffi.RTLD_LAZY)
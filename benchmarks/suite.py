@@ -0,0 +1,284 @@
+"""Throughput of wrapping, unwrapping and disposing handles over the native test library, with raw cffi and ctypes baselines.
+
+Run the suite, optionally saving the results as JSON:
+
+```sh
+python -m benchmarks.suite run --output baseline.json
+```
+
+After a change, compare new results against a stored baseline; the exit code is 1 if a case got slower by more than the
+threshold:
+
+```sh
+python -m benchmarks.suite run --output current.json
+python -m benchmarks.suite compare baseline.json current.json --threshold 0.1
+```
+
+`python -m benchmarks.suite compare baseline.json` runs the suite and compares on the fly.
+"""
+
+import argparse
+import ctypes
+import json
+import platform
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.native import native_lib_path, ut_dll, ut_ffi
+from refcount.interop import (
+    CffiWrapperFactory,
+    DeletableCffiNativeHandle,
+    unwrap_cffi_native_handle,
+    wrap_as_pointer_handle,
+    wrap_cffi_native_handle,
+)
+
+Case = Callable[[int], None]
+"""A benchmark case: performs the operation a given number of times."""
+
+SCHEMA_VERSION = 1
+
+
+class Dog(DeletableCffiNativeHandle):
+    """A wrapper class as found in generated bindings."""
+
+
+class DogOwner(DeletableCffiNativeHandle):
+    """A wrapper class as found in generated bindings, for an object using a dog."""
+
+
+class CtypesDate(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_int) for name in ("year", "month", "day", "hour", "minute", "second")]
+
+
+def _ctypes_library() -> Any:
+    lib = ctypes.CDLL(native_lib_path)
+    lib.create_dog.restype = ctypes.c_void_p
+    lib.create_dog.argtypes = []
+    lib.release.restype = None
+    lib.release.argtypes = [ctypes.c_void_p]
+    lib.create_date.restype = None
+    lib.create_date.argtypes = [ctypes.POINTER(CtypesDate)] + [ctypes.c_int] * 6
+    return lib
+
+
+def build_cases() -> Dict[str, Case]:
+    """The benchmark cases, by name. One operation creates and releases a native dog, unless stated otherwise."""
+    clib = _ctypes_library()
+    factory = CffiWrapperFactory({"DOG_PTR": Dog, "DOG_OWNER_PTR": DogOwner}, strict_wrapping=True)
+    create_dog = ut_dll.create_dog
+    release = ut_dll.release
+    dog = wrap_cffi_native_handle(create_dog(), "DOG_PTR", release)
+    pointer = dog.ptr
+
+    def raw_cffi(n: int) -> None:
+        for _ in range(n):
+            release(create_dog())
+
+    def raw_ctypes(n: int) -> None:
+        c_create_dog = clib.create_dog
+        c_release = clib.release
+        for _ in range(n):
+            c_release(c_create_dog())
+
+    def wrap_release(n: int) -> None:
+        for _ in range(n):
+            wrap_cffi_native_handle(create_dog(), "DOG_PTR", release).release()
+
+    def wrap_collect(n: int) -> None:
+        # disposal when the last Python reference goes, rather than an explicit release
+        for _ in range(n):
+            wrap_cffi_native_handle(create_dog(), "DOG_PTR", release)
+
+    def factory_release(n: int) -> None:
+        create_wrapper = factory.create_wrapper
+        for _ in range(n):
+            create_wrapper(create_dog(), "DOG_PTR", release).release()
+
+    def raw_cffi_owner(n: int) -> None:
+        # one operation creates a dog and its owner, and releases both
+        create_owner = ut_dll.create_owner
+        for _ in range(n):
+            d = create_dog()
+            release(create_owner(d))
+            release(d)
+
+    def wrap_owner_release(n: int) -> None:
+        create_owner = ut_dll.create_owner
+        for _ in range(n):
+            d = wrap_cffi_native_handle(create_dog(), "DOG_PTR", release)
+            wrap_cffi_native_handle(
+                create_owner(unwrap_cffi_native_handle(d, True)), "DOG_OWNER_PTR", release
+            ).release()
+            d.release()
+
+    def factory_owner_release(n: int) -> None:
+        create_owner = ut_dll.create_owner
+        create_wrapper = factory.create_wrapper
+        for _ in range(n):
+            d = create_wrapper(create_dog(), "DOG_PTR", release)
+            create_wrapper(create_owner(unwrap_cffi_native_handle(d, True)), "DOG_OWNER_PTR", release).release()
+            d.release()
+
+    def unwrap_handle(n: int) -> None:
+        # no native call: the pointer of an existing wrapper
+        for _ in range(n):
+            unwrap_cffi_native_handle(dog, True)
+
+    def unwrap_pointer(n: int) -> None:
+        for _ in range(n):
+            unwrap_cffi_native_handle(pointer, True)
+
+    def as_pointer_handle(n: int) -> None:
+        for _ in range(n):
+            wrap_as_pointer_handle(dog, True)
+
+    def as_pointer_handle_cdata(n: int) -> None:
+        for _ in range(n):
+            wrap_as_pointer_handle(pointer, True)
+
+    def date_cffi(n: int) -> None:
+        # a date struct allocated by cffi and filled by the native library
+        create_date = ut_dll.create_date
+        new = ut_ffi.new
+        for _ in range(n):
+            create_date(new("date_time_interop*"), 2024, 1, 2, 3, 4, 5)
+
+    def date_ctypes(n: int) -> None:
+        create_date = clib.create_date
+        byref = ctypes.byref
+        for _ in range(n):
+            create_date(byref(CtypesDate()), 2024, 1, 2, 3, 4, 5)
+
+    return {
+        "baseline.cffi.create_release": raw_cffi,
+        "baseline.ctypes.create_release": raw_ctypes,
+        "wrap.release": wrap_release,
+        "wrap.collect": wrap_collect,
+        "factory.create_wrapper.release": factory_release,
+        "baseline.cffi.create_owner": raw_cffi_owner,
+        "wrap.create_owner.release": wrap_owner_release,
+        "factory.create_owner.release": factory_owner_release,
+        "unwrap.handle": unwrap_handle,
+        "unwrap.cdata": unwrap_pointer,
+        "wrap_as_pointer_handle.handle": as_pointer_handle,
+        "wrap_as_pointer_handle.cdata": as_pointer_handle_cdata,
+        "baseline.cffi.date": date_cffi,
+        "baseline.ctypes.date": date_ctypes,
+    }
+
+
+def measure(case: Case, n: int, repeat: int) -> float:
+    """Best time per operation in nanoseconds, over a few runs."""
+    case(min(n, 1000))  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        case(n)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / n
+
+
+def run(n: int, repeat: int, pattern: Optional[str] = None) -> Dict[str, Any]:
+    """Run the suite, printing each result as it comes.
+
+    Args:
+        n (int): number of operations per run.
+        repeat (int): number of runs per case; the best is kept.
+        pattern (Optional[str]): regular expression selecting the cases to run by name. Defaults to all.
+
+    Returns:
+        Dict[str, Any]: the results, as saved in JSON.
+    """
+    results = {}
+    print(f"{'case':<36}{'ns/op':>12}{'ops/s':>16}")
+    for name, case in build_cases().items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        ns = measure(case, n, repeat)
+        results[name] = {"ns_per_op": ns, "ops_per_second": 1e9 / ns}
+        print(f"{name:<36}{ns:>12,.1f}{1e9 / ns:>16,.0f}")
+    return {
+        "schema": SCHEMA_VERSION,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "num_operations": n,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Tuple[str, float]]:
+    """Compare two sets of results, printing the ratio of times per operation for the cases found in both.
+
+    Args:
+        baseline (Dict[str, Any]): the reference results.
+        current (Dict[str, Any]): the new results.
+        threshold (float): relative slowdown above which a case is flagged, e.g. 0.1 for 10%.
+
+    Returns:
+        List[Tuple[str, float]]: the regressions, as case names and ratios of the current to the baseline time.
+    """
+    regressions = []
+    print(f"{'case':<36}{'baseline ns':>14}{'current ns':>14}{'ratio':>9}")
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<36}{'-':>14}{result['ns_per_op']:>14,.1f}{'new':>9}")
+            continue
+        ratio = result["ns_per_op"] / reference["ns_per_op"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+            flag = "  REGRESSION"
+        print(f"{name:<36}{reference['ns_per_op']:>14,.1f}{result['ns_per_op']:>14,.1f}{ratio:>9.2f}{flag}")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite from the command line.
+
+    Args:
+        argv (Optional[List[str]]): command line arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: the exit code, 1 if regressions were found.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num-operations", type=int, default=100_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", help="regular expression selecting the cases to run")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("-o", "--output", help="JSON file to save the results to")
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline", help="JSON file of the baseline results")
+    compare_parser.add_argument("current", nargs="?", help="JSON file of the new results; runs the suite if omitted")
+    compare_parser.add_argument("-t", "--threshold", type=float, default=0.1, help="relative slowdown flagged")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.num_operations, args.repeat, args.filter)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return 0
+    baseline = _load(args.baseline)
+    current = _load(args.current) if args.current else run(args.num_operations, args.repeat, args.filter)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
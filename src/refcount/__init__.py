@@ -5,4 +5,7 @@ Python classes for reference counting
 
 from __future__ import annotations
 
-__all__: list[str] = []
+from refcount.metrics import disable_metrics, enable_metrics, metrics_snapshot
+from refcount.scope import HandleScope, scope
+
+__all__: list[str] = ["HandleScope", "disable_metrics", "enable_metrics", "metrics_snapshot", "scope"]
@@ -0,0 +1,204 @@
+"""Thread-affine release of native resources.
+
+Some native libraries require objects to be released on the thread that created them, but `__del__`
+may run on whichever thread triggers a garbage collection. A `ThreadAffineCffiNativeHandle` records the
+thread, or the running asyncio event loop, that creates it. When released from another thread, the native
+release is queued to that owner instead:
+
+* an event loop owner releases queued resources via a callback scheduled on the loop;
+* a thread owner releases queued resources at safe points: when it creates or releases another
+  thread-affine handle, or when it calls `drain_pending_releases`.
+
+If the owning thread has terminated or its loop is closed, resources are released on the calling thread.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+from refcount.interop import CffiData, DeletableCffiNativeHandle
+
+
+class ReleaseOwner:
+    """A thread or an asyncio event loop, to which native releases are routed."""
+
+    def __init__(self, thread: threading.Thread, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """A thread or an asyncio event loop, to which native releases are routed.
+
+        Args:
+            thread (threading.Thread): the owning thread; for a loop owner, the thread running the loop.
+            loop (Optional[asyncio.AbstractEventLoop]): the owning event loop, if any.
+        """
+        self.thread = thread
+        self.thread_ident = thread.ident
+        self.loop = loop
+        self._pending: Deque[Tuple[Callable[[CffiData], None], CffiData]] = deque()
+        self._drain_scheduled = False
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of releases queued for this owner."""
+        return len(self._pending)
+
+    def is_current(self) -> bool:
+        """Is the calling thread the one this owner releases resources on."""
+        return threading.get_ident() == self.thread_ident
+
+    def submit(self, release_native: Callable[[CffiData], None], handle: CffiData) -> None:
+        """Route the release of a native resource to this owner.
+
+        The release happens immediately if called from the owning thread, or if the owner cannot run it anymore.
+
+        Args:
+            release_native (Callable[[CffiData],None]): the native function releasing the resource.
+            handle (CffiData): the pointer to the native resource.
+        """
+        if self.is_current():
+            release_native(handle)
+            return
+        loop = self.loop
+        schedule = False
+        with self._lock:
+            owner_gone = not self.thread.is_alive() or (loop is not None and loop.is_closed())
+            if not owner_gone:
+                self._pending.append((release_native, handle))
+                if loop is not None and not self._drain_scheduled:
+                    self._drain_scheduled = schedule = True
+        if owner_gone:
+            # releases queued before the owner terminated are not otherwise run
+            self.drain()
+            release_native(handle)
+            return
+        if loop is None:
+            if not self.thread.is_alive():
+                # the thread terminated since the check, without releasing what was just queued
+                self.drain()
+        elif schedule:
+            try:
+                loop.call_soon_threadsafe(self.drain)
+            except RuntimeError:
+                # the loop was closed in the meantime
+                self.drain()
+
+    def drain(self) -> int:
+        """Release the native resources queued for this owner, on the calling thread.
+
+        Returns:
+            int: number of resources released.
+        """
+        with self._lock:
+            self._drain_scheduled = False
+        pending = self._pending
+        n = 0
+        while pending:
+            try:
+                release_native, handle = pending.popleft()
+            except IndexError:
+                break
+            release_native(handle)
+            n += 1
+        return n
+
+
+_thread_owners = threading.local()
+
+
+def _thread_owner() -> ReleaseOwner:
+    owner: Optional[ReleaseOwner] = getattr(_thread_owners, "thread", None)
+    if owner is None:
+        owner = ReleaseOwner(threading.current_thread())
+        _thread_owners.thread = owner
+    return owner
+
+
+def current_release_owner() -> ReleaseOwner:
+    """The owner of handles created on the calling thread: the running event loop if any, otherwise the thread.
+
+    Returns:
+        ReleaseOwner: the release owner for the calling context.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _thread_owner()
+    owner: Optional[ReleaseOwner] = getattr(_thread_owners, "loop", None)
+    if owner is None or owner.loop is not loop:
+        if owner is not None:
+            # a previous loop run by this thread may have stopped before draining
+            owner.drain()
+        owner = ReleaseOwner(threading.current_thread(), loop)
+        _thread_owners.loop = owner
+    return owner
+
+
+def drain_pending_releases() -> int:
+    """Release the native resources that other threads routed to the calling thread, or to an event loop it runs.
+
+    Returns:
+        int: number of resources released.
+    """
+    n = 0
+    for kind in ("thread", "loop"):
+        owner: Optional[ReleaseOwner] = getattr(_thread_owners, kind, None)
+        if owner is not None:
+            n += owner.drain()
+    return n
+
+
+class ThreadAffineCffiNativeHandle(DeletableCffiNativeHandle):
+    """Reference counting wrapper class for CFFI pointers, releasing native resources on the thread or event loop that created them.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
+        _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object _handle.
+        _owner (ReleaseOwner): the thread or event loop on which the native resource is released.
+    """
+
+    __slots__ = ("_owner",)
+
+    def __init__(
+        self,
+        handle: "CffiData",
+        release_native: Optional[Callable[["CffiData"], None]],
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """New reference counter for a CFFI resource handle, owned by the calling thread or its running event loop.
+
+        Args:
+            handle (CffiData): The handle (expected cffi pointer) to the native resource.
+            release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object handle.
+            type_id (str, optional): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): The initial reference count. Defaults to 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
+        """
+        owner = current_release_owner()
+        if owner._pending:
+            owner.drain()
+        self._owner = owner
+        super().__init__(handle, release_native, type_id, prior_ref_count)
+
+    @property
+    def owner(self) -> ReleaseOwner:
+        """The thread or event loop on which the native resource is released."""
+        return self._owner
+
+    def _release_handle(self) -> bool:
+        """Release the handle, or route its release to the owning thread or event loop.
+
+        Returns:
+            bool: Return True if the release of native resources handle was successful or queued, False otherwise.
+        """
+        if self._handle is None or self._release_native is None:
+            return False
+        owner = self._owner
+        if owner.is_current():
+            if owner._pending:
+                owner.drain()
+            self._release_native(self._handle)
+        else:
+            owner.submit(self._release_native, self._handle)
+        return True
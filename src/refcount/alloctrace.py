@@ -0,0 +1,367 @@
+"""Allocation sites of native handles, in the spirit of `tracemalloc`, to find where leaked handles were created.
+
+A sample of the `CffiNativeHandle` wrappers created while tracing is on get a truncated traceback of their creation
+recorded. Records are dropped when the native resource is released, so that a snapshot shows the surviving handles,
+grouped by allocation site. Two snapshots can be compared to see which sites accumulate handles.
+
+```python
+from refcount import alloctrace
+
+alloctrace.start(sample_rate=0.01, max_frames=8)
+before = alloctrace.take_snapshot()
+# ... run the workload
+after = alloctrace.take_snapshot()
+for diff in after.compare_to(before, "lineno")[:10]:
+    print(diff)
+```
+
+Frames and tracebacks are interned, and the memory used by records is bounded: once the budget is spent,
+new samples are dropped and counted. Frames within the `refcount` package are not recorded.
+"""
+
+import os
+import random
+import sys
+import threading
+from dataclasses import dataclass
+from math import log
+from typing import Any, Dict, List, Optional, Tuple
+
+from refcount.interop import LifecycleObserver, add_lifecycle_observer, remove_lifecycle_observer
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Rough sizes in bytes of records, interned frames and tracebacks, for the memory budget.
+_RECORD_SIZE = 120
+_FRAME_SIZE = 250
+_TRACEBACK_SIZE = 80
+_TRACEBACK_FRAME_SIZE = 8
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Dataclass describing a frame of an allocation traceback."""
+
+    filename: str
+    """File name."""
+    lineno: int
+    """Line number."""
+    name: str
+    """Function name."""
+
+    def __str__(self) -> str:
+        return f"{self.filename}:{self.lineno} in {self.name}"
+
+
+Traceback = Tuple[Frame, ...]
+"""Frames of an allocation traceback, most recent call first."""
+
+
+@dataclass
+class AllocationStatistic:
+    """Dataclass with the number of surviving handles created at an allocation site."""
+
+    traceback: Traceback
+    """The allocation site: a full traceback, or only its most recent frame, depending on the grouping."""
+    type_id: Optional[str]
+    """Type identifier of the handles."""
+    count: int
+    """Number of surviving sampled handles."""
+
+    def __str__(self) -> str:
+        site = str(self.traceback[0]) if self.traceback else "<unknown>"
+        return f"{site}: {self.count} handle(s) of type {self.type_id!r}"
+
+
+@dataclass
+class AllocationStatisticDiff:
+    """Dataclass with the change in the number of surviving handles created at an allocation site."""
+
+    traceback: Traceback
+    """The allocation site: a full traceback, or only its most recent frame, depending on the grouping."""
+    type_id: Optional[str]
+    """Type identifier of the handles."""
+    count: int
+    """Number of surviving sampled handles in the new snapshot."""
+    count_diff: int
+    """Difference with the old snapshot."""
+
+    def __str__(self) -> str:
+        site = str(self.traceback[0]) if self.traceback else "<unknown>"
+        return f"{site}: {self.count} handle(s) of type {self.type_id!r} ({self.count_diff:+d})"
+
+
+class AllocationSnapshot:
+    """The allocation sites of the sampled handles surviving at a point in time."""
+
+    def __init__(
+        self,
+        counts: Dict[Tuple[int, Optional[str]], int],
+        tracebacks: List[Traceback],
+        sample_rate: float,
+    ) -> None:
+        """The allocation sites of the sampled handles surviving at a point in time.
+
+        Args:
+            counts (Dict[Tuple[int,Optional[str]],int]): number of surviving handles per traceback index and type identifier.
+            tracebacks (List[Traceback]): interned tracebacks, by index.
+            sample_rate (float): the sampling rate in use when the snapshot was taken.
+        """
+        self._counts = counts
+        self._tracebacks = tracebacks
+        self.sample_rate = sample_rate
+
+    def _grouped(self, group_by: str) -> Dict[Tuple[Traceback, Optional[str]], int]:
+        if group_by not in ("traceback", "lineno"):
+            raise ValueError(f"group_by must be 'traceback' or 'lineno', got {group_by!r}")
+        grouped: Dict[Tuple[Traceback, Optional[str]], int] = {}
+        for (index, type_id), count in self._counts.items():
+            traceback = self._tracebacks[index]
+            if group_by == "lineno":
+                traceback = traceback[:1]
+            key = (traceback, type_id)
+            grouped[key] = grouped.get(key, 0) + count
+        return grouped
+
+    def statistics(self, group_by: str = "lineno") -> List[AllocationStatistic]:
+        """Surviving sampled handles per allocation site and type identifier, largest counts first.
+
+        Args:
+            group_by (str, optional): "lineno" to group by the most recent frame, or "traceback" for the full traceback. Defaults to "lineno".
+
+        Raises:
+            ValueError: unknown grouping.
+
+        Returns:
+            List[AllocationStatistic]: the statistics.
+        """
+        stats = [AllocationStatistic(tb, type_id, count) for (tb, type_id), count in self._grouped(group_by).items()]
+        stats.sort(key=lambda s: s.count, reverse=True)
+        return stats
+
+    def compare_to(self, old_snapshot: "AllocationSnapshot", group_by: str = "lineno") -> List[AllocationStatisticDiff]:
+        """Differences in surviving sampled handles per allocation site, with an older snapshot. Largest changes first.
+
+        Args:
+            old_snapshot (AllocationSnapshot): the snapshot to compare to.
+            group_by (str, optional): "lineno" to group by the most recent frame, or "traceback" for the full traceback. Defaults to "lineno".
+
+        Raises:
+            ValueError: unknown grouping.
+
+        Returns:
+            List[AllocationStatisticDiff]: the differences, including sites with no surviving handles anymore.
+        """
+        new = self._grouped(group_by)
+        old = old_snapshot._grouped(group_by)
+        diffs = []
+        for key in new.keys() | old.keys():
+            count = new.get(key, 0)
+            diffs.append(AllocationStatisticDiff(key[0], key[1], count, count - old.get(key, 0)))
+        diffs.sort(key=lambda d: (abs(d.count_diff), d.count), reverse=True)
+        return diffs
+
+    def format_report(self, limit: int = 10, group_by: str = "lineno") -> str:
+        """A text report of the allocation sites with the most surviving handles.
+
+        Args:
+            limit (int, optional): maximum number of sites. Defaults to 10.
+            group_by (str, optional): "lineno" or "traceback". Defaults to "lineno".
+
+        Returns:
+            str: the report, one site per line; full tracebacks are indented under their most recent frame.
+        """
+        lines = []
+        for stat in self.statistics(group_by)[:limit]:
+            lines.append(str(stat))
+            if group_by == "traceback":
+                lines.extend(f"    {frame}" for frame in stat.traceback[1:])
+        return "\n".join(lines)
+
+
+class AllocationTracer(LifecycleObserver):
+    """Records the allocation traceback of a sample of handles, until their native resource is released."""
+
+    def __init__(self, sample_rate: float = 1.0, max_frames: int = 10, memory_limit: int = 16 * 1024 * 1024) -> None:
+        """Records the allocation traceback of a sample of handles, until their native resource is released.
+
+        Args:
+            sample_rate (float, optional): fraction of the handles created whose traceback is recorded, in (0, 1]. Defaults to 1.0.
+            max_frames (int, optional): maximum number of frames recorded per traceback. Defaults to 10.
+            memory_limit (int, optional): approximate budget in bytes for the records. Defaults to 16 MiB.
+
+        Raises:
+            ValueError: if an argument is out of its valid range.
+        """
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate}")
+        if max_frames < 1:
+            raise ValueError(f"max_frames must be strictly positive, got {max_frames}")
+        self.sample_rate = sample_rate
+        self.max_frames = max_frames
+        self.memory_limit = memory_limit
+        self._lock = threading.Lock()
+        self._log_1_minus_rate = log(1.0 - sample_rate) if sample_rate < 1.0 else 0.0
+        self._countdown = self._next_interval()
+        self._frames: Dict[Tuple[str, int, str], Frame] = {}
+        self._traceback_index: Dict[Traceback, int] = {}
+        self._tracebacks: List[Traceback] = []
+        self._records: Dict[int, Tuple[int, Optional[str]]] = {}
+        self._memory = 0
+        self._sampled = 0
+        self._dropped = 0
+
+    def _next_interval(self) -> int:
+        # geometric distribution: each handle is sampled with probability `sample_rate`, without a draw per handle
+        if self._log_1_minus_rate == 0.0:
+            return 1
+        return int(log(1.0 - random.random()) / self._log_1_minus_rate) + 1  # noqa: S311
+
+    def on_created(self, handle: Any) -> None:
+        """Record the allocation traceback of a handle, if sampled.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        self._countdown -= 1
+        if self._countdown > 0:
+            return
+        self._countdown = self._next_interval()
+        key = handle._lifecycle_key()
+        type_id = handle._type_id
+        frames = []
+        f = sys._getframe(1)
+        while f is not None and len(frames) < self.max_frames:
+            code = f.f_code
+            filename = code.co_filename
+            if not filename.startswith(_PACKAGE_DIR):
+                frames.append((filename, f.f_lineno, code.co_name))
+            f = f.f_back
+        with self._lock:
+            previous = self._records.pop(key, None)
+            if previous is not None:
+                # a key reused by a new handle, the previous one having been collected without release
+                self._memory -= _RECORD_SIZE
+            if self._memory + _RECORD_SIZE > self.memory_limit:
+                self._dropped += 1
+                return
+            index = self._intern(frames)
+            if index < 0:
+                self._dropped += 1
+                return
+            self._records[key] = (index, type_id)
+            self._memory += _RECORD_SIZE
+            self._sampled += 1
+
+    def _intern(self, raw_frames: List[Tuple[str, int, str]]) -> int:
+        frames = []
+        for raw in raw_frames:
+            frame = self._frames.get(raw)
+            if frame is None:
+                if self._memory + _FRAME_SIZE > self.memory_limit:
+                    return -1
+                frame = self._frames[raw] = Frame(*raw)
+                self._memory += _FRAME_SIZE
+            frames.append(frame)
+        traceback = tuple(frames)
+        index = self._traceback_index.get(traceback)
+        if index is None:
+            size = _TRACEBACK_SIZE + _TRACEBACK_FRAME_SIZE * len(traceback)
+            if self._memory + size > self.memory_limit:
+                return -1
+            index = self._traceback_index[traceback] = len(self._tracebacks)
+            self._tracebacks.append(traceback)
+            self._memory += size
+        return index
+
+    def on_released(self, key: int, type_id: Optional[str], elapsed_ns: int) -> None:  # noqa: ARG002
+        """Forget the record of a handle whose native resource has been released.
+
+        Args:
+            key (int): the lifecycle key of the wrapper.
+            type_id (Optional[str]): the type identifier of the wrapper.
+            elapsed_ns (int): time taken by the release in nanoseconds.
+        """
+        if key not in self._records:
+            # most handles are not sampled; checking first avoids taking the lock
+            return
+        with self._lock:
+            if self._records.pop(key, None) is not None:
+                self._memory -= _RECORD_SIZE
+
+    def take_snapshot(self) -> AllocationSnapshot:
+        """The allocation sites of the sampled handles surviving now.
+
+        Returns:
+            AllocationSnapshot: the snapshot.
+        """
+        with self._lock:
+            counts: Dict[Tuple[int, Optional[str]], int] = {}
+            for record in self._records.values():
+                counts[record] = counts.get(record, 0) + 1
+            return AllocationSnapshot(counts, list(self._tracebacks), self.sample_rate)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters about the activity of this tracer.
+
+        Returns:
+            Dict[str, int]: handles sampled and dropped for lack of memory budget, records alive, and approximate memory used.
+        """
+        with self._lock:
+            return {
+                "sampled": self._sampled,
+                "dropped": self._dropped,
+                "live": len(self._records),
+                "memory": self._memory,
+            }
+
+
+_tracer: Optional[AllocationTracer] = None
+
+
+def start(sample_rate: float = 1.0, max_frames: int = 10, memory_limit: int = 16 * 1024 * 1024) -> AllocationTracer:
+    """Start recording the allocation traceback of a sample of the handles created. Restarts tracing if already started.
+
+    Args:
+        sample_rate (float, optional): fraction of the handles created whose traceback is recorded, in (0, 1]. Defaults to 1.0.
+        max_frames (int, optional): maximum number of frames recorded per traceback. Defaults to 10.
+        memory_limit (int, optional): approximate budget in bytes for the records. Defaults to 16 MiB.
+
+    Returns:
+        AllocationTracer: the tracer now in use.
+    """
+    global _tracer  # noqa: PLW0603
+    stop()
+    tracer = AllocationTracer(sample_rate, max_frames, memory_limit)
+    _tracer = tracer
+    add_lifecycle_observer(tracer)
+    return tracer
+
+
+def stop() -> None:
+    """Stop tracing, and discard the records."""
+    global _tracer  # noqa: PLW0603
+    tracer = _tracer
+    if tracer is not None:
+        remove_lifecycle_observer(tracer)
+        _tracer = None
+
+
+def is_tracing() -> bool:
+    """Are allocation tracebacks being recorded."""
+    return _tracer is not None
+
+
+def take_snapshot() -> AllocationSnapshot:
+    """The allocation sites of the sampled handles surviving now.
+
+    Raises:
+        RuntimeError: if tracing is not started.
+
+    Returns:
+        AllocationSnapshot: the snapshot.
+    """
+    tracer = _tracer
+    if tracer is None:
+        raise RuntimeError("the allocation tracer must be started to take a snapshot")
+    return tracer.take_snapshot()
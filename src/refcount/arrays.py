@@ -0,0 +1,447 @@
+"""Wrappers of native arrays, viewed without copies as buffers or NumPy arrays that keep the native memory alive.
+
+```python
+from refcount.arrays import NativeArrayHandle
+
+values = NativeArrayHandle(
+    native_lib.get_values(series), n, native_lib.free_values
+)
+a = values.as_array()  # numpy.ndarray over the native memory, no copy
+values.release()
+# the native memory is freed once `a`, and any view derived from it, is collected
+```
+
+Each buffer or array returned holds a reference to the handle, through a cffi pointer with a destructor (`ffi.gc`) that is
+the base of the buffer. NumPy is optional: it is only imported by the methods returning arrays.
+"""
+
+from collections.abc import Sequence as SequenceBase
+from math import prod
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union, overload
+
+from refcount.interop import CffiNativeHandle, DeletableCffiNativeHandle, _ffi
+
+_C_TYPES_DTYPES = {
+    "double": "float64",
+    "float": "float32",
+    "int8_t": "int8",
+    "int16_t": "int16",
+    "int32_t": "int32",
+    "int64_t": "int64",
+    "uint8_t": "uint8",
+    "uint16_t": "uint16",
+    "uint32_t": "uint32",
+    "uint64_t": "uint64",
+    "char": "uint8",
+    "signed char": "int8",
+    "unsigned char": "uint8",
+    "bool": "bool",
+    "_Bool": "bool",
+}
+"""NumPy data types of the C element types of fixed size. `int` and `long` sizes vary by platform, and are looked up by size."""
+
+_C_INTEGER_TYPES = ("short", "int", "long", "long long")
+
+
+def _numpy() -> Any:
+    try:
+        import numpy as np  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError("numpy is required to view native arrays as NumPy arrays") from e
+    return np
+
+
+def _element_dtype(ctype: Any) -> Tuple[str, int]:
+    """Data type name and size in bytes of the elements of a typed cffi pointer or array type."""
+    if ctype.kind not in ("pointer", "array") or ctype.item.kind != "primitive":
+        raise TypeError(f"Cannot infer the element type of a native array from '{ctype.cname}'; specify the dtype")
+    name = ctype.item.cname
+    size = _ffi.sizeof(ctype.item)
+    dtype = _C_TYPES_DTYPES.get(name)
+    if dtype is None:
+        unsigned = name.startswith("unsigned ")
+        if name.removeprefix("unsigned ") not in _C_INTEGER_TYPES:
+            raise TypeError(f"No data type known for native arrays of '{name}'; specify the dtype")
+        dtype = f"{'u' if unsigned else ''}int{8 * size}"
+    return dtype, size
+
+
+def _pinned_pointer(owner: CffiNativeHandle, pointer: Any) -> Any:
+    """A `char*` holding a reference to a wrapper, released when the pointer is collected."""
+    if owner.disposed:
+        raise RuntimeError(f"{owner} has already been disposed of")
+    owner.add_ref()
+    return _ffi.gc(_ffi.cast("char*", pointer), lambda _: owner.release())
+
+
+class NativeArrayHandle(DeletableCffiNativeHandle):
+    """Reference counting wrapper of a pointer to a native array, viewable without copies.
+
+    Buffers and NumPy arrays obtained from it keep it alive: the native release happens only once the wrapper has been
+    released and the last view is collected.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase.
+        _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper.
+        _shape (Tuple[int, ...]): the shape of the array, in C order.
+        _dtype (Any): the NumPy data type of the elements.
+        _itemsize (int): the size of the elements in bytes.
+    """
+
+    __slots__ = ("_dtype", "_itemsize", "_shape")
+
+    def __init__(  # noqa: PLR0917
+        self,
+        handle: Any,
+        shape: Union[int, Sequence[int]],
+        release_native: Optional[Callable[[Any], None]],
+        dtype: Optional[Any] = None,
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """Reference counting wrapper of a pointer to a native array, viewable without copies.
+
+        Args:
+            handle (CffiData): pointer to the first element of the array.
+            shape (Union[int, Sequence[int]]): the number of elements, or the shape of the array in C (row major) order.
+            release_native (Optional[Callable[[CffiData],None]]): function releasing the native memory.
+            dtype (Optional[Any]): the NumPy data type of the elements, e.g. "float64" or a structured data type. Defaults to None, to infer it from the type of a typed pointer such as `double*`; required for `void*` and structs.
+            type_id (Optional[str]): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): The initial reference count. Defaults to 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
+
+        Raises:
+            TypeError: if the data type is not given and cannot be inferred from the pointer type.
+            ValueError: if the shape has negative dimensions.
+        """
+        self._handle = None  # read by __del__ if the checks below fail
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        if any(n < 0 for n in shape):
+            raise ValueError(f"Invalid shape {shape} for a native array")
+        if dtype is None:
+            dtype, itemsize = _element_dtype(_ffi.typeof(handle))
+        else:
+            itemsize = _numpy().dtype(dtype).itemsize
+        self._shape = shape
+        self._dtype = dtype
+        self._itemsize = itemsize
+        super().__init__(handle, release_native, type_id, prior_ref_count)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """The shape of the array, in C order."""
+        return self._shape
+
+    @property
+    def dtype(self) -> Any:
+        """The NumPy data type of the elements, as given or inferred."""
+        return self._dtype
+
+    @property
+    def size(self) -> int:
+        """The number of elements."""
+        return prod(self._shape)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the array in bytes."""
+        return prod(self._shape) * self._itemsize
+
+    def buffer(self) -> Any:
+        """A buffer over the native memory, supporting the buffer protocol, that keeps this wrapper alive.
+
+        Raises:
+            RuntimeError: if the wrapper is already disposed of.
+
+        Returns:
+            cffi buffer: the buffer, e.g. for `memoryview` or `numpy.frombuffer`.
+        """
+        return _ffi.buffer(_pinned_pointer(self, self._handle), self.nbytes)
+
+    def as_array(self, writeable: bool = True) -> Any:
+        """A NumPy array over the native memory, without copy, that keeps this wrapper alive.
+
+        Args:
+            writeable (bool, optional): whether the array can be modified, changing the native memory. Defaults to True.
+
+        Raises:
+            ImportError: if NumPy is not installed.
+            RuntimeError: if the wrapper is already disposed of.
+
+        Returns:
+            numpy.ndarray: the array, with the shape and data type of this wrapper.
+        """
+        np = _numpy()
+        a = np.frombuffer(self.buffer(), dtype=self._dtype).reshape(self._shape)
+        if not writeable:
+            a.flags.writeable = False
+        return a
+
+    def __array__(self, dtype: Any = None, copy: Optional[bool] = None) -> Any:
+        """NumPy array protocol: `numpy.asarray(handle)` is a view of the native memory, unless a copy is requested."""
+        a = self.as_array()
+        if dtype is not None and a.dtype != dtype:
+            return a.astype(dtype)
+        return a.copy() if copy else a
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Buffer protocol, from Python 3.12: `memoryview(handle)` views the native memory."""
+        return memoryview(self.buffer())
+
+    def __len__(self) -> int:
+        """Length of the first dimension."""
+        return self._shape[0] if self._shape else 1
+
+
+class StridedArrayHandle(NativeArrayHandle):
+    """Reference counting wrapper of a pointer to a native block with strides, e.g. a column major matrix or a slice.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase.
+        _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper.
+        _shape (Tuple[int, ...]): the shape of the array.
+        _dtype (Any): the NumPy data type of the elements.
+        _itemsize (int): the size of the elements in bytes.
+        _strides (Tuple[int, ...]): the number of bytes between consecutive elements, per dimension.
+    """
+
+    __slots__ = ("_strides",)
+
+    def __init__(  # noqa: PLR0917
+        self,
+        handle: Any,
+        shape: Sequence[int],
+        strides: Sequence[int],
+        release_native: Optional[Callable[[Any], None]],
+        dtype: Optional[Any] = None,
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """Reference counting wrapper of a pointer to a native block with strides.
+
+        Args:
+            handle (CffiData): pointer to the first element of the block.
+            shape (Sequence[int]): the shape of the array.
+            strides (Sequence[int]): the number of bytes between consecutive elements, per dimension, as for NumPy arrays.
+            release_native (Optional[Callable[[CffiData],None]]): function releasing the native memory.
+            dtype (Optional[Any]): the NumPy data type of the elements. Defaults to None, to infer it from the type of a typed pointer.
+            type_id (Optional[str]): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): The initial reference count. Defaults to 0.
+
+        Raises:
+            ValueError: if the strides do not match the shape, or are negative.
+        """
+        self._handle = None  # read by __del__ if the checks below fail
+        strides = tuple(strides)
+        if len(strides) != len(tuple(shape)) or any(st < 0 for st in strides):
+            raise ValueError(f"Invalid strides {strides} for a native array of shape {tuple(shape)}")
+        self._strides = strides
+        super().__init__(handle, shape, release_native, dtype, type_id, prior_ref_count)
+
+    @property
+    def strides(self) -> Tuple[int, ...]:
+        """The number of bytes between consecutive elements, per dimension."""
+        return self._strides
+
+    @property
+    def nbytes(self) -> int:
+        """The extent of the block in bytes, from the first to the last element included."""
+        if 0 in self._shape:
+            return 0
+        return sum((n - 1) * st for n, st in zip(self._shape, self._strides)) + self._itemsize
+
+    def as_array(self, writeable: bool = True) -> Any:
+        """A NumPy array over the native block, without copy, that keeps this wrapper alive.
+
+        Args:
+            writeable (bool, optional): whether the array can be modified, changing the native memory. Defaults to True.
+
+        Raises:
+            ImportError: if NumPy is not installed.
+            RuntimeError: if the wrapper is already disposed of.
+
+        Returns:
+            numpy.ndarray: the array, with the shape, strides and data type of this wrapper.
+        """
+        np = _numpy()
+        a = np.ndarray(self._shape, dtype=self._dtype, buffer=self.buffer(), strides=self._strides)
+        if not writeable:
+            a.flags.writeable = False
+        return a
+
+
+class RowPointerMatrixHandle(DeletableCffiNativeHandle):
+    """Reference counting wrapper of a native matrix stored as an array of pointers to rows, e.g. `double**`.
+
+    The rows are not contiguous, so the matrix cannot be one NumPy array without a copy. `rows` gives views of each row
+    without copies, and `to_array` gathers them into a new array with one memory copy per row.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase.
+        _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper, releasing the rows and the array of pointers.
+        _num_rows (int): the number of rows.
+        _num_columns (int): the number of elements per row.
+        _dtype (Any): the NumPy data type of the elements.
+        _itemsize (int): the size of the elements in bytes.
+    """
+
+    __slots__ = ("_dtype", "_itemsize", "_num_columns", "_num_rows")
+
+    def __init__(  # noqa: PLR0917
+        self,
+        handle: Any,
+        num_rows: int,
+        num_columns: int,
+        release_native: Optional[Callable[[Any], None]],
+        dtype: Optional[Any] = None,
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """Reference counting wrapper of a native matrix stored as an array of pointers to rows.
+
+        Args:
+            handle (CffiData): pointer to the array of pointers to rows, e.g. `double**`.
+            num_rows (int): the number of rows.
+            num_columns (int): the number of elements per row.
+            release_native (Optional[Callable[[CffiData],None]]): function releasing the matrix.
+            dtype (Optional[Any]): the NumPy data type of the elements. Defaults to None, to infer it from the type of a typed pointer such as `double**`.
+            type_id (Optional[str]): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): The initial reference count. Defaults to 0.
+
+        Raises:
+            TypeError: if the data type is not given and cannot be inferred from the pointer type.
+            ValueError: if the dimensions are negative.
+        """
+        self._handle = None  # read by __del__ if the checks below fail
+        if num_rows < 0 or num_columns < 0:
+            raise ValueError(f"Invalid dimensions {num_rows}x{num_columns} for a native matrix")
+        if dtype is None:
+            ctype = _ffi.typeof(handle)
+            if ctype.kind not in ("pointer", "array") or ctype.item.kind != "pointer":
+                raise TypeError(f"Expected a pointer to row pointers, not '{ctype.cname}'; specify the dtype")
+            dtype, itemsize = _element_dtype(ctype.item)
+        else:
+            itemsize = _numpy().dtype(dtype).itemsize
+        self._num_rows = num_rows
+        self._num_columns = num_columns
+        self._dtype = dtype
+        self._itemsize = itemsize
+        super().__init__(handle, release_native, type_id, prior_ref_count)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """The number of rows and columns."""
+        return (self._num_rows, self._num_columns)
+
+    @property
+    def dtype(self) -> Any:
+        """The NumPy data type of the elements, as given or inferred."""
+        return self._dtype
+
+    def __len__(self) -> int:
+        """The number of rows."""
+        return self._num_rows
+
+    def _row_pointers(self) -> Any:
+        handle = self._handle
+        if handle is None:
+            raise RuntimeError(f"{self} has already been disposed of")
+        return _ffi.cast("char**", handle)
+
+    def row(self, i: int, writeable: bool = True) -> Any:
+        """A NumPy array over a row, without copy, that keeps this wrapper alive.
+
+        Args:
+            i (int): the row index; negative values count from the end.
+            writeable (bool, optional): whether the array can be modified, changing the native memory. Defaults to True.
+
+        Raises:
+            IndexError: if the index is out of range.
+            RuntimeError: if the wrapper is already disposed of.
+
+        Returns:
+            numpy.ndarray: the row.
+        """
+        n = self._num_rows
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"row index out of range for a matrix of {n} rows")
+        np = _numpy()
+        row_bytes = self._num_columns * self._itemsize
+        buffer = _ffi.buffer(_pinned_pointer(self, self._row_pointers()[i]), row_bytes)
+        a = np.frombuffer(buffer, dtype=self._dtype)
+        if not writeable:
+            a.flags.writeable = False
+        return a
+
+    def rows(self) -> "RowViews":
+        """A sequence of views of the rows, created when accessed.
+
+        Returns:
+            RowViews: the rows.
+        """
+        return RowViews(self)
+
+    def to_array(self) -> Any:
+        """A new NumPy array with a copy of the matrix, gathered with one memory copy per row.
+
+        Raises:
+            ImportError: if NumPy is not installed.
+            RuntimeError: if the wrapper is already disposed of.
+
+        Returns:
+            numpy.ndarray: the array, of shape (rows, columns).
+        """
+        np = _numpy()
+        rows = self._row_pointers()
+        result = np.empty(self.shape, dtype=self._dtype)
+        if result.size == 0:
+            return result
+        destination = _ffi.from_buffer("char[]", result)
+        row_bytes = self._num_columns * self._itemsize
+        memmove = _ffi.memmove
+        for i in range(self._num_rows):
+            memmove(destination + i * row_bytes, rows[i], row_bytes)
+        return result
+
+    def __array__(self, dtype: Any = None, copy: Optional[bool] = None) -> Any:
+        """NumPy array protocol: `numpy.asarray(handle)` is a copy of the matrix, see `to_array`."""
+        if copy is False:
+            raise ValueError("A matrix stored as row pointers cannot be viewed as one array without a copy")
+        a = self.to_array()
+        return a if dtype is None else a.astype(dtype, copy=False)
+
+
+class RowViews(SequenceBase):
+    """Lazy sequence of views of the rows of a `RowPointerMatrixHandle`. It keeps the matrix alive while it exists."""
+
+    def __init__(self, matrix: RowPointerMatrixHandle) -> None:
+        """Lazy sequence of views of the rows of a `RowPointerMatrixHandle`.
+
+        Args:
+            matrix (RowPointerMatrixHandle): the matrix.
+        """
+        self._matrix = matrix
+        self._keeper = _pinned_pointer(matrix, _ffi.NULL)
+
+    def __len__(self) -> int:
+        """The number of rows."""
+        return len(self._matrix)
+
+    @overload
+    def __getitem__(self, i: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[Any]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Any:
+        """The view of a row, or a list of views for a slice."""
+        if isinstance(i, slice):
+            return [self._matrix.row(k) for k in range(*i.indices(len(self)))]
+        return self._matrix.row(i)
@@ -1,15 +1,73 @@
 """Base classes for reference counting."""
 
-from typing import Any
+import sys
+import threading
+from typing import Any, Optional, Set, Tuple
+
+_ref_count_locks: Optional[Tuple[threading.Lock, ...]] = None
+"""Striped locks guarding reference counts, or None if counts are updated without synchronization."""
+
+_releases_in_progress: Set[int] = set()
+"""Identities of the handles being released, if reference counting is atomic. See `NativeHandle._begin_release`."""
+
+
+def enable_atomic_ref_counting(stripes: int = 64) -> None:
+    """Make reference count updates atomic, so that handles can be shared and released across threads.
+
+    Counters are guarded by a fixed array of locks, the lock for a counter being selected from the object identity.
+    Threads working on different handles seldom contend for the same lock.
+
+    Args:
+        stripes (int): number of locks. It is rounded up to a power of two. Defaults to 64.
+
+    Raises:
+        ValueError: if `stripes` is not strictly positive.
+    """
+    global _ref_count_locks  # noqa: PLW0603
+    if stripes < 1:
+        raise ValueError(f"The number of lock stripes must be strictly positive, got {stripes}")
+    n = 1 << (stripes - 1).bit_length()
+    _ref_count_locks = tuple(threading.Lock() for _ in range(n))
+
+
+def disable_atomic_ref_counting() -> None:
+    """Update reference counts without synchronization. This is the default if the interpreter runs with a GIL."""
+    global _ref_count_locks  # noqa: PLW0603
+    _ref_count_locks = None
+
+
+def atomic_ref_counting_enabled() -> bool:
+    """Are reference count updates atomic.
+
+    Returns:
+        (bool): True if reference counts are updated under a lock.
+    """
+    return _ref_count_locks is not None
+
+
+def _enable_atomic_ref_counting_if_free_threaded() -> None:
+    # Free-threaded interpreters (PEP 703) do not protect the read-modify-write of a counter.
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        enable_atomic_ref_counting()
+
+
+_enable_atomic_ref_counting_if_free_threaded()
 
 
 class ReferenceCounter:
     """A base class for reference counters.
 
+    Classes in this hierarchy declare `__slots__`, so that instances do not carry a `__dict__`. This matters
+    when hundreds of thousands of handles are alive at once. Subclasses that do not declare `__slots__`
+    get an instance `__dict__` as usual, and subclasses that declare `__slots__` but still need dynamic
+    attributes can add `"__dict__"` to their own slots. Instances remain weak-referenceable.
+
     Attributes:
         reference_count (int): property getter, reference count
     """
 
+    __slots__ = ("__weakref__", "_ref_count")
+
     def __init__(self, prior_ref_count: int = 0):
         """Initialize this with an initial reference count.
 
@@ -29,7 +87,16 @@ class ReferenceCounter:
         Users usually have no need to call this method. They may have to if they
         manage cases where one native handle wrapper uses another wrapper (and its underlying resource).
         """
-        self._ref_count = self._ref_count + 1
+        locks = _ref_count_locks
+        if locks is None:
+            self._ref_count = self._ref_count + 1
+            return
+        lock = locks[(id(self) >> 4) & (len(locks) - 1)]
+        lock.acquire()
+        try:
+            self._ref_count = self._ref_count + 1
+        finally:
+            lock.release()
 
     def decrement_ref(self) -> None:
         """Manually increment the reference count.
@@ -37,7 +104,39 @@ class ReferenceCounter:
         Users usually have no need to call this method. They may have to if they
         manage cases where one native handle wrapper uses another wrapper (and its underlying resource).
         """
-        self._ref_count = self._ref_count - 1
+        locks = _ref_count_locks
+        if locks is None:
+            self._ref_count = self._ref_count - 1
+            return
+        lock = locks[(id(self) >> 4) & (len(locks) - 1)]
+        lock.acquire()
+        try:
+            self._ref_count = self._ref_count - 1
+        finally:
+            lock.release()
+
+    def _decrement_and_test(self) -> bool:
+        """Decrement the reference count, and tell whether the caller is responsible for releasing the resource.
+
+        The resource should be released once the count is down to zero or below, whether reference counting is atomic or not,
+        so that a release that did not happen, e.g. for want of a release function, is attempted again on the next decrement.
+        See `NativeHandle._begin_release` for a release by a single thread when several decrement concurrently.
+
+        Returns:
+            bool: True if the resource should be released.
+        """
+        locks = _ref_count_locks
+        if locks is None:
+            self._ref_count = self._ref_count - 1
+            return self._ref_count <= 0
+        lock = locks[(id(self) >> 4) & (len(locks) - 1)]
+        lock.acquire()
+        try:
+            count = self._ref_count
+            self._ref_count = count - 1
+        finally:
+            lock.release()
+        return count <= 1
 
 
 class NativeHandle(ReferenceCounter):
@@ -48,6 +147,8 @@ class NativeHandle(ReferenceCounter):
         _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
     """
 
+    __slots__ = ("_finalizing", "_handle")
+
     def __init__(self, handle: Any = None, prior_ref_count: int = 0):
         """Initialize a reference counter for a resource handle, with an initial reference count.
 
@@ -78,6 +179,31 @@ class NativeHandle(ReferenceCounter):
         self._handle = handle
         self._ref_count = prior_ref_count + 1
 
+    def _begin_release(self) -> bool:
+        """Claim the release of the resource, before releasing it; see `_end_release`.
+
+        If reference counting is atomic, only one of the threads releasing the resource concurrently gets the claim,
+        which rules out double frees. Otherwise the claim is always granted.
+
+        Returns:
+            bool: True if the caller may release the resource.
+        """
+        locks = _ref_count_locks
+        if locks is None:
+            return True
+        key = id(self)
+        lock = locks[(key >> 4) & (len(locks) - 1)]
+        with lock:
+            if key in _releases_in_progress:
+                return False
+            _releases_in_progress.add(key)
+        return True
+
+    def _end_release(self) -> None:
+        """Give up the claim of `_begin_release`, once the release is done or has failed."""
+        if _releases_in_progress:
+            _releases_in_progress.discard(id(self))
+
     def _is_valid_handle(self, handle: Any) -> bool:
         """Checks a handle on its suitability as a handle for this object.
 
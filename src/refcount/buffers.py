@@ -0,0 +1,263 @@
+"""Pools of reusable cffi buffers, for the out-parameters and temporary structs of native calls.
+
+A fresh `ffi.new` per call allocates and zeroes memory each time; under load this is allocator churn. A pool keeps the
+buffers handed back, by C declaration and size class, and hands them out again:
+
+```python
+from refcount.buffers import thread_buffer_pool
+
+pool = thread_buffer_pool(ffi)
+with pool.acquire("date_time_interop*") as date:
+    native_lib.get_start(series.ptr, date.ptr)
+    year = date.ptr.year
+# the buffer is back in the pool here
+
+with pool.acquire("double[]", n) as values:
+    native_lib.get_values(series.ptr, values.ptr, n)
+```
+
+Buffers are `GenericWrapper` objects, that `wrap_as_pointer_handle` returns as is and `unwrap_cffi_native_handle`
+unwraps to their cffi buffer, so that they can be passed on to native calls. Other `GenericWrapper` objects are left
+as they were by both functions. A buffer reused from the pool is zeroed when handed out, unless the caller opts out because the native call
+writes all of it. The pool only keeps up to a given number of bytes of idle buffers; buffers handed back beyond that
+are left to cffi to free.
+
+Pools do not take locks: use one pool per thread, e.g. the one `thread_buffer_pool` returns for the calling thread.
+
+Pools pay off for buffers of tens of kilobytes and more, which the native call fills, acquired with `zero=False`: this
+saves the allocation and the zeroing. `ffi.new` allocates and zeroes small buffers in C, faster than a pool implemented
+in Python hands out a buffer; see `benchmarks/bench_buffers.py`.
+"""
+
+import threading
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from typing_extensions import Self
+
+from refcount import interop
+from refcount.interop import CffiData, GenericWrapper
+
+_MIN_ARRAY_LENGTH = 8
+"""Smallest array length allocated; array lengths are rounded up to a power of two from there, the size classes."""
+
+_BufferKey = Union[str, Tuple[str, int]]
+"""Key of the buffers of a pool: the C declaration for single items, else the C declaration and the size class."""
+
+
+def _size_class(n: int) -> int:
+    return _MIN_ARRAY_LENGTH if n <= _MIN_ARRAY_LENGTH else 1 << (n - 1).bit_length()
+
+
+@dataclass
+class BufferPoolStatistics:
+    """Dataclass with the counters of a buffer pool."""
+
+    hits: int = 0
+    """Number of buffers handed out from the pool."""
+    misses: int = 0
+    """Number of buffers newly allocated, for want of one in the pool."""
+    discarded: int = 0
+    """Number of buffers handed back but not kept, as the pool was full."""
+    pooled_bytes: int = 0
+    """Bytes of the idle buffers in the pool."""
+    pooled_buffers: int = 0
+    """Number of idle buffers in the pool."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Proportion of the buffers handed out that came from the pool, 0 if none were."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PooledBuffer(GenericWrapper):
+    """A cffi buffer of a `BufferPool`, handed back to the pool on exit of a `with` block or by `release`.
+
+    The buffer must not be used once handed back, as it may be handed out again.
+    """
+
+    __slots__ = ("_idle", "_key", "_nbytes", "_pool", "length")
+
+    def __init__(self, handle: "CffiData", pool: "BufferPool", key: _BufferKey, nbytes: int) -> None:
+        """A cffi buffer of a `BufferPool`.
+
+        Args:
+            handle (CffiData): the buffer, as allocated by `ffi.new`.
+            pool (BufferPool): the pool it belongs to.
+            key (Union[str, Tuple[str, int]]): C declaration, and size class for arrays, of the buffer.
+            nbytes (int): size of the buffer in bytes.
+        """
+        super().__init__(handle)
+        self._pool = pool
+        self._key = key
+        self._nbytes = nbytes
+        self._idle = False
+        self.length = 0
+        """Number of elements requested, for arrays; 0 for other types. The buffer may be larger."""
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the buffer in bytes."""
+        return self._nbytes
+
+    def release(self) -> None:
+        """Hand the buffer back to its pool."""
+        self._pool.release(self)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._pool.release(self)
+
+
+def _buffer(buffer: PooledBuffer) -> "CffiData":
+    return buffer._handle
+
+
+interop._unwrap_functions.register(PooledBuffer, _buffer)
+interop._pointer_handle_functions.register(PooledBuffer, interop._as_is)
+
+
+class BufferPool:
+    """Reusable cffi buffers, by C declaration and size class. Not thread safe; see `thread_buffer_pool`."""
+
+    def __init__(self, ffi: Any, max_bytes: int = 1 << 20) -> None:
+        """Reusable cffi buffers, by C declaration and size class.
+
+        Args:
+            ffi (FFI): the cffi interface allocating the buffers, which knows the C types requested.
+            max_bytes (int, optional): maximum total size of the idle buffers kept. Defaults to 1 MiB.
+
+        Raises:
+            ValueError: if `max_bytes` is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"The maximum size of a buffer pool must be positive, not {max_bytes}")
+        self.ffi = ffi
+        self.max_bytes = max_bytes
+        self._free: Dict[_BufferKey, List[PooledBuffer]] = {}
+        self._zeros: Dict[int, bytes] = {}
+        self._pooled_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._discarded = 0
+
+    def acquire(self, cdecl: str, length: Optional[int] = None, zero: bool = True) -> PooledBuffer:
+        """Get a buffer, from the pool if one of the size class is idle, else newly allocated.
+
+        Args:
+            cdecl (str): C declaration of the buffer, as for `ffi.new`: a pointer type such as "date_time_interop*" or
+                "char**" for one item, or an array type such as "double[]" with `length`.
+            length (Optional[int]): number of elements of an array type. The buffer may have more. Defaults to None.
+            zero (bool, optional): zero the memory of a buffer reused from the pool. False saves the time when the native
+                call writes all the memory used. Defaults to True.
+
+        Returns:
+            PooledBuffer: the buffer, to use in a `with` block, or to hand back with `release`.
+        """
+        # the hit path is what the pool is for; keep it to a few dictionary and attribute accesses
+        if length is None:
+            key: _BufferKey = cdecl
+            free = self._free.get(cdecl)
+        else:
+            size = _size_class(length)
+            key = (cdecl, size)
+            free = self._free.get(key)
+        if free:
+            buffer = free.pop()
+            buffer._idle = False
+            self._hits += 1
+            nbytes = buffer._nbytes
+            self._pooled_bytes -= nbytes
+            if zero:
+                zeros = self._zeros.get(nbytes)
+                if zeros is None:
+                    zeros = self._zeros[nbytes] = bytes(nbytes)
+                self.ffi.memmove(buffer._handle, zeros, nbytes)
+        else:
+            self._misses += 1
+            ffi = self.ffi
+            if length is None:
+                memory = ffi.new(cdecl)
+                nbytes = ffi.sizeof(ffi.typeof(memory).item)
+            else:
+                memory = ffi.new(cdecl, size)
+                nbytes = ffi.sizeof(memory)
+            buffer = PooledBuffer(memory, self, key, nbytes)
+        buffer.length = length or 0
+        return buffer
+
+    def release(self, buffer: PooledBuffer) -> None:
+        """Hand a buffer back to the pool, unless the pool is full.
+
+        Args:
+            buffer (PooledBuffer): the buffer, acquired from this pool.
+
+        Raises:
+            ValueError: if the buffer belongs to another pool, or was already handed back.
+        """
+        if buffer._pool is not self:
+            raise ValueError("The buffer was acquired from another pool")
+        if buffer._idle:
+            raise ValueError("The buffer was already handed back to the pool")
+        nbytes = buffer._nbytes
+        if self._pooled_bytes + nbytes > self.max_bytes:
+            self._discarded += 1
+            return
+        self._pooled_bytes += nbytes
+        buffer._idle = True
+        free = self._free.get(buffer._key)
+        if free is None:
+            self._free[buffer._key] = [buffer]
+        else:
+            free.append(buffer)
+
+    def clear(self) -> None:
+        """Let go of the idle buffers of the pool."""
+        self._free.clear()
+        self._zeros.clear()
+        self._pooled_bytes = 0
+
+    def statistics(self) -> BufferPoolStatistics:
+        """Counters of the pool since it was created.
+
+        Returns:
+            BufferPoolStatistics: a copy of the counters.
+        """
+        return BufferPoolStatistics(
+            hits=self._hits,
+            misses=self._misses,
+            discarded=self._discarded,
+            pooled_bytes=self._pooled_bytes,
+            pooled_buffers=sum(len(free) for free in self._free.values()),
+        )
+
+
+_thread_pools = threading.local()
+
+
+def thread_buffer_pool(ffi: Any, max_bytes: int = 1 << 20) -> BufferPool:
+    """The buffer pool of the calling thread for a cffi interface, created on first use.
+
+    Args:
+        ffi (FFI): the cffi interface allocating the buffers.
+        max_bytes (int, optional): maximum total size of the idle buffers kept, for a pool created by this call. Defaults to 1 MiB.
+
+    Returns:
+        BufferPool: the pool.
+    """
+    pools: Optional[Dict[int, BufferPool]] = getattr(_thread_pools, "pools", None)
+    if pools is None:
+        pools = _thread_pools.pools = {}
+    pool = pools.get(id(ffi))
+    if pool is None or pool.ffi is not ffi:
+        pool = pools[id(ffi)] = BufferPool(ffi, max_bytes)
+    return pool
@@ -0,0 +1,246 @@
+"""Arrays of `date_time_interop` and `interval_interop` structs as NumPy structured arrays, and their conversion to and from `datetime64[s]`.
+
+The structs are the ones C APIs built along the lines of the test native library use for time axes:
+
+```c
+typedef struct _date_time_interop {
+    int year; int month; int day; int hour; int minute; int second;
+} date_time_interop;
+
+typedef struct _interval_interop {
+    date_time_interop start; date_time_interop end;
+} interval_interop;
+```
+
+```python
+from refcount.arrays import NativeArrayHandle
+from refcount.datetime_interop import date_time_interop_dtype, to_datetime64
+
+dates = NativeArrayHandle(
+    native_lib.get_time_axis(series), n, native_lib.free, dtype=date_time_interop_dtype()
+)
+times = to_datetime64(dates.as_array())  # datetime64[s], no per element Python work
+```
+
+Conversions are vectorized, with calendar arithmetic on integers (proleptic Gregorian calendar, as NumPy), processed in
+chunks that fit in the processor caches. Regular time steps have faster paths, `regular_time_axis` and `time_axis_to_structs`.
+NumPy is required by this module; it is installed with the `numpy` extra, `pip install refcount[numpy]`.
+`NaT` (not a time) has no struct representation, and is rejected by the conversions to structs.
+"""
+
+from functools import cache
+from typing import Any, Optional
+
+import numpy as np
+
+from refcount.interop import _ffi
+
+_FIELDS = ("year", "month", "day", "hour", "minute", "second")
+
+_CHUNK = 1 << 16
+"""Number of elements converted at once, so that the temporary arrays stay in the processor caches."""
+
+_SECONDS_PER_DAY = 86400
+
+
+@cache
+def date_time_interop_dtype() -> np.dtype:
+    """NumPy structured data type with the memory layout of `date_time_interop`.
+
+    Returns:
+        np.dtype: the data type, with int32 fields year, month, day, hour, minute, second.
+    """
+    return np.dtype([(name, np.intc) for name in _FIELDS], align=True)
+
+
+@cache
+def interval_interop_dtype() -> np.dtype:
+    """NumPy structured data type with the memory layout of `interval_interop`.
+
+    Returns:
+        np.dtype: the data type, with `date_time_interop_dtype` fields start and end.
+    """
+    dt = date_time_interop_dtype()
+    return np.dtype([("start", dt), ("end", dt)], align=True)
+
+
+def structured_view(pointer: Any, n: int, dtype: Any) -> np.ndarray:
+    """A structured array over native structs, without copy.
+
+    The array does not keep the native memory alive; use `refcount.arrays.NativeArrayHandle` with the same data type for that.
+
+    Args:
+        pointer (CffiData): cffi pointer to the first struct.
+        n (int): the number of structs.
+        dtype (Any): the structured data type, e.g. `date_time_interop_dtype()`.
+
+    Raises:
+        ValueError: if `pointer` is a typed pointer to structs of a different size than `dtype`.
+
+    Returns:
+        np.ndarray: the structured array.
+    """
+    dtype = np.dtype(dtype)
+    ctype = _ffi.typeof(pointer)
+    if ctype.kind in ("pointer", "array") and ctype.item.kind == "struct" and _ffi.sizeof(ctype.item) != dtype.itemsize:
+        raise ValueError(f"'{ctype.item.cname}' is {_ffi.sizeof(ctype.item)} bytes, the data type {dtype.itemsize}")
+    return np.frombuffer(_ffi.buffer(pointer, n * dtype.itemsize), dtype=dtype)
+
+
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    # http://howardhinnant.github.io/date_algorithms.html; months are counted from March
+    y = year - (month <= 2)  # noqa: PLR2004
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9).astype(np.int32)) + 2) // 5 + day - 1  # noqa: PLR2004
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _civil_from_days(days: np.ndarray, out: np.ndarray) -> None:
+    # http://howardhinnant.github.io/date_algorithms.html; months are counted from March
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    out["day"] = doy - (153 * mp + 2) // 5 + 1
+    month = mp + np.where(mp < 10, 3, -9).astype(np.int32)  # noqa: PLR2004
+    out["month"] = month
+    out["year"] = yoe + era * 400 + (month <= 2)  # noqa: PLR2004
+
+
+def _set_time_of_day(seconds: np.ndarray, out: np.ndarray) -> None:
+    hour, rest = np.divmod(seconds, 3600)
+    out["hour"] = hour
+    out["minute"], out["second"] = np.divmod(rest, 60)
+
+
+def to_datetime64(structs: np.ndarray, regular: bool = False) -> np.ndarray:
+    """Convert `date_time_interop` structs to `datetime64[s]` values.
+
+    Args:
+        structs (np.ndarray): array with the fields of `date_time_interop_dtype`, e.g. a view of native memory.
+        regular (bool, optional): the time steps are known to be regular: only the first two and the last structs are
+            converted, and the values computed from the time step. Defaults to False.
+
+    Raises:
+        ValueError: if `regular` is True but the last struct is not consistent with the first time step.
+
+    Returns:
+        np.ndarray: the `datetime64[s]` values.
+    """
+    n = len(structs)
+    if regular and n > 2:  # noqa: PLR2004
+        ends = to_datetime64(structs[[0, 1, n - 1]])
+        result = regular_time_axis(ends[0], ends[1] - ends[0], n)
+        if result[-1] != ends[2]:
+            raise ValueError(f"Time steps are not regular: expected {result[-1]} for the last time, got {ends[2]}")
+        return result
+    seconds = np.empty(n, dtype=np.int64)
+    for i in range(0, n, _CHUNK):
+        s = structs[i : i + _CHUNK]
+        days = _days_from_civil(s["year"], s["month"], s["day"]).astype(np.int64)
+        days *= _SECONDS_PER_DAY
+        days += s["hour"] * 3600 + s["minute"] * 60 + s["second"]
+        seconds[i : i + _CHUNK] = days
+    return seconds.view("datetime64[s]")
+
+
+def from_datetime64(values: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert `datetime64` values to `date_time_interop` structs.
+
+    Args:
+        values (np.ndarray): the values; any `datetime64` unit, truncated to seconds.
+        out (Optional[np.ndarray]): array with the fields of `date_time_interop_dtype` to write to, e.g. a view of native memory. Defaults to None, for a new array.
+
+    Raises:
+        ValueError: if `out` does not have the length of `values`, or if a value is `NaT`.
+
+    Returns:
+        np.ndarray: the structs, `out` if given.
+    """
+    times = np.asarray(values).astype("datetime64[s]", copy=False)
+    if np.isnat(times).any():
+        raise ValueError("NaT values cannot be converted to date_time_interop structs")
+    seconds = times.view(np.int64)
+    n = len(seconds)
+    if out is None:
+        out = np.empty(n, dtype=date_time_interop_dtype())
+    elif len(out) != n:
+        raise ValueError(f"Cannot write {n} values to {len(out)} structs")
+    for i in range(0, n, _CHUNK):
+        days, time_of_day = np.divmod(seconds[i : i + _CHUNK], _SECONDS_PER_DAY)
+        chunk = out[i : i + _CHUNK]
+        _civil_from_days(days.astype(np.int32), chunk)
+        _set_time_of_day(time_of_day.astype(np.int32), chunk)
+    return out
+
+
+def regular_time_axis(start: Any, step: Any, n: int) -> np.ndarray:
+    """`datetime64[s]` values of a regular time axis.
+
+    Args:
+        start (Any): the first time, anything `numpy.datetime64` accepts, e.g. a `datetime`.
+        step (Any): the time step, anything `numpy.timedelta64` accepts, e.g. a `timedelta`.
+        n (int): the number of time steps.
+
+    Returns:
+        np.ndarray: the values.
+    """
+    first = np.datetime64(start, "s").astype(np.int64)
+    step_seconds = np.timedelta64(step, "s").astype(np.int64)
+    return (first + np.arange(n, dtype=np.int64) * step_seconds).view("datetime64[s]")
+
+
+def time_axis_to_structs(start: Any, step: Any, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """`date_time_interop` structs of a regular time axis.
+
+    When the time step divides a day, or is a whole number of days, calendar dates are computed once per day
+    rather than once per time step.
+
+    Args:
+        start (Any): the first time, anything `numpy.datetime64` accepts.
+        step (Any): the time step, anything `numpy.timedelta64` accepts.
+        n (int): the number of time steps.
+        out (Optional[np.ndarray]): array with the fields of `date_time_interop_dtype` to write to. Defaults to None, for a new array.
+
+    Raises:
+        ValueError: if `out` does not have `n` elements, or if `start` or `step` is `NaT`.
+
+    Returns:
+        np.ndarray: the structs, `out` if given.
+    """
+    start_time = np.datetime64(start, "s")
+    step_time = np.timedelta64(step, "s")
+    if np.isnat(start_time) or np.isnat(step_time):
+        raise ValueError("A time axis starting at or stepping by NaT cannot be converted to date_time_interop structs")
+    first = int(start_time.astype(np.int64))
+    step_seconds = int(step_time.astype(np.int64))
+    if step_seconds <= 0 or n == 0 or (_SECONDS_PER_DAY % step_seconds and step_seconds % _SECONDS_PER_DAY):
+        return from_datetime64(regular_time_axis(start, step, n), out)
+    if out is None:
+        out = np.empty(n, dtype=date_time_interop_dtype())
+    elif len(out) != n:
+        raise ValueError(f"Cannot write {n} values to {len(out)} structs")
+    first_day, first_time = divmod(first, _SECONDS_PER_DAY)
+    if step_seconds % _SECONDS_PER_DAY == 0:
+        # same time of day throughout; one date per time step, without the time of day arithmetic
+        _civil_from_days(first_day + np.arange(n, dtype=np.int32) * (step_seconds // _SECONDS_PER_DAY), out)
+        _set_time_of_day(np.full(1, first_time, dtype=np.int32), out)
+        return out
+    # several time steps per day: dates for each day and times of one day, repeated over the time steps
+    steps_per_day = _SECONDS_PER_DAY // step_seconds
+    offset = first_time // step_seconds
+    phase = first_time - offset * step_seconds
+    num_days = (offset + n - 1) // steps_per_day + 1
+    dates = np.empty(num_days, dtype=date_time_interop_dtype())
+    _civil_from_days(first_day + np.arange(num_days, dtype=np.int32), dates)
+    times = np.empty(steps_per_day, dtype=date_time_interop_dtype())
+    _set_time_of_day(phase + np.arange(steps_per_day, dtype=np.int32) * step_seconds, times)
+    for name in ("year", "month", "day"):
+        out[name] = np.repeat(dates[name], steps_per_day)[offset : offset + n]
+    for name in ("hour", "minute", "second"):
+        out[name] = np.tile(times[name], num_days)[offset : offset + n]
+    return out
@@ -0,0 +1,242 @@
+"""Deferred release of native resources, by a background thread.
+
+Native release functions may be slow, e.g. if they flush buffers. By default they run wherever
+a reference count reaches zero, including inside `__del__` called by the garbage collector.
+Once deferred release is enabled, handles instead queue the raw pointer and its release function,
+and a worker thread releases queued resources by batches.
+
+```python
+from refcount.deferred import enable_deferred_release, flush
+
+enable_deferred_release(max_queue_depth=10000)
+# ... handles reaching a zero reference count are released by the worker thread
+flush()  # wait until all queued resources are released
+```
+"""
+
+import atexit
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from refcount import interop
+
+_ReleaseItem = Tuple[Callable[[Any], None], Any, Optional[str]]
+
+
+class DeferredReleaseQueue:
+    """A queue of native resources to release, drained by a dedicated worker thread.
+
+    Items of a batch sharing a type identifier for which a bulk release function is registered
+    (see `refcount.interop.register_bulk_release`) are released with a single native call, if the bulk
+    function stands for their release function. Other items are released one by one.
+    """
+
+    def __init__(self, max_queue_depth: int = 10000, batch_size: int = 256) -> None:
+        """A queue of native resources to release, drained by a dedicated worker thread.
+
+        Args:
+            max_queue_depth (int): maximum number of pending items. Threads submitting more items block until the worker catches up.
+            batch_size (int): maximum number of items the worker takes from the queue at once.
+
+        Raises:
+            ValueError: if the queue depth or batch size are not strictly positive.
+        """
+        if max_queue_depth < 1:
+            raise ValueError(f"max_queue_depth must be strictly positive, got {max_queue_depth}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be strictly positive, got {batch_size}")
+        self._max_queue_depth = max_queue_depth
+        self._batch_size = batch_size
+        self._queue: Deque[_ReleaseItem] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._submitted = 0
+        self._released = 0
+        self._batches = 0
+        self._errors: List[BaseException] = []
+        self._worker = threading.Thread(target=self._run, name="refcount-deferred-release", daemon=True)
+        self._worker.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of items submitted but not yet released."""
+        return self._submitted - self._released
+
+    @property
+    def closed(self) -> bool:
+        """Has this queue been closed."""
+        return self._closed
+
+    def stats(self) -> Dict[str, int]:
+        """Counters about the activity of this queue.
+
+        Returns:
+            Dict[str, int]: items submitted, released and pending, number of batches and of failed releases.
+        """
+        with self._condition:
+            return {
+                "submitted": self._submitted,
+                "released": self._released,
+                "pending": self._submitted - self._released,
+                "batches": self._batches,
+                "errors": len(self._errors),
+            }
+
+    def submit(self, release_native: Callable[[Any], None], handle: Any, type_id: Optional[str] = None) -> None:
+        """Queue a native resource for release. Blocks while the queue is full.
+
+        The resource is released immediately if called from the worker thread, or if the queue is closed.
+
+        Args:
+            release_native (Callable[[CffiData],None]): the native function releasing the resource.
+            handle (CffiData): the pointer to the native resource.
+            type_id (Optional[str]): identifier for the type of underlying resource.
+        """
+        if self._closed or threading.current_thread() is self._worker:
+            release_native(handle)
+            return
+        with self._condition:
+            while len(self._queue) >= self._max_queue_depth and not self._closed:
+                self._condition.wait()
+            if not self._closed:
+                self._queue.append((release_native, handle, type_id))
+                self._submitted += 1
+                self._condition.notify_all()
+                return
+        # closed while waiting for room in the queue
+        release_native(handle)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every item submitted so far has been released.
+
+        Args:
+            timeout (Optional[float]): maximum time to wait in seconds. Defaults to None, waiting as long as needed.
+
+        Raises:
+            RuntimeError: if a native release function raised an exception since the last flush. The first exception is chained.
+
+        Returns:
+            bool: True if all items were released, False if the timeout expired.
+        """
+        with self._condition:
+            target = self._submitted
+            done = self._condition.wait_for(lambda: self._released >= target, timeout)
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError(f"{len(errors)} deferred native release(s) failed") from errors[0]
+        return done
+
+    def close(self) -> None:
+        """Release all pending items and stop the worker thread. Items submitted afterwards are released immediately."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if threading.current_thread() is not self._worker:
+            self._worker.join()
+
+    def _run(self) -> None:
+        queue = self._queue
+        condition = self._condition
+        while True:
+            with condition:
+                while not queue and not self._closed:
+                    condition.wait()
+                if not queue:
+                    return
+                n = min(len(queue), self._batch_size)
+                batch = [queue.popleft() for _ in range(n)]
+                # room was made in the queue for blocked submitters
+                condition.notify_all()
+            errors = self._release_batch(batch)
+            with condition:
+                self._released += n
+                self._batches += 1
+                self._errors.extend(errors)
+                condition.notify_all()
+
+    @staticmethod
+    def _release_batch(batch: List[_ReleaseItem]) -> List[BaseException]:
+        errors: List[BaseException] = []
+        groups: Dict[Any, List[Any]] = {}
+        for release_native, handle, type_id in batch:
+            bulk_release = interop._bulk_release_function(type_id, release_native) if type_id is not None else None
+            if bulk_release is not None:
+                groups.setdefault(bulk_release, []).append(handle)
+                continue
+            try:
+                release_native(handle)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+        for bulk_release, handles in groups.items():
+            try:
+                bulk_release(interop._ffi.new("void*[]", handles), len(handles))
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+        return errors
+
+
+_queue: Optional[DeferredReleaseQueue] = None
+_previous_dispatcher: Optional[interop.ReleaseDispatcher] = None
+
+
+def enable_deferred_release(max_queue_depth: int = 10000, batch_size: int = 256) -> DeferredReleaseQueue:
+    """Defer the release of native resources to a background thread.
+
+    Applies to `DeletableCffiNativeHandle` and subclasses that do not override how native resources are released.
+    Pending items are released when the interpreter exits. If deferred release is already enabled, the current queue is drained and replaced.
+
+    Args:
+        max_queue_depth (int): maximum number of pending items. Threads submitting more items block until the worker catches up.
+        batch_size (int): maximum number of items the worker takes from the queue at once.
+
+    Returns:
+        DeferredReleaseQueue: the queue now receiving the releases.
+    """
+    global _queue, _previous_dispatcher  # noqa: PLW0603
+    if _queue is not None:
+        disable_deferred_release()
+    queue = DeferredReleaseQueue(max_queue_depth, batch_size)
+    _previous_dispatcher = interop.set_release_dispatcher(queue.submit)
+    _queue = queue
+    return queue
+
+
+def disable_deferred_release() -> None:
+    """Release pending items, stop the worker thread, and release native resources synchronously again."""
+    global _queue  # noqa: PLW0603
+    queue = _queue
+    if queue is None:
+        return
+    interop.set_release_dispatcher(_previous_dispatcher)
+    _queue = None
+    queue.close()
+
+
+def deferred_release_queue() -> Optional[DeferredReleaseQueue]:
+    """The queue receiving releases, if deferred release is enabled.
+
+    Returns:
+        Optional[DeferredReleaseQueue]: the current queue, or None.
+    """
+    return _queue
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Wait until all native resources queued so far are released. Returns immediately if deferred release is not enabled.
+
+    Args:
+        timeout (Optional[float]): maximum time to wait in seconds. Defaults to None, waiting as long as needed.
+
+    Returns:
+        bool: True if all items were released, False if the timeout expired.
+    """
+    queue = _queue
+    if queue is None:
+        return True
+    return queue.flush(timeout)
+
+
+atexit.register(disable_deferred_release)
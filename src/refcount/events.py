@@ -0,0 +1,285 @@
+"""A timeline of lifecycle events of native handles, kept in a ring buffer and exportable as a Chrome trace.
+
+```python
+from refcount import events
+
+events.start_recording(capacity=100_000)
+# ... run the workload
+events.stop_recording()
+# open in chrome://tracing or https://ui.perfetto.dev
+events.export_chrome_trace("handles.json")
+```
+
+Four events are recorded: `create` when a wrapper gets its native handle, `add_ref` and `release` when its reference count
+is incremented and decremented, and `dispose` when its native resource is released. Each handle is shown in the trace as
+an asynchronous slice from creation to disposal, on the thread that created it. The address of the native resource is
+recorded for all events but `dispose`; events of a handle share its lifecycle key.
+
+Records have a fixed size and are written in a preallocated buffer; once it is full, the oldest records are overwritten.
+Writing does not take a lock.
+"""
+
+import json
+import threading
+from array import array
+from dataclasses import dataclass
+from itertools import count
+from time import perf_counter_ns
+from typing import IO, Any, Dict, List, Optional, Union
+
+from refcount.interop import LifecycleObserver, _ffi, add_lifecycle_observer, remove_lifecycle_observer
+
+CREATE = 0
+"""Event code: a wrapper got its native handle."""
+ADD_REF = 1
+"""Event code: the reference count of a wrapper was incremented."""
+RELEASE = 2
+"""Event code: the reference count of a wrapper is decremented."""
+DISPOSE = 3
+"""Event code: the native resource of a wrapper was released."""
+
+EVENT_NAMES = ("create", "add_ref", "release", "dispose")
+"""Names of the events, by code."""
+
+_FIELDS = 6  # timestamp, event, type id index, address, thread id, lifecycle key
+
+
+@dataclass
+class LifecycleEvent:
+    """Dataclass describing a recorded lifecycle event."""
+
+    timestamp_ns: int
+    """Time of the event, from `time.perf_counter_ns`."""
+    event: str
+    """Name of the event, one of `EVENT_NAMES`."""
+    type_id: Optional[str]
+    """Type identifier of the wrapper, if known."""
+    address: int
+    """Address of the native resource; always 0 for `dispose` events, see the `create` event with the same key."""
+    thread_id: int
+    """Identifier of the thread, from `threading.get_ident`."""
+    key: int
+    """Lifecycle key of the wrapper, identifying it across its events."""
+
+
+def _address(handle: Any) -> int:
+    try:
+        return int(_ffi.cast("uintptr_t", handle._handle))
+    except TypeError:
+        return 0
+
+
+class EventRecorder(LifecycleObserver):
+    """Records lifecycle events of handles in a ring buffer of fixed size records."""
+
+    def __init__(self, capacity: int = 65536) -> None:
+        """Records lifecycle events of handles in a ring buffer of fixed size records.
+
+        Args:
+            capacity (int, optional): maximum number of events kept; older events are overwritten. Defaults to 65536.
+
+        Raises:
+            ValueError: if the capacity is not strictly positive.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be strictly positive, got {capacity}")
+        self.capacity = capacity
+        self._records = array("q", bytes(8 * _FIELDS * capacity))
+        # next() on itertools.count is atomic, so that concurrent writers get distinct slots without a lock
+        self._counter = count()
+        self._written = 0
+        self._type_ids: Dict[Optional[str], int] = {}
+        self._type_id_list: List[Optional[str]] = []
+        self._type_id_lock = threading.Lock()
+
+    def _type_index(self, type_id: Optional[str]) -> int:
+        with self._type_id_lock:
+            index = self._type_ids.get(type_id)
+            if index is None:
+                # append first, so that readers never see an index beyond the list
+                self._type_id_list.append(type_id)
+                index = self._type_ids[type_id] = len(self._type_id_list) - 1
+        return index
+
+    def _write(self, event: int, type_id: Optional[str], address: int, key: int) -> None:
+        i = next(self._counter)
+        offset = (i % self.capacity) * _FIELDS
+        records = self._records
+        records[offset] = perf_counter_ns()
+        records[offset + 1] = event
+        type_index = self._type_ids.get(type_id)
+        records[offset + 2] = self._type_index(type_id) if type_index is None else type_index
+        # addresses and keys are unsigned; store their bit pattern in the signed array
+        records[offset + 3] = address - (1 << 64) if address >= (1 << 63) else address
+        records[offset + 4] = threading.get_ident() & 0x7FFFFFFFFFFFFFFF
+        records[offset + 5] = key - (1 << 64) if key >= (1 << 63) else key
+        self._written = i + 1
+
+    def on_created(self, handle: Any) -> None:
+        """Record a `create` event.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        self._write(CREATE, handle._type_id, _address(handle), handle._lifecycle_key())
+
+    def on_add_ref(self, handle: Any) -> None:
+        """Record an `add_ref` event.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        self._write(ADD_REF, handle._type_id, _address(handle), handle._lifecycle_key())
+
+    def on_decrement(self, handle: Any) -> None:
+        """Record a `release` event.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        self._write(RELEASE, handle._type_id, _address(handle), handle._lifecycle_key())
+
+    def on_released(self, key: int, type_id: Optional[str], elapsed_ns: int) -> None:  # noqa: ARG002
+        """Record a `dispose` event, with an address of 0: the pointer is already cleared, or its wrapper collected.
+
+        Args:
+            key (int): the lifecycle key of the wrapper.
+            type_id (Optional[str]): the type identifier of the wrapper.
+            elapsed_ns (int): time taken by the release in nanoseconds.
+        """
+        self._write(DISPOSE, type_id, 0, key)
+
+    @property
+    def num_recorded(self) -> int:
+        """Number of events recorded since the start, including those overwritten."""
+        return self._written
+
+    def events(self) -> List[LifecycleEvent]:
+        """The events currently in the buffer, oldest first.
+
+        Returns:
+            List[LifecycleEvent]: the events.
+        """
+        written = self._written
+        first = max(0, written - self.capacity)
+        records = self._records
+        type_ids = list(self._type_id_list)
+        result = []
+        for i in range(first, written):
+            offset = (i % self.capacity) * _FIELDS
+            ts, event, type_index, address, thread_id, key = records[offset : offset + _FIELDS]
+            result.append(
+                LifecycleEvent(
+                    ts,
+                    EVENT_NAMES[event],
+                    type_ids[type_index] if type_index < len(type_ids) else None,
+                    address & 0xFFFFFFFFFFFFFFFF,
+                    thread_id,
+                    key & 0xFFFFFFFFFFFFFFFF,
+                ),
+            )
+        return result
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The events currently in the buffer, in the Chrome trace event format.
+
+        Returns:
+            Dict[str, Any]: the trace, to serialize as JSON.
+        """
+        trace_events = []
+        phases = {"create": "b", "add_ref": "n", "release": "n", "dispose": "e"}
+        creators: Dict[int, int] = {}
+        for e in self.events():
+            # async events are matched by category and id; keep each handle on the thread that created it
+            if e.event == "create":
+                creators[e.key] = e.thread_id
+            tid = creators.get(e.key, e.thread_id)
+            if e.event == "dispose":
+                creators.pop(e.key, None)
+            args: Dict[str, Any] = {"thread": e.thread_id}
+            if e.address:
+                args["address"] = hex(e.address)
+            if e.type_id is not None:
+                args["type_id"] = e.type_id
+            trace_events.append(
+                {
+                    "name": e.event if e.event not in ("create", "dispose") else (e.type_id or "handle"),
+                    "cat": "refcount",
+                    "ph": phases[e.event],
+                    "id": hex(e.key),
+                    "ts": e.timestamp_ns / 1000.0,
+                    "pid": 1,
+                    "tid": tid,
+                    "args": args,
+                },
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ns"}
+
+    def clear(self) -> None:
+        """Discard the events recorded so far."""
+        self._counter = count()
+        self._written = 0
+
+
+_recorder: Optional[EventRecorder] = None
+
+
+def start_recording(capacity: int = 65536) -> EventRecorder:
+    """Start recording lifecycle events of handles. Restarts recording, with an empty buffer, if already started.
+
+    Args:
+        capacity (int, optional): maximum number of events kept; older events are overwritten. Defaults to 65536.
+
+    Returns:
+        EventRecorder: the recorder in use.
+    """
+    global _recorder  # noqa: PLW0603
+    stop_recording()
+    recorder = EventRecorder(capacity)
+    _recorder = recorder
+    add_lifecycle_observer(recorder)
+    return recorder
+
+
+def stop_recording() -> Optional[EventRecorder]:
+    """Stop recording lifecycle events. The events recorded remain available for export.
+
+    Returns:
+        Optional[EventRecorder]: the recorder that was in use, if any.
+    """
+    recorder = _recorder
+    if recorder is not None:
+        remove_lifecycle_observer(recorder)
+    return recorder
+
+
+def recorder() -> Optional[EventRecorder]:
+    """The last recorder started, if any, whether still recording or stopped.
+
+    Returns:
+        Optional[EventRecorder]: the recorder.
+    """
+    return _recorder
+
+
+def export_chrome_trace(destination: Union[str, IO[str]]) -> int:
+    """Write the events of the last recorder started as a Chrome trace JSON file, for chrome://tracing or Perfetto.
+
+    Args:
+        destination (Union[str, IO[str]]): a file name, or a text stream.
+
+    Raises:
+        RuntimeError: if recording was never started.
+
+    Returns:
+        int: the number of events written.
+    """
+    if _recorder is None:
+        raise RuntimeError("No lifecycle events have been recorded; see start_recording")
+    trace = _recorder.chrome_trace()
+    if isinstance(destination, str):
+        with open(destination, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+    else:
+        json.dump(trace, destination)
+    return len(trace["traceEvents"])
@@ -1,9 +1,17 @@
 """Implementation of reference counting classes for external resources accessed via interoperability software such as cffi."""
 
-from typing import Any, Callable, Dict, Optional, Union
+import sys
+import threading
+import weakref
+from collections.abc import Sequence
+from dataclasses import dataclass
+from inspect import signature
+from time import perf_counter_ns
+from types import TracebackType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, overload
 
 from cffi import FFI
-from typing_extensions import TypeAlias
+from typing_extensions import Self, TypeAlias
 
 from refcount.base import NativeHandle
 
@@ -15,6 +23,112 @@ CffiData: TypeAlias = Any
 FFI.CData is a type, but it seems it cannot be used in type hinting.
 """
 
+_ffi = FFI()
+"""FFI instance for the few cffi objects this module creates itself, e.g. arrays of pointers."""
+
+
+class LifecycleObserver:
+    """Base class for objects notified when wrappers get their native handle, and when they release their native resource.
+
+    See `add_lifecycle_observer`. Notifications are made on the thread creating or releasing the handle, and must be cheap.
+    """
+
+    def on_created(self, handle: "CffiNativeHandle") -> None:
+        """Called when a wrapper has been given its native handle.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper. Its `_lifecycle_key()` identifies it in the call to `on_released`.
+        """
+
+    def on_released(self, key: int, type_id: Optional[str], elapsed_ns: int) -> None:
+        """Called when the native resource of a wrapper has been released.
+
+        Args:
+            key (int): the lifecycle key of the wrapper, as returned by its `_lifecycle_key()` when created.
+            type_id (Optional[str]): the type identifier of the wrapper, None if released after the wrapper was collected.
+            elapsed_ns (int): time taken by the release in nanoseconds; for a bulk release, the time per handle.
+                If releases are dispatched, e.g. deferred, this is the time taken to dispatch.
+        """
+
+    def on_add_ref(self, handle: "CffiNativeHandle") -> None:
+        """Called when the reference count of a wrapper has been incremented.
+
+        Only observers overriding this method or `on_decrement` are notified of reference count changes.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+
+    def on_decrement(self, handle: "CffiNativeHandle") -> None:
+        """Called when the reference count of a wrapper is about to be decremented by a release.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+
+
+_lifecycle_observers: Tuple[LifecycleObserver, ...] = ()
+_ref_count_observers: Tuple[LifecycleObserver, ...] = ()
+"""The lifecycle observers interested in reference count changes, which are much more frequent than creations and releases."""
+
+
+def _notify_released(
+    observers: Tuple[LifecycleObserver, ...],
+    key: int,
+    type_id: Optional[str],
+    elapsed_ns: int,
+) -> None:
+    for observer in observers:
+        observer.on_released(key, type_id, elapsed_ns)
+
+
+def add_lifecycle_observer(observer: LifecycleObserver) -> None:
+    """Notify an observer of the creation and release of wrappers from now on. Adding an observer twice has no effect.
+
+    Args:
+        observer (LifecycleObserver): the observer.
+    """
+    global _lifecycle_observers, _ref_count_observers  # noqa: PLW0603
+    if observer not in _lifecycle_observers:
+        _lifecycle_observers = (*_lifecycle_observers, observer)
+        cls = type(observer)
+        if cls.on_add_ref is not LifecycleObserver.on_add_ref or cls.on_decrement is not LifecycleObserver.on_decrement:
+            _ref_count_observers = (*_ref_count_observers, observer)
+
+
+def remove_lifecycle_observer(observer: LifecycleObserver) -> None:
+    """Stop notifying an observer. Does nothing if the observer is not registered.
+
+    Args:
+        observer (LifecycleObserver): the observer.
+    """
+    global _lifecycle_observers, _ref_count_observers  # noqa: PLW0603
+    _lifecycle_observers = tuple(o for o in _lifecycle_observers if o is not observer)
+    _ref_count_observers = tuple(o for o in _ref_count_observers if o is not observer)
+
+
+ReleaseDispatcher = Callable[[Callable[["CffiData"], None], "CffiData", Optional[str]], None]
+"""A function taking over the call to a native release function: `dispatcher(release_native, handle, type_id)`."""
+
+_release_dispatcher: Optional[ReleaseDispatcher] = None
+
+
+def set_release_dispatcher(dispatcher: Optional[ReleaseDispatcher]) -> Optional[ReleaseDispatcher]:
+    """Set the function that calls native release functions on behalf of handles, e.g. to defer releases.
+
+    This applies to `DeletableCffiNativeHandle` and its subclasses that do not override how native resources are released.
+
+    Args:
+        dispatcher (Optional[ReleaseDispatcher]): the function dispatching releases, or None to call native release functions directly.
+
+    Returns:
+        Optional[ReleaseDispatcher]: the dispatcher previously in use.
+    """
+    global _release_dispatcher  # noqa: PLW0603
+    previous = _release_dispatcher
+    _release_dispatcher = dispatcher
+    return previous
+
 
 class CffiNativeHandle(NativeHandle):
     """Reference counting wrapper class for CFFI pointers.
@@ -63,6 +177,8 @@ class CffiNativeHandle(NativeHandle):
         _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
     """
 
+    __slots__ = ("_type_id",)
+
     def __init__(self, handle: "CffiData", type_id: Optional[str] = None, prior_ref_count: int = 0):
         """Initialize a reference counter for a resource handle, with an initial reference count.
 
@@ -71,14 +187,41 @@ class CffiNativeHandle(NativeHandle):
             type_id (Optional[str]): An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation.
             prior_ref_count (int): the initial reference count. Default 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
         """
-        super().__init__(handle, prior_ref_count)
         # TODO checks on handle
         self._type_id = type_id
-        self._finalizing: bool = False
-        self._handle: CffiData = None
-        if handle is None:
-            return  # defer setting the handle to the inheritor.
-        self._set_handle(handle, prior_ref_count)
+        super().__init__(handle, prior_ref_count)
+
+    def _set_handle(self, handle: "CffiData", prior_ref_count: int = 0) -> None:
+        """Sets a handle, after performing checks on its suitability as a handle for this object.
+
+        Args:
+            handle (CffiData): The handle (e.g. cffi pointer) to the native resource.
+            prior_ref_count (int): the initial reference count. Default 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
+
+        Raises:
+            error message when a handle is not a valid object.
+        """
+        super()._set_handle(handle, prior_ref_count)
+        observers = _lifecycle_observers
+        if observers:
+            for observer in observers:
+                observer.on_created(self)
+
+    def _lifecycle_key(self) -> int:
+        """Key identifying this wrapper in notifications to lifecycle observers, see `LifecycleObserver`."""
+        return id(self)
+
+    def add_ref(self) -> None:
+        """Manually increment the reference count.
+
+        Users usually have no need to call this method. They may have to if they
+        manage cases where one native handle wrapper uses another wrapper (and its underlying resource).
+        """
+        super().add_ref()
+        observers = _ref_count_observers
+        if observers:
+            for observer in observers:
+                observer.on_add_ref(self)
 
     def _is_valid_handle(self, h: "CffiData") -> bool:
         """Checks if the handle is a CFFI CData pointer, acceptable handle for this wrapper.
@@ -97,10 +240,31 @@ class CffiNativeHandle(NativeHandle):
         if self.disposed:
             return
         if decrement:
-            self._ref_count = self._ref_count - 1
-        if self._ref_count <= 0:  # noqa: SIM102
+            ref_count_observers = _ref_count_observers
+            if ref_count_observers:
+                for observer in ref_count_observers:
+                    observer.on_decrement(self)
+            if not self._decrement_and_test():
+                return
+        elif self._ref_count > 0:
+            return
+        if not self._begin_release():
+            return  # another thread is releasing it
+        try:
+            if self._handle is None:
+                return
+            observers = _lifecycle_observers
+            if not observers:
+                if self._release_handle():
+                    self._handle = None
+                return
+            start = perf_counter_ns()
             if self._release_handle():
+                elapsed_ns = perf_counter_ns() - start
                 self._handle = None
+                _notify_released(observers, self._lifecycle_key(), self._type_id, elapsed_ns)
+        finally:
+            self._end_release()
 
     @property
     def disposed(self) -> bool:
@@ -201,6 +365,124 @@ class CffiNativeHandle(NativeHandle):
         """Manually decrements the reference counter. Triggers disposal if reference count is down to zero."""
         self.__dispose_impl(True)
 
+    def detach(self) -> "CffiData":
+        """Relinquish the ownership of the native resource, and return its pointer without releasing it.
+
+        This moves the reference held by this wrapper to the caller, typically to pass it to a native function taking ownership:
+
+        ```python
+        owner = wrap_cffi_native_handle(
+            native_lib.create_owner(dog.detach()), "OWNER_PTR", native_lib.release
+        )
+        ```
+
+        The wrapper is disposed of afterwards, without any call to native code. Lifecycle observers are notified as for a release taking no time.
+
+        Raises:
+            RuntimeError: if the wrapper is already disposed of, or holds more than one reference, as other holders rely on it.
+
+        Returns:
+            CffiData: the pointer, carrying the reference previously held by this wrapper.
+        """
+        handle = self._handle
+        if handle is None:
+            raise RuntimeError(f"Cannot detach {self}, it has already been disposed of")
+        if self._ref_count != 1:
+            raise RuntimeError(f"Cannot detach {self}, it holds {self._ref_count} references rather than one")
+        self._detach_handle()
+        observers = _lifecycle_observers
+        if observers:
+            _notify_released(observers, self._lifecycle_key(), self._type_id, 0)
+        return handle
+
+    def _detach_handle(self) -> None:
+        """Forget the handle without releasing it; see `detach`."""
+        self._handle = None
+        self._ref_count = 0
+
+    def borrow(self) -> "BorrowedHandle":
+        """A view of the pointer of this handle, without reference counting, for use in a `with` block.
+
+        ```python
+        with handle.borrow() as view:
+            for x in values:
+                native_lib.compute(view.ptr, x)
+        ```
+
+        Returns:
+            BorrowedHandle: the view, to enter in a `with` statement.
+        """
+        return BorrowedHandle(self)
+
+
+_borrow_debug = False
+
+
+def enable_borrow_debug() -> None:
+    """Record where handles are borrowed, and report misuses of borrowed views with that location.
+
+    Misuses are the use of a view outside of its `with` block, e.g. after it escaped, and the disposal of a handle while it is borrowed.
+    """
+    global _borrow_debug  # noqa: PLW0603
+    _borrow_debug = True
+
+
+def disable_borrow_debug() -> None:
+    """Stop recording where handles are borrowed. See `enable_borrow_debug`."""
+    global _borrow_debug  # noqa: PLW0603
+    _borrow_debug = False
+
+
+class BorrowError(RuntimeError):
+    """A borrowed view of a handle was used outside of its `with` block, or its handle was disposed of while borrowed."""
+
+
+class BorrowedHandle:
+    """A view of the pointer of a handle, without reference counting, valid only inside a `with` block.
+
+    The view holds a Python reference to its handle, but does not change its reference count.
+    Its `ptr` attribute is a plain attribute while the view is entered, and does not exist outside of the `with` block.
+    """
+
+    __slots__ = ("_handle", "_site", "ptr")
+
+    def __init__(self, handle: CffiNativeHandle) -> None:
+        """A view of the pointer of a handle, without reference counting, valid only inside a `with` block.
+
+        Args:
+            handle (CffiNativeHandle): the handle borrowed.
+        """
+        self._handle = handle
+        self._site: Optional[str] = None
+
+    def __enter__(self) -> Self:
+        handle = self._handle
+        if handle.disposed:
+            raise BorrowError(f"Cannot borrow {handle}, it has already been disposed of")
+        if _borrow_debug:
+            caller = sys._getframe(1)
+            self._site = f"{caller.f_code.co_filename}:{caller.f_lineno}"
+        self.ptr = handle.get_handle()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        del self.ptr
+        # an exception raised in the block takes precedence, and is likely why the handle was disposed of
+        if exc_type is None and self._site is not None and self._handle.disposed:
+            raise BorrowError(f"{self._handle} was disposed of while borrowed at {self._site}")
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when `ptr` is not set, i.e. outside of the `with` block
+        if name == "ptr":
+            where = f" borrowed at {self._site}" if self._site is not None else ""
+            raise BorrowError(f"The view of {self._handle}{where} is only valid inside its 'with' block")
+        raise AttributeError(name)
+
 
 class DeletableCffiNativeHandle(CffiNativeHandle):
     """Reference counting wrapper class for CFFI pointers.
@@ -212,6 +494,8 @@ class DeletableCffiNativeHandle(CffiNativeHandle):
         _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object _handle.
     """
 
+    __slots__ = ("_release_native",)
+
     def __init__(
         self,
         handle: "CffiData",
@@ -227,13 +511,12 @@ class DeletableCffiNativeHandle(CffiNativeHandle):
             type_id (str, optional): [description]. An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation. Defaults to None.
             prior_ref_count (int, optional): [description]. The initial reference count. Defaults to 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
         """
+        self._release_native = release_native
         super().__init__(
             handle,
             type_id,
             prior_ref_count,
         )
-        self._release_native = release_native
-        self._set_handle(handle, prior_ref_count)
 
     def _release_handle(self) -> bool:
         """Release the handle, dispose of the native resource.
@@ -244,14 +527,137 @@ class DeletableCffiNativeHandle(CffiNativeHandle):
         if self._handle is None:
             return False
         if self._release_native is not None:
-            self._release_native(
-                self._handle,
-            )  # TODO are trapped exceptions acceptable here?
+            if _release_dispatcher is None:
+                self._release_native(
+                    self._handle,
+                )  # TODO are trapped exceptions acceptable here?
+            else:
+                _release_dispatcher(self._release_native, self._handle, self._type_id)
             return True
         # if self._release_native is None:
         return False
 
 
+class _NativeFinalizer(weakref.ref):
+    """Weak reference to a wrapper, holding what is needed to release its native resource once it is collected.
+
+    It has no strong reference to the wrapper, so the release never touches a half torn down Python object.
+    """
+
+    __slots__ = ("handle", "ref_count", "release_native")
+
+    def __new__(cls, wrapper: Any, handle: "CffiData", release_native: Optional[Callable[["CffiData"], None]]):  # noqa: ARG004
+        return super().__new__(cls, wrapper, _on_wrapper_collected)
+
+    def __init__(self, wrapper: Any, handle: "CffiData", release_native: Optional[Callable[["CffiData"], None]]):
+        super().__init__(wrapper, _on_wrapper_collected)
+        self.handle = handle
+        self.release_native = release_native
+        self.ref_count = 1
+
+
+_live_finalizers: Dict[int, _NativeFinalizer] = {}
+"""Keeps finalizers alive as long as their wrapper is, since a weak reference collected with its referent never calls back."""
+
+
+def _on_wrapper_collected(finalizer: _NativeFinalizer) -> None:
+    _live_finalizers.pop(id(finalizer), None)
+    # Same outcome as the `release` a `__del__` would trigger: release if this was the last reference.
+    handle = finalizer.handle
+    if handle is None or finalizer.ref_count > 1 or finalizer.release_native is None:
+        return
+    finalizer.handle = None
+    observers = _lifecycle_observers
+    start = perf_counter_ns() if observers else 0
+    if _release_dispatcher is None:
+        finalizer.release_native(handle)
+    else:
+        _release_dispatcher(finalizer.release_native, handle, None)
+    if observers:
+        _notify_released(observers, id(finalizer), None, perf_counter_ns() - start)
+
+
+class FinalizerCffiNativeHandle(DeletableCffiNativeHandle):
+    """Reference counting wrapper class for CFFI pointers, disposed of via a weak reference callback rather than `__del__`.
+
+    The callback, akin to `weakref.finalize`, captures only the raw pointer, the release function and the reference count.
+    When the wrapper is collected, including as part of a reference cycle, the native resource is released
+    without calling back into the half torn down Python object. Explicit `release()` and `dispose()`
+    behave as for `DeletableCffiNativeHandle`. Native resources still alive at interpreter exit are not released.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
+        _release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object _handle.
+        _finalizer (_NativeFinalizer): weak reference to this wrapper, releasing the native resource when this wrapper is collected. It also holds the reference count.
+    """
+
+    __slots__ = ("_finalizer",)
+
+    def __init__(
+        self,
+        handle: "CffiData",
+        release_native: Optional[Callable[["CffiData"], None]],
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """New reference counter for a CFFI resource handle, disposed of via a weak reference callback.
+
+        Args:
+            handle (CffiData): The handle (expected cffi pointer) to the native resource.
+            release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object handle.
+            type_id (str, optional): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): The initial reference count. Defaults to 0 if this NativeHandle is sole responsible for the lifecycle of the resource.
+        """
+        # The reference count lives in the finalizer; it must exist before the base classes set it.
+        finalizer = _NativeFinalizer(self, None, release_native)
+        self._finalizer = finalizer
+        super().__init__(handle, release_native, type_id, prior_ref_count)
+        finalizer.handle = handle
+        _live_finalizers[id(finalizer)] = finalizer
+
+    @property
+    def _ref_count(self) -> int:  # type: ignore[override]
+        return self._finalizer.ref_count
+
+    @_ref_count.setter
+    def _ref_count(self, value: int) -> None:
+        self._finalizer.ref_count = value
+
+    def _release_handle(self) -> bool:
+        """Release the handle, dispose of the native resource.
+
+        Returns:
+            bool: Return True if the release of native resources handle was successful, False otherwise.
+        """
+        finalizer = self._finalizer
+        handle = finalizer.handle
+        if handle is None or finalizer.release_native is None:
+            return False
+        finalizer.handle = None
+        _live_finalizers.pop(id(finalizer), None)
+        if _release_dispatcher is None:
+            finalizer.release_native(handle)
+        else:
+            _release_dispatcher(finalizer.release_native, handle, self._type_id)
+        return True
+
+    def _detach_handle(self) -> None:
+        """Forget the handle without releasing it, including when this wrapper is collected; see `detach`."""
+        finalizer = self._finalizer
+        finalizer.handle = None
+        _live_finalizers.pop(id(finalizer), None)
+        super()._detach_handle()
+
+    def _lifecycle_key(self) -> int:
+        """Key identifying this wrapper in notifications to lifecycle observers; the finalizer outlives the wrapper."""
+        return id(self._finalizer)
+
+    def __del__(self) -> None:
+        """Does nothing; the release of the native resource is driven by the finalizer."""
+
+
 class OwningCffiNativeHandle(CffiNativeHandle):
     """Reference counting wrapper class for CFFI pointers that own and already manage the native memory.
 
@@ -261,6 +667,8 @@ class OwningCffiNativeHandle(CffiNativeHandle):
         _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
     """
 
+    __slots__ = ()
+
     # """ a global function that can be called to release an external pointer """
     # release_native = None
 
@@ -282,7 +690,6 @@ class OwningCffiNativeHandle(CffiNativeHandle):
             type_id,
             prior_ref_count,
         )
-        self._set_handle(handle, prior_ref_count)
 
     def _release_handle(self) -> bool:
         """Does nothing, as the wrapped cffi pointer is already owning and managing the memory.
@@ -293,6 +700,301 @@ class OwningCffiNativeHandle(CffiNativeHandle):
         return True
 
 
+class NativeCountedCffiNativeHandle(CffiNativeHandle):
+    """Wrapper class for CFFI pointers to native objects that count their references themselves.
+
+    Each reference held by Python users of the wrapper is a native reference: `add_ref` and `release` call the native
+    functions incrementing and decrementing the count, so that native code sharing the object sees every owner.
+    The native count is authoritative, and is what `reference_count` returns. Python only keeps the number of references
+    held via this wrapper, so that it never releases more than it acquired.
+
+    Attributes:
+        _handle (object): The handle (e.g. cffi pointer) to the native resource.
+        _type_id (Optional[str]): An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation.
+        _finalizing (bool): a flag telling whether this object is in its deletion phase. This has a use in some advanced cases with reverse callback, possibly not relevant in Python.
+        _add_ref_native (Callable[[CffiData],Any]): native function incrementing the reference count of the object.
+        _release_native (Callable[[CffiData],Any]): native function decrementing the reference count of the object, and deleting it when the count reaches zero.
+        _get_ref_count_native (Callable[[CffiData],int]): native function returning the reference count of the object.
+    """
+
+    __slots__ = ("_add_ref_native", "_get_ref_count_native", "_release_native")
+
+    def __init__(  # noqa: PLR0917
+        self,
+        handle: "CffiData",
+        add_ref_native: Callable[["CffiData"], Any],
+        release_native: Callable[["CffiData"], Any],
+        get_ref_count_native: Callable[["CffiData"], int],
+        type_id: Optional[str] = None,
+        prior_ref_count: int = 0,
+    ):
+        """New wrapper taking over native references to an object with a native reference count.
+
+        Args:
+            handle (CffiData): The handle (expected cffi pointer) to the native resource.
+            add_ref_native (Callable[[CffiData],Any]): native function incrementing the reference count of the object.
+            release_native (Callable[[CffiData],Any]): native function decrementing the reference count of the object, and deleting it when the count reaches zero.
+            get_ref_count_native (Callable[[CffiData],int]): native function returning the reference count of the object.
+            type_id (str, optional): An optional identifier for the type of underlying resource. Defaults to None.
+            prior_ref_count (int, optional): Number of native references taken over in addition to one. Defaults to 0, for a pointer returned by a native function creating the object.
+        """
+        self._add_ref_native = add_ref_native
+        self._release_native = release_native
+        self._get_ref_count_native = get_ref_count_native
+        super().__init__(handle, type_id, prior_ref_count)
+        tracked = _tracked_native_counted_handles
+        if tracked is not None:
+            tracked.add(self)
+
+    @property
+    def reference_count(self) -> int:
+        """Get the native reference count of the object, or zero if this wrapper has released all its references."""
+        handle = self._handle
+        if handle is None:
+            return 0
+        return self._get_ref_count_native(handle)
+
+    @property
+    def wrapper_ref_count(self) -> int:
+        """Number of native references held via this wrapper."""
+        return self._ref_count if self._handle is not None else 0
+
+    def add_ref(self) -> None:
+        """Increment the native reference count, as a reference held via this wrapper.
+
+        Raises:
+            RuntimeError: if the wrapper is already disposed of; the native object may no longer exist.
+        """
+        handle = self._handle
+        if handle is None:
+            raise RuntimeError(f"Cannot add a reference to {self}, it has already been disposed of")
+        self._add_ref_native(handle)
+        super().add_ref()
+
+    def _decrement_and_test(self) -> bool:
+        """Decrement the count of references held via this wrapper, and drop one native reference unless it is the last one.
+
+        Returns:
+            bool: True if this was the last reference held via this wrapper, to be released by `_release_handle`.
+        """
+        # read before the decrement: once it is done, another thread may release the last reference and clear the handle
+        handle = self._handle
+        if super()._decrement_and_test():
+            return True
+        if handle is not None:
+            self._release_native(handle)
+        return False
+
+    def _release_handle(self) -> bool:
+        """Drop the last native reference held via this wrapper.
+
+        Returns:
+            bool: True if the reference was released, False if there was no handle.
+        """
+        if self._handle is None:
+            return False
+        self._release_native(self._handle)
+        return True
+
+
+@dataclass
+class NativeCountDiscrepancy:
+    """Dataclass describing a native object whose native reference count differs from the references held via its wrappers."""
+
+    address: int
+    """Address of the native object."""
+    type_id: Optional[str]
+    """Type identifier of the wrappers."""
+    python_count: int
+    """Sum of the references held via live wrappers."""
+    native_count: int
+    """Reference count reported by the native library."""
+
+
+_tracked_native_counted_handles: Optional["weakref.WeakSet[NativeCountedCffiNativeHandle]"] = None
+
+
+def enable_native_count_tracking() -> None:
+    """Keep track of the `NativeCountedCffiNativeHandle` created from now on, for `reconcile_native_counts`."""
+    global _tracked_native_counted_handles  # noqa: PLW0603
+    if _tracked_native_counted_handles is None:
+        _tracked_native_counted_handles = weakref.WeakSet()
+
+
+def disable_native_count_tracking() -> None:
+    """Stop keeping track of `NativeCountedCffiNativeHandle` instances, and forget those tracked so far."""
+    global _tracked_native_counted_handles  # noqa: PLW0603
+    _tracked_native_counted_handles = None
+
+
+def reconcile_native_counts(include_foreign_references: bool = False) -> List[NativeCountDiscrepancy]:
+    """Compare the references held via live tracked wrappers with the native reference counts, in one pass.
+
+    Wrappers are grouped by native address, and each native count is queried once. A native count lower
+    than the references held from Python means references were released behind the wrappers' back, and that
+    the object may be deleted while still in use. A higher native count is expected if native code holds references.
+
+    Args:
+        include_foreign_references (bool, optional): also report native counts higher than the references held from Python. Defaults to False.
+
+    Returns:
+        List[NativeCountDiscrepancy]: the discrepancies found; empty if tracking is not enabled, see `enable_native_count_tracking`.
+    """
+    tracked = _tracked_native_counted_handles
+    if tracked is None:
+        return []
+    groups: Dict[int, List[NativeCountedCffiNativeHandle]] = {}
+    for h in list(tracked):
+        if h._handle is not None:
+            groups.setdefault(int(_ffi.cast("uintptr_t", h._handle)), []).append(h)
+    discrepancies = []
+    for address, handles in groups.items():
+        python_count = sum(h._ref_count for h in handles)
+        first = handles[0]
+        native_count = first._get_ref_count_native(first._handle)
+        if native_count < python_count or (include_foreign_references and native_count != python_count):
+            discrepancies.append(NativeCountDiscrepancy(address, first._type_id, python_count, native_count))
+    return discrepancies
+
+
+@dataclass
+class IdentityMapStats:
+    """Dataclass with the counters of the identity map of wrappers."""
+
+    hits: int
+    """Number of lookups returning an existing wrapper."""
+    misses: int
+    """Number of lookups creating a new wrapper."""
+    size: int
+    """Number of wrappers currently in the map."""
+
+
+class WrapperIdentityMap:
+    """A map from native addresses and type identifiers to the wrapper, if any, currently alive for them.
+
+    Wrappers are held by weak references: the map does not keep them alive. A wrapper whose
+    native resource has been released is replaced by a new one.
+    """
+
+    def __init__(self) -> None:
+        """A map from native addresses and type identifiers to the wrapper, if any, currently alive for them."""
+        self._wrappers: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(
+        self,
+        obj: "CffiData",
+        type_id: Optional[str],
+        create: Callable[[], Any],
+    ) -> Any:
+        """Find the wrapper alive for a pointer and type identifier and increment its reference count, or create one.
+
+        The caller is assumed to hand over one reference to the native resource, as for a new wrapper: on a hit,
+        the reference count of the existing wrapper is incremented, so that each caller still releases it once.
+        A `NativeCountedCffiNativeHandle` takes over the native reference handed over, without adding one natively.
+
+        Args:
+            obj (CffiData): the cffi pointer.
+            type_id (Optional[str]): identifier for the type of underlying resource.
+            create (Callable[[],Any]): function creating the wrapper, on a miss.
+
+        Returns:
+            Any: the existing wrapper, or the new one.
+        """
+        address = int(_ffi.cast("uintptr_t", obj))
+        if address == 0:
+            return create()
+        key = (address, type_id)
+        with self._lock:
+            wrapper = self._wrappers.get(key)
+            if wrapper is not None and wrapper._handle is not None:
+                if isinstance(wrapper, NativeCountedCffiNativeHandle):
+                    # the native reference handed over is the one the wrapper now holds; do not add another
+                    CffiNativeHandle.add_ref(wrapper)
+                else:
+                    wrapper.add_ref()
+                self._hits += 1
+                return wrapper
+            self._misses += 1
+            wrapper = create()
+            if isinstance(wrapper, NativeHandle):
+                self._wrappers[key] = wrapper
+            return wrapper
+
+    def canonicalizing(self, constructor: "WrapperConstructor") -> "WrapperConstructor":
+        """Wrap a wrapper constructor so that it goes through this map for cffi pointers.
+
+        Args:
+            constructor (WrapperConstructor): a function `(obj, type_id, release_native)` creating a wrapper.
+
+        Returns:
+            WrapperConstructor: a function with the same arguments, returning existing wrappers where possible.
+        """
+
+        def canonical_constructor(obj: Any, type_id: str, release_native: Optional[Callable]) -> "CffiNativeHandle":
+            if not isinstance(obj, FFI.CData):
+                return constructor(obj, type_id, release_native)
+            return self.get_or_create(obj, type_id, lambda: constructor(obj, type_id, release_native))
+
+        return canonical_constructor
+
+    def stats(self) -> IdentityMapStats:
+        """Counters of hits and misses, and the current number of wrappers in the map.
+
+        Returns:
+            IdentityMapStats: the counters.
+        """
+        with self._lock:
+            return IdentityMapStats(hits=self._hits, misses=self._misses, size=len(self._wrappers))
+
+    def clear(self) -> None:
+        """Forget all wrappers, and reset the counters."""
+        with self._lock:
+            self._wrappers.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+_identity_map: Optional[WrapperIdentityMap] = None
+
+_scope_tracker: Optional[Callable[[Any], None]] = None
+"""Function recording the wrappers created by `wrap_cffi_native_handle` and `CffiWrapperFactory`, set while handle scopes are active. See `refcount.scope`."""
+
+
+def enable_identity_map() -> WrapperIdentityMap:
+    """Return the existing wrapper, with an incremented reference count, when the same native pointer is wrapped again.
+
+    Applies to `wrap_cffi_native_handle` and `CffiWrapperFactory`. Wrappers are looked up by pointer address and type identifier,
+    so that a pointer wrapped several times, e.g. a shared child object returned by a getter, is released once.
+    Does nothing if the identity map is already enabled.
+
+    Returns:
+        WrapperIdentityMap: the identity map in use.
+    """
+    global _identity_map  # noqa: PLW0603
+    if _identity_map is None:
+        _identity_map = WrapperIdentityMap()
+    return _identity_map
+
+
+def disable_identity_map() -> None:
+    """Create a new wrapper each time a pointer is wrapped, as is the default. Existing wrappers are unaffected."""
+    global _identity_map  # noqa: PLW0603
+    _identity_map = None
+
+
+def identity_map_stats() -> Optional[IdentityMapStats]:
+    """Counters of the identity map of wrappers, if enabled.
+
+    Returns:
+        Optional[IdentityMapStats]: the counters, or None if the identity map is not enabled.
+    """
+    identity_map = _identity_map
+    return None if identity_map is None else identity_map.stats()
+
+
 def wrap_cffi_native_handle(
     obj: Union["CffiData", Any],
     type_id: str = "",
@@ -304,14 +1006,245 @@ def wrap_cffi_native_handle(
         obj (Union[CffiData,Any]): An object, which will be wrapped if this is a CFFI pointer, i.e. an instance of `CffiData`
         release_native (Callable[[CffiData],None]): function to call on deleting this wrapper. The function should have one argument accepting the object handle.
         type_id (Optional[str]): An optional identifier for the type of underlying resource. This can be used to usefully maintain type information about the pointer/handle across an otherwise opaque C API. See package documentation.
+
+    If the identity map is enabled (see `enable_identity_map`), a pointer already wrapped by a live wrapper returns that wrapper, with its reference count incremented.
+    Inside a handle scope (see `refcount.scope`), the wrapper is released when the scope exits.
     """
-    if isinstance(obj, FFI.CData):
-        return DeletableCffiNativeHandle(
+    if not isinstance(obj, FFI.CData):
+        return obj
+    identity_map = _identity_map
+    if identity_map is not None:
+        wrapper = identity_map.get_or_create(
+            obj,
+            type_id,
+            lambda: DeletableCffiNativeHandle(obj, release_native=release_native, type_id=type_id),
+        )
+    else:
+        wrapper = DeletableCffiNativeHandle(
             obj,
             release_native=release_native,
             type_id=type_id,
         )
-    return obj
+    tracker = _scope_tracker
+    if tracker is not None:
+        tracker(wrapper)
+    return wrapper
+
+
+def _check_adoptable(obj: Any) -> None:
+    if not isinstance(obj, FFI.CData):
+        raise TypeError(f"Only cffi pointers can be adopted, not an object of type '{type(obj)}'")
+    if obj == _ffi.NULL:
+        raise ValueError("Cannot adopt a null pointer")
+
+
+def adopt_cffi_native_handle(
+    obj: "CffiData",
+    type_id: str = "",
+    release_native: Optional[Callable[["CffiData"], None]] = None,
+) -> DeletableCffiNativeHandle:
+    """Create a wrapper taking over a pointer that already carries a reference, e.g. one returned by `CffiNativeHandle.detach`.
+
+    No reference is added: the wrapper releases the pointer once its own reference count goes to zero.
+    Unlike `wrap_cffi_native_handle`, anything other than a non-null cffi pointer is an error rather than returned as is.
+
+    Args:
+        obj (CffiData): the cffi pointer.
+        type_id (str, optional): identifier for the type of underlying resource. Defaults to "".
+        release_native (Optional[Callable[[CffiData],None]]): function releasing the pointer. Defaults to None.
+
+    Raises:
+        TypeError: if `obj` is not a cffi pointer.
+        ValueError: if `obj` is a null pointer.
+
+    Returns:
+        DeletableCffiNativeHandle: the wrapper, or the live wrapper of the pointer if the identity map is enabled.
+    """
+    _check_adoptable(obj)
+    return wrap_cffi_native_handle(obj, type_id, release_native)
+
+
+BulkReleaseFunction = Callable[["CffiData", int], None]
+"""A native function releasing several objects at once, given a `void*[]` array and the number of items."""
+
+_bulk_release_functions: Dict[str, Tuple[BulkReleaseFunction, Callable[["CffiData"], None]]] = {}
+"""Bulk release functions, and the function releasing one object they stand for, by type identifier."""
+
+
+def register_bulk_release(
+    type_id: str,
+    bulk_release: Optional[BulkReleaseFunction],
+    release_native: Optional[Callable[["CffiData"], None]] = None,
+) -> None:
+    """Register a native function that releases several objects of a given type at once.
+
+    It is used by `release_many`, for instance for a C API function `void release_many(void** objects, int n)`.
+    Only handles of type `type_id` whose release function is `release_native` are released in bulk; the bulk
+    function must have the same effect as calling `release_native` on each object.
+
+    Args:
+        type_id (str): identifier for the type of underlying resource.
+        bulk_release (Optional[BulkReleaseFunction]): function accepting a `void*[]` array and its length.
+            None to unregister the current function for `type_id`.
+        release_native (Optional[Callable[[CffiData], None]]): the function releasing one object, that `bulk_release` stands for.
+            Required if `bulk_release` is not None.
+
+    Raises:
+        ValueError: if `bulk_release` is given without `release_native`.
+    """
+    if bulk_release is None:
+        _bulk_release_functions.pop(type_id, None)
+        return
+    if release_native is None:
+        raise ValueError(f"The release function that the bulk release of '{type_id}' stands for is required")
+    _bulk_release_functions[type_id] = (bulk_release, release_native)
+
+
+def _bulk_release_function(type_id: Optional[str], release_native: Any) -> Optional[BulkReleaseFunction]:
+    """The bulk release function standing for `release_native` for a type identifier, if any."""
+    pairing = _bulk_release_functions.get(type_id)  # type: ignore[arg-type]
+    if pairing is None or release_native is None or not (release_native is pairing[1] or release_native == pairing[1]):
+        return None
+    return pairing[0]
+
+
+def release_many(handles: Iterable[CffiNativeHandle]) -> int:
+    """Release several handles, releasing native resources of the same type in a single call where possible.
+
+    Each handle has its reference count decremented, as `release` would. Handles whose count reaches zero are
+    grouped by type identifier. A group for which a function was registered with `register_bulk_release`, paired with
+    the release function of the handles, is released with one call to that function. Other handles are released one by one.
+    Bulk release is only used for handles whose class does not override how `DeletableCffiNativeHandle` releases
+    native resources, and if no release dispatcher is set (see `set_release_dispatcher`): releases then go through
+    the dispatcher one by one, and the dispatcher may batch them itself, as deferred releases do.
+
+    If a bulk release function raises an exception, the handles of its group are presumed not released: their
+    reference is restored, so that they can be released again. The other groups are still released, then the first
+    exception is raised.
+
+    Args:
+        handles (Iterable[CffiNativeHandle]): handles to release. A handle may appear more than once.
+
+    Raises:
+        TypeError: an item is not a `CffiNativeHandle`
+        Exception: the first exception raised by a bulk release function.
+
+    Returns:
+        int: the number of native resources released.
+    """
+    released = 0
+    pending: Dict[Tuple[str, BulkReleaseFunction], List[CffiNativeHandle]] = {}
+    pending_ids = set()
+    bulk_possible = bool(_bulk_release_functions) and _release_dispatcher is None
+    # bulk release is possible if the class does not customise the release; cache the check for the last class seen
+    last_class = None
+    bulk_eligible = False
+    for h in handles:
+        cls = type(h)
+        if cls is not last_class:
+            if not isinstance(h, CffiNativeHandle):
+                raise TypeError(f"Expected a 'CffiNativeHandle' but instead got object of type '{cls!s}'")
+            last_class = cls
+            bulk_eligible = bulk_possible and cls._release_handle is DeletableCffiNativeHandle._release_handle
+        if h._handle is None:
+            continue
+        type_id = h._type_id
+        bulk_release = _bulk_release_function(type_id, h._release_native) if bulk_eligible else None  # type: ignore[attr-defined]
+        if bulk_release is not None and id(h) in pending_ids:
+            continue
+        ref_count_observers = _ref_count_observers
+        if ref_count_observers:
+            for observer in ref_count_observers:
+                observer.on_decrement(h)
+        if bulk_release is not None:
+            if not h._decrement_and_test() or not h._begin_release():
+                continue
+            pending_ids.add(id(h))
+            key = (type_id, bulk_release)
+            group = pending.get(key)  # type: ignore[arg-type]
+            if group is None:
+                pending[key] = group = []  # type: ignore[index]
+            group.append(h)
+            continue
+        if not h._decrement_and_test() or not h._begin_release():
+            continue
+        try:
+            if h._handle is None:
+                continue
+            observers = _lifecycle_observers
+            start = perf_counter_ns() if observers else 0
+            if h._release_handle():
+                h._handle = None
+                released += 1
+                if observers:
+                    _notify_released(observers, h._lifecycle_key(), type_id, perf_counter_ns() - start)
+        finally:
+            h._end_release()
+    error: Optional[Exception] = None
+    for (type_id, bulk_release), group in pending.items():
+        observers = _lifecycle_observers
+        start = perf_counter_ns() if observers else 0
+        try:
+            bulk_release(_ffi.new("void*[]", [h._handle for h in group]), len(group))
+        except Exception as e:  # noqa: BLE001
+            for h in group:
+                h._end_release()
+                h.add_ref()
+            if error is None:
+                error = e
+            continue
+        elapsed_ns = (perf_counter_ns() - start) // len(group) if observers else 0
+        for h in group:
+            h._handle = None
+            h._end_release()
+            if observers:
+                _notify_released(observers, h._lifecycle_key(), type_id, elapsed_ns)
+        released += len(group)
+    if error is not None:
+        raise error
+    return released
+
+
+class TypeDispatchTable(Dict[type, Optional[Callable[[Any], Any]]]):
+    """Functions looked up by the exact type of an object, falling back on its base classes.
+
+    Indexing the table with a type returns the function registered for it, else for its closest base class, else None.
+    The result of the fallback on the method resolution order is cached in the table itself,
+    so that looking up a type already seen is a plain dictionary access.
+    """
+
+    __slots__ = ("_functions",)
+
+    def __init__(self, functions: Dict[type, Callable[[Any], Any]]) -> None:
+        """Functions looked up by the exact type of an object, falling back on its base classes.
+
+        Args:
+            functions (Dict[type, Callable[[Any], Any]]): the functions, by type.
+        """
+        super().__init__(functions)
+        self._functions = dict(functions)
+
+    def __missing__(self, cls: type) -> Optional[Callable[[Any], Any]]:
+        functions = self._functions
+        function = next((functions[base] for base in cls.__mro__ if base in functions), None)
+        self[cls] = function
+        return function
+
+    def register(self, cls: type, function: Optional[Callable[[Any], Any]]) -> None:
+        """Register the function for a type and its subclasses, or remove it.
+
+        Args:
+            cls (type): the type.
+            function (Optional[Callable[[Any], Any]]): the function, or None to remove the one registered for `cls`.
+        """
+        functions = dict(self._functions)
+        if function is None:
+            functions.pop(cls, None)
+        else:
+            functions[cls] = function
+        self._functions = functions
+        self.clear()
+        self.update(functions)
 
 
 def is_cffi_native_handle(x: Any, type_id: str = "") -> bool:
@@ -330,6 +1263,46 @@ def is_cffi_native_handle(x: Any, type_id: str = "") -> bool:
     return x.type_id == type_id
 
 
+def _as_is(obj: Any) -> Any:
+    return obj
+
+
+def _get_handle(obj: CffiNativeHandle) -> "CffiData":
+    return obj.get_handle()
+
+
+def _handle_attribute(obj: CffiNativeHandle) -> "CffiData":
+    return obj._handle
+
+
+class _UnwrapFunctions(TypeDispatchTable):
+    def __missing__(self, cls: type) -> Optional[Callable[[Any], Any]]:
+        function = super().__missing__(cls)
+        if function is _get_handle and cls.get_handle is CffiNativeHandle.get_handle:  # type: ignore[attr-defined]
+            # read the attribute directly, unless a subclass overrides how its handle is obtained
+            function = self[cls] = _handle_attribute
+        return function
+
+
+_unwrap_functions = _UnwrapFunctions(
+    {
+        type(None): _as_is,
+        CffiNativeHandle: _get_handle,
+        FFI.CData: _as_is,
+    },
+)
+
+
+def register_unwrap_function(cls: type, unwrap: Optional[Callable[[Any], Any]]) -> None:
+    """Register how `unwrap_cffi_native_handle` and `unwrap_many` get the C API argument of objects of a type, and of its subclasses.
+
+    Args:
+        cls (type): the type of the objects, for instance a wrapper class not derived from `CffiNativeHandle`.
+        unwrap (Optional[Callable[[Any], Any]]): function returning the argument for an object, or None to remove the one registered for `cls`.
+    """
+    _unwrap_functions.register(cls, unwrap)
+
+
 def unwrap_cffi_native_handle(
     obj_wrapper: Any,
     stringent: bool = False,
@@ -348,12 +1321,15 @@ def unwrap_cffi_native_handle(
     """
     # 2016-01-28 allowing null pointers, to unlock behavior of EstimateERRISParameters.
     # Reassess approach, even if other C API function will still catch the issue of null ptrs.
-    if obj_wrapper is None:
-        return None
-    if isinstance(obj_wrapper, CffiNativeHandle):
-        return obj_wrapper.get_handle()
-    if isinstance(obj_wrapper, FFI.CData):
+    # Dispatch on the exact type rather than a chain of isinstance checks; this is on the path of every argument of native calls.
+    unwrap = _unwrap_functions[type(obj_wrapper)]
+    # identity checks short-circuit the calls for the common cases
+    if unwrap is _handle_attribute:
+        return obj_wrapper._handle
+    if unwrap is _as_is:
         return obj_wrapper
+    if unwrap is not None:
+        return unwrap(obj_wrapper)
     if stringent:
         raise TypeError(
             "Argument is neither a CffiNativeHandle nor a CFFI external pointer",
@@ -361,6 +1337,39 @@ def unwrap_cffi_native_handle(
     return obj_wrapper
 
 
+def unwrap_many(args: Iterable[Any], stringent: bool = False) -> Tuple[Any, ...]:
+    """Unwrap the arguments of a native call, as `unwrap_cffi_native_handle` does for each of them.
+
+    Args:
+        args (Iterable[Any]): the arguments.
+        stringent (bool, optional): if True an error is raised if an argument is neither None, a CffiNativeHandle nor an CffiData. Defaults to False.
+
+    Raises:
+        TypeError: A CFFI pointer could not be found in an argument, and `stringent` is True.
+
+    Returns:
+        Tuple[Any, ...]: the unwrapped arguments.
+    """
+    functions = _unwrap_functions
+    result = []
+    append = result.append
+    for arg in args:
+        unwrap = functions[type(arg)]
+        if unwrap is _handle_attribute:
+            append(arg._handle)
+        elif unwrap is _as_is:
+            append(arg)
+        elif unwrap is not None:
+            append(unwrap(arg))
+        elif stringent:
+            raise TypeError(
+                "Argument is neither a CffiNativeHandle nor a CFFI external pointer",
+            )
+        else:
+            append(arg)
+    return tuple(result)
+
+
 def cffi_arg_error_external_obj_type(x: Any, expected_type_id: str) -> str:
     """Build an error message that an unexpected object is in lieu of an expected refcount external ref object.
 
@@ -391,6 +1400,8 @@ class GenericWrapper:
     This is mostly a facility to generate glue code more easily
     """
 
+    __slots__ = ("_handle",)
+
     def __init__(self, handle: "CffiData"):
         """A pass-through wrapper for python objects that are ready for C interop. "bytes" can be passed as C 'char*'."""
         self._handle = handle
@@ -401,36 +1412,55 @@ class GenericWrapper:
         return self._handle
 
 
+def _null_pointer_handle(obj: None) -> GenericWrapper:
+    # 2016-01-28 allowing null pointers, to unlock behavior of EstimateERRISParameters.
+    # Reassess approach, even if other C API function will still catch the issue of null ptrs.
+    return GenericWrapper(obj)
+    # return GenericWrapper(FFI.NULL)  # Ended with kernel crashes and API call return, but unclear why
+
+
+def _encoded_string(obj: str) -> GenericWrapper:
+    # see refcount.strings for a cache of the encoded strings
+    return GenericWrapper(obj.encode("utf-8"))
+
+
+_pointer_handle_functions = TypeDispatchTable(
+    {
+        type(None): _null_pointer_handle,
+        CffiNativeHandle: _as_is,
+        FFI.CData: OwningCffiNativeHandle,
+        bytes: GenericWrapper,
+        str: _encoded_string,
+    },
+)
+
+
 def wrap_as_pointer_handle(
     obj_wrapper: Any,
     stringent: bool = False,
 ) -> Union[CffiNativeHandle, OwningCffiNativeHandle, GenericWrapper]:
     """Wrap an object, if need be, so that its C API pointer appears accessible via a 'ptr' property.
 
+    Strings are encoded in UTF-8, to be passed as C 'char*'; `refcount.strings.enable_string_cache` avoids encoding the same strings repeatedly.
+
     Args:
         obj_wrapper (Any): Object to wrap, if necessary
         stringent (bool, optional): Throws an exception if the input type is unhandled. Defaults to False.
 
     Raises:
-        TypeError: neither a CffiNativeHandle nor a CFFI external pointer, nor bytes
+        TypeError: neither a CffiNativeHandle nor a CFFI external pointer, nor bytes, nor str
 
     Returns:
         Union[CffiNativeHandle, OwningCffiNativeHandle, GenericWrapper, None]: wrapped object or None
     """
-    # 2016-01-28 allowing null pointers, to unlock behavior of EstimateERRISParameters.
-    # Reassess approach, even if other C API function will still catch the issue of null ptrs.
-    if obj_wrapper is None:
-        return GenericWrapper(None)
-        # return GenericWrapper(FFI.NULL)  # Ended with kernel crashes and API call return, but unclear why
-    if isinstance(obj_wrapper, CffiNativeHandle):
+    wrap = _pointer_handle_functions[type(obj_wrapper)]
+    if wrap is _as_is:
         return obj_wrapper
-    if isinstance(obj_wrapper, FFI.CData):
-        return OwningCffiNativeHandle(obj_wrapper)
-    if isinstance(obj_wrapper, bytes):
-        return GenericWrapper(obj_wrapper)
+    if wrap is not None:
+        return wrap(obj_wrapper)
     if stringent:
         raise TypeError(
-            "Argument is neither a CffiNativeHandle nor a CFFI external pointer, nor bytes",
+            "Argument is neither a CffiNativeHandle nor a CFFI external pointer, nor bytes, nor str",
         )
     return obj_wrapper
 
@@ -452,8 +1482,101 @@ def type_error_cffi(x: Union[CffiNativeHandle, Any], expected_type: str) -> str:
     return cffi_arg_error_external_obj_type(x, expected_type)
 
 
+WrapperConstructor = Callable[[Any, str, Optional[Callable[["CffiData"], None]]], "CffiNativeHandle"]
+"""A function creating a wrapper from the arguments of `CffiWrapperFactory.create_wrapper`: pointer, type identifier and release function."""
+
+
+def _wrapper_constructor(wrapper_type: Any) -> WrapperConstructor:
+    """Analyse the constructor of a wrapper class once, and return a function calling it with the supported arguments.
+
+    Constructors with an unsupported signature lead to a function raising the relevant exception.
+
+    Args:
+        wrapper_type (Any): the wrapper class, or a callable.
+
+    Returns:
+        WrapperConstructor: a function `(obj, type_id, release_native)` creating the wrapper.
+    """
+    s = signature(wrapper_type)
+    n = len(s.parameters)
+    parameters = [v for k, v in s.parameters.items()]
+    # [<Parameter "handle: Any">, <Parameter "release_native: Callable[[Any], NoneType]">, <Parameter "type_id: Optional[str] = None">, <Parameter "prior_ref_count: int = 0">]
+
+    def raiser(error_type: Type[Exception], message: str) -> WrapperConstructor:
+        # a new exception per call: raising a shared instance would grow its traceback, and keep the frames of every call alive
+        def raise_error(obj: Any, type_id: str, release_native: Optional[Callable]) -> "CffiNativeHandle":  # noqa: ARG001
+            raise error_type(message)
+
+        return raise_error
+
+    if n == 0:
+        return raiser(
+            TypeError,
+            f"Wrapper class '{wrapper_type.__name__}' has no constructor arguments; at least one is required",
+        )
+    if n == 1:
+        return lambda obj, type_id, release_native: wrapper_type(obj)
+    if n == 2:  # noqa: PLR2004
+
+        def constructor_two(obj: Any, type_id: str, release_native: Optional[Callable]) -> "CffiNativeHandle":  # noqa: ARG001
+            if release_native is None:
+                raise ValueError(
+                    f"Wrapper class '{wrapper_type.__name__}' has two constructor arguments; the argument 'release_native' cannot be None",
+                )
+            return wrapper_type(obj, release_native)
+
+        return constructor_two
+    if n == 3:  # noqa: PLR2004
+
+        def constructor_three(obj: Any, type_id: str, release_native: Optional[Callable]) -> "CffiNativeHandle":
+            if release_native is None:
+                raise ValueError(
+                    f"Wrapper class '{type(wrapper_type)}' has three constructor arguments; the argument 'release_native' cannot be None",
+                )
+            return wrapper_type(obj, release_native, type_id)
+
+        return constructor_three
+    if n == 4:  # noqa: PLR2004
+        p = parameters[3]
+        # constructor = wrapper_type.__init__
+        # type_hints = get_type_hints(constructor)
+        param_type = p.annotation
+        if param_type is not int:
+            return raiser(
+                TypeError,
+                f"Wrapper class '{type(wrapper_type)}' has four constructor arguments; the last argument 'prior_ref_count' must be an integer",
+            )
+        if parameters[3].default == parameters[3].empty:
+            return raiser(
+                ValueError,
+                f"Wrapper class '{type(wrapper_type)}' has four constructor arguments; the last argument 'prior_ref_count' must have a default value",
+            )
+        return lambda obj, type_id, release_native: wrapper_type(obj, release_native, type_id)
+    return raiser(
+        NotImplementedError,
+        f"Wrapper class '{wrapper_type.__name__}' has more than 4 arguments; this is not supported",
+    )
+
+
+def _generic_constructor(obj: Any, type_id: str, release_native: Optional[Callable]) -> Any:
+    return wrap_cffi_native_handle(obj, type_id, release_native)
+
+
+def _tracking_constructor(constructor: WrapperConstructor, tracker: Callable[[Any], None]) -> WrapperConstructor:
+    def tracking_constructor(obj: Any, type_id: str, release_native: Optional[Callable]) -> "CffiNativeHandle":
+        wrapper = constructor(obj, type_id, release_native)
+        tracker(wrapper)
+        return wrapper
+
+    return tracking_constructor
+
+
 class CffiWrapperFactory:
-    """A class that creates custom python wrappers based on the type identifier of the external pointer being wrapped."""
+    """A class that creates custom python wrappers based on the type identifier of the external pointer being wrapped.
+
+    The analysis of the constructor of a wrapper class is done once, on first use, and cached.
+    Mutating the mapping from type identifiers to wrapper classes is taken into account.
+    """
 
     def __init__(self, api_type_wrapper: Dict[str, Any], strict_wrapping: bool = False) -> None:
         """A class that creates custom python wrappers based on the type identifier of the external pointer being wrapped.
@@ -465,6 +1588,55 @@ class CffiWrapperFactory:
         """
         self._strict_wrapping = strict_wrapping
         self._api_type_wrapper = api_type_wrapper
+        self._constructors: Dict[Any, WrapperConstructor] = {}
+
+    def precompile(self) -> None:
+        """Analyse upfront the constructors of all the wrapper classes currently in the mapping."""
+        for wrapper_type in self._api_type_wrapper.values():
+            if wrapper_type is not None and wrapper_type not in self._constructors:
+                self._constructors[wrapper_type] = _wrapper_constructor(wrapper_type)
+
+    def invalidate(self) -> None:
+        """Discard the cached constructor analyses.
+
+        This is only needed if the signature of a wrapper class already used has changed, since
+        analyses are cached per wrapper class rather than per type identifier.
+        """
+        self._constructors.clear()
+
+    def _constructor(self, type_id: str) -> WrapperConstructor:
+        """Find the function creating wrappers for a type identifier, analysing the wrapper class on first use."""
+        if type_id is None:
+            raise ValueError("Type ID provided cannot be None")
+        wrapper_type = self._api_type_wrapper.get(type_id)
+        if wrapper_type is None:
+            if type_id not in self._api_type_wrapper:
+                if self._strict_wrapping:
+                    raise ValueError(f"Type ID {type_id} is unknown")
+                return _generic_constructor
+            if self._strict_wrapping:
+                raise NotImplementedError(
+                    f"Python object wrapper for foreign type ID {wrapper_type} is not yet implemented",
+                )
+            return _generic_constructor
+        constructor = self._constructors.get(wrapper_type)
+        if constructor is None:
+            constructor = self._constructors[wrapper_type] = _wrapper_constructor(wrapper_type)
+        return constructor
+
+    def _effective_constructor(self, type_id: str) -> WrapperConstructor:
+        """The function creating wrappers for a type identifier, going through the identity map and handle scopes if active."""
+        constructor = self._constructor(type_id)
+        if constructor is _generic_constructor:
+            # goes through the identity map and handle scopes already
+            return constructor
+        identity_map = _identity_map
+        if identity_map is not None:
+            constructor = identity_map.canonicalizing(constructor)
+        tracker = _scope_tracker
+        if tracker is not None:
+            constructor = _tracking_constructor(constructor, tracker)
+        return constructor
 
     def create_wrapper(
         self,
@@ -488,61 +1660,158 @@ class CffiWrapperFactory:
         Returns:
             CffiNativeHandle: cffi wrapper
         """
-        from inspect import signature
+        return self._effective_constructor(type_id)(obj, type_id, release_native)
 
-        # from typing import get_type_hints
-        if type_id is None:
-            raise ValueError("Type ID provided cannot be None")
-        if type_id not in self._api_type_wrapper:
-            if self._strict_wrapping:
-                raise ValueError(f"Type ID {type_id} is unknown")
-            return wrap_cffi_native_handle(obj, type_id, release_native)
-        wrapper_type = self._api_type_wrapper[type_id]
-        if wrapper_type is None:
-            if self._strict_wrapping:
-                raise NotImplementedError(
-                    f"Python object wrapper for foreign type ID {wrapper_type} is not yet implemented",
-                )
-            return wrap_cffi_native_handle(obj, type_id, release_native)
-        s = signature(wrapper_type)
-        n = len(s.parameters)
-        parameters = [v for k, v in s.parameters.items()]
-        # [<Parameter "handle: Any">, <Parameter "release_native: Callable[[Any], NoneType]">, <Parameter "type_id: Optional[str] = None">, <Parameter "prior_ref_count: int = 0">]
-        if n == 0:
-            raise TypeError(
-                f"Wrapper class '{wrapper_type.__name__}' has no constructor arguments; at least one is required",
-            )
-        if n == 1:
-            return wrapper_type(obj)
-        if n == 2:  # noqa: PLR2004
-            if release_native is None:
-                raise ValueError(
-                    f"Wrapper class '{wrapper_type.__name__}' has two constructor arguments; the argument 'release_native' cannot be None",
-                )
-            return wrapper_type(obj, release_native)
-        if n == 3:  # noqa: PLR2004
-            if release_native is None:
-                raise ValueError(
-                    f"Wrapper class '{type(wrapper_type)}' has three constructor arguments; the argument 'release_native' cannot be None",
-                )
-            return wrapper_type(obj, release_native, type_id)
-        if n == 4:  # noqa: PLR2004
-            p = parameters[3]
-            # constructor = wrapper_type.__init__
-            # type_hints = get_type_hints(constructor)
-            param_type = p.annotation
-            if param_type is not int:
-                raise TypeError(
-                    f"Wrapper class '{type(wrapper_type)}' has four constructor arguments; the last argument 'prior_ref_count' must be an integer",
-                )
-            if parameters[3].default == parameters[3].empty:
-                raise ValueError(
-                    f"Wrapper class '{type(wrapper_type)}' has four constructor arguments; the last argument 'prior_ref_count' must have a default value",
-                )
-            return wrapper_type(obj, release_native, type_id)
-        raise NotImplementedError(
-            f"Wrapper class '{wrapper_type.__name__}' has more than 4 arguments; this is not supported",
-        )
+    def adopt(
+        self,
+        obj: "CffiData",
+        type_id: str,
+        release_native: Optional[Callable[["CffiData"], None]],
+    ) -> "CffiNativeHandle":
+        """Create a wrapper taking over a pointer that already carries a reference, e.g. one returned by `CffiNativeHandle.detach`.
+
+        Args:
+            obj (CffiData): the cffi pointer.
+            type_id (str): identifier for the type of underlying resource.
+            release_native (Optional[Callable[[CffiData],None]]): function releasing the pointer.
+
+        Raises:
+            TypeError: if `obj` is not a cffi pointer.
+            ValueError: if `obj` is a null pointer.
+
+        Returns:
+            CffiNativeHandle: the wrapper.
+        """
+        _check_adoptable(obj)
+        return self._effective_constructor(type_id)(obj, type_id, release_native)
+
+    def create_wrappers(
+        self,
+        pointers: Any,
+        count: int,
+        type_id: str,
+        release_native: Optional[Callable[["CffiData"], None]],
+        lazy: bool = False,
+    ) -> Union[List["CffiNativeHandle"], "LazyWrapperSequence"]:
+        """Create wrappers around several native pointers of the same type, e.g. returned by a C API as `void**` and a count.
+
+        The wrapper constructor is resolved once for all pointers. For a lazy sequence, it is resolved again on first
+        access to each element, so that the identity map and handle scopes active at that time apply.
+
+        Args:
+            pointers (Any): the pointers, e.g. a cffi `void**` or `void*[]`, or a sequence of cffi pointers.
+            count (int): number of pointers to wrap, from the start of `pointers`.
+            type_id (str): identifier for the type of underlying resources.
+            release_native (Callable[[CffiData],None]): function to call on deleting wrappers. The function should have one argument accepting the object handle.
+            lazy (bool, optional): If True, return a sequence creating each wrapper only on first access to its element. Defaults to False.
+
+        Raises:
+            ValueError: Missing type_id, or negative count
+            ValueError: If this object is in strict mode, and `type_id` is not known in the mapping
+            NotImplementedError: `type_id` is known, but mapping to None (wrapper not yet implemented)
+            TypeError: The function to create the wrapper does not accept any argument.
+
+        Returns:
+            Union[List[CffiNativeHandle], LazyWrapperSequence]: the wrappers.
+        """
+        if count < 0:
+            raise ValueError(f"The number of pointers cannot be negative, got {count}")
+        if lazy:
+            # raise errors about the type identifier now rather than on access
+            self._constructor(type_id)
+            return LazyWrapperSequence(pointers, count, type_id, release_native, self)
+        constructor = self._effective_constructor(type_id)
+        return [constructor(pointers[i], type_id, release_native) for i in range(count)]
+
+
+class LazyWrapperSequence(Sequence):
+    """A read-only sequence of wrappers around native pointers, each wrapper being created on first access to its element.
+
+    The sequence owns the native resources of the elements not yet accessed: they are released
+    when the sequence is disposed of, or garbage collected. Wrappers already created manage their own resource.
+    Each wrapper is created as `CffiWrapperFactory.create_wrapper` would at the time of the first access to its element:
+    with the wrapper class then mapped to the type identifier, through the identity map if enabled, and tracked by the
+    handle scope then current, if any.
+    """
+
+    def __init__(
+        self,
+        pointers: Any,
+        count: int,
+        type_id: str,
+        release_native: Optional[Callable[["CffiData"], None]],
+        factory: "CffiWrapperFactory",
+    ) -> None:
+        """A read-only sequence of wrappers around native pointers, each wrapper being created on first access.
+
+        Args:
+            pointers (Any): the pointers, e.g. a cffi `void**` or `void*[]`, or a sequence of cffi pointers.
+            count (int): number of pointers, from the start of `pointers`.
+            type_id (str): identifier for the type of underlying resources.
+            release_native (Callable[[CffiData],None]): function releasing a native resource.
+            factory (CffiWrapperFactory): the factory creating the wrappers.
+        """
+        self._pointers = pointers
+        self._count = count
+        self._type_id = type_id
+        self._release_native = release_native
+        self._factory = factory
+        self._wrappers: List[Optional[CffiNativeHandle]] = [None] * count
+        self._disposed = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> "CffiNativeHandle": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List["CffiNativeHandle"]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union["CffiNativeHandle", List["CffiNativeHandle"]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("LazyWrapperSequence index out of range")
+        wrapper = self._wrappers[index]
+        if wrapper is None:
+            if self._disposed:
+                raise RuntimeError("The native resources of this sequence have been disposed of")
+            type_id = self._type_id
+            constructor = self._factory._effective_constructor(type_id)
+            wrapper = constructor(self._pointers[index], type_id, self._release_native)
+            self._wrappers[index] = wrapper
+        return wrapper
+
+    @property
+    def num_materialized(self) -> int:
+        """Number of wrappers created so far."""
+        return self._count - self._wrappers.count(None)
+
+    def materialize(self) -> List["CffiNativeHandle"]:
+        """Create all the wrappers not yet created.
+
+        Returns:
+            List[CffiNativeHandle]: the wrappers.
+        """
+        return [self[i] for i in range(self._count)]
+
+    def dispose(self) -> None:
+        """Release the native resources of the elements not yet accessed. Elements cannot be accessed afterwards."""
+        if self._disposed:
+            return
+        self._disposed = True
+        if self._release_native is None:
+            return
+        for i, wrapper in enumerate(self._wrappers):
+            if wrapper is None:
+                self._release_native(self._pointers[i])
+
+    def __del__(self) -> None:
+        """destructor, releasing the native resources of the elements not yet accessed."""
+        self.dispose()
 
 
 WrapperCreationFunction = Callable[[Any, str, Callable], DeletableCffiNativeHandle]
@@ -0,0 +1,205 @@
+"""Marshalling of the arguments and results of native functions from a declarative signature.
+
+Bindings otherwise unwrap every handle argument, and wrap every returned pointer, by hand:
+
+```python
+def create_owner(dog):
+    dog_ptr = unwrap_cffi_native_handle(dog)
+    return wrap_cffi_native_handle(
+        native_lib.create_owner(dog_ptr), "DOG_OWNER_PTR", native_lib.release
+    )
+```
+
+The same function, from its signature:
+
+```python
+from refcount.marshalling import marshalled
+
+create_owner = marshalled(
+    native_lib.create_owner,
+    ["DOG_PTR"],
+    returns="DOG_OWNER_PTR",
+    release_native=native_lib.release,
+)
+```
+
+or, as a decorator of a stub giving the name and documentation:
+
+```python
+from refcount.marshalling import native_function
+
+
+@native_function(native_lib.say_walk, ["DOG_OWNER_PTR"])
+def say_walk(owner): ...
+```
+
+The call plan, i.e. which arguments to unwrap and check and how to wrap the result, is built once per function.
+Error messages are only formatted when an argument is not of the expected type.
+"""
+
+from functools import update_wrapper
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from refcount.interop import (
+    CffiData,
+    CffiNativeHandle,
+    CffiWrapperFactory,
+    _as_is,
+    _get_handle,
+    _handle_attribute,
+    _unwrap_functions,
+    cffi_arg_error_external_obj_type,
+    unwrap_cffi_native_handle,
+    wrap_cffi_native_handle,
+)
+
+ArgumentSpec = Optional[str]
+"""Specification of an argument: None to pass it as is, else the type identifier of the handle expected, "" for any handle."""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _any_handle(x: Any) -> Any:
+    return unwrap_cffi_native_handle(x, True)
+
+
+def handle_validator(type_id: str) -> Callable[[Any], "CffiData"]:
+    """A function unwrapping handles with a given type identifier, and raising a `TypeError` for other handles.
+
+    Raw cffi pointers and None are passed as is, as there is no type information to check. Objects of types registered
+    with `register_unwrap_function` are unwrapped with the registered function, after checking the type identifier of
+    those that are handles.
+
+    Args:
+        type_id (str): the expected type identifier; "" accepts handles of any type.
+
+    Returns:
+        Callable[[Any], CffiData]: the function.
+    """
+    if not type_id:
+        return _any_handle
+
+    def validate(x: Any) -> "CffiData":
+        unwrap = _unwrap_functions[type(x)]
+        if unwrap is _handle_attribute:
+            if x._type_id == type_id:
+                return x._handle
+        elif unwrap is _get_handle:
+            if x._type_id == type_id:
+                return x.get_handle()
+        elif unwrap is _as_is:
+            return x
+        elif unwrap is not None and (not isinstance(x, CffiNativeHandle) or x._type_id == type_id):
+            return unwrap(x)
+        raise TypeError(cffi_arg_error_external_obj_type(x, type_id))
+
+    return validate
+
+
+def marshalled(
+    function: Callable[..., Any],
+    arg_type_ids: Sequence[ArgumentSpec],
+    returns: Optional[str] = None,
+    release_native: Optional[Callable[["CffiData"], None]] = None,
+    factory: Optional[CffiWrapperFactory] = None,
+) -> Callable[..., Any]:
+    """A function calling a native function, unwrapping handle arguments and wrapping the returned pointer.
+
+    Args:
+        function (Callable[..., Any]): the native function, e.g. from a cffi library.
+        arg_type_ids (Sequence[ArgumentSpec]): one item per argument of `function`: the type identifier of the handle expected ("" for any type), or None for arguments passed as is.
+        returns (Optional[str]): type identifier of the returned pointer, to wrap; None to return the result as is. Defaults to None.
+        release_native (Optional[Callable[[CffiData], None]]): function releasing the returned pointer. Defaults to None.
+        factory (Optional[CffiWrapperFactory]): factory creating the wrapper of the returned pointer. Defaults to None, for `wrap_cffi_native_handle`.
+
+    Returns:
+        Callable[..., Any]: the marshalling function, taking the same positional arguments as `function`.
+    """
+    num_args = len(arg_type_ids)
+    converters: Tuple[Tuple[int, Callable[[Any], Any]], ...] = tuple(
+        (i, handle_validator(type_id)) for i, type_id in enumerate(arg_type_ids) if type_id is not None
+    )
+    wrap: Optional[Callable[[Any], Any]] = None
+    if returns is not None:
+        if factory is not None:
+            create_wrapper = factory.create_wrapper
+
+            def wrap(result: Any) -> Any:
+                return create_wrapper(result, returns, release_native)
+        else:
+
+            def wrap(result: Any) -> Any:
+                return wrap_cffi_native_handle(result, returns, release_native)
+
+    if not converters and wrap is None:
+        return function
+    name = getattr(function, "__name__", "native function")
+
+    def arity_error(args: Tuple[Any, ...]) -> None:
+        raise TypeError(f"{name}() takes {num_args} positional arguments but {len(args)} were given")
+
+    # specialize the common shapes, to keep the per call work to the strict minimum
+    if len(converters) == 1 and converters[0][0] == 0 and num_args == 1:
+        convert = converters[0][1]
+        if wrap is None:
+
+            def call(arg: Any) -> Any:
+                return function(convert(arg))
+        else:
+
+            def call(arg: Any) -> Any:
+                return wrap(function(convert(arg)))
+
+        return call
+
+    if not converters:
+
+        def call(*args: Any) -> Any:
+            return wrap(function(*args))
+
+        return call
+
+    def call(*args: Any) -> Any:
+        if len(args) != num_args:
+            arity_error(args)
+        converted: List[Any] = list(args)
+        for i, convert in converters:
+            converted[i] = convert(converted[i])
+        result = function(*converted)
+        return result if wrap is None else wrap(result)
+
+    return call
+
+
+def native_function(
+    function: Callable[..., Any],
+    arg_type_ids: Sequence[ArgumentSpec],
+    returns: Optional[str] = None,
+    release_native: Optional[Callable[["CffiData"], None]] = None,
+    factory: Optional[CffiWrapperFactory] = None,
+) -> Callable[[F], F]:
+    """Decorator replacing a stub by a function marshalling the calls to a native function; see `marshalled`.
+
+    The stub gives the name and documentation of the function; its body is not used.
+
+    Args:
+        function (Callable[..., Any]): the native function, e.g. from a cffi library.
+        arg_type_ids (Sequence[ArgumentSpec]): one item per argument of `function`: the type identifier of the handle expected ("" for any type), or None for arguments passed as is.
+        returns (Optional[str]): type identifier of the returned pointer, to wrap; None to return the result as is. Defaults to None.
+        release_native (Optional[Callable[[CffiData], None]]): function releasing the returned pointer. Defaults to None.
+        factory (Optional[CffiWrapperFactory]): factory creating the wrapper of the returned pointer. Defaults to None, for `wrap_cffi_native_handle`.
+
+    Returns:
+        Callable[[F], F]: the decorator.
+    """
+
+    def decorate(stub: F) -> F:
+        call = marshalled(function, arg_type_ids, returns, release_native, factory)
+        if call is function:
+            # cffi functions do not accept attributes; keep a Python level function to carry the stub's name
+            def call(*args: Any) -> Any:
+                return function(*args)
+
+        return update_wrapper(call, stub)  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,222 @@
+"""Timing of native releases and lifetimes of handles, per type identifier.
+
+Helps deciding which types of native objects are worth pooling, releasing in bulk, or releasing in the background.
+
+```python
+import refcount
+
+refcount.enable_metrics()
+# ... run the workload
+for type_id, m in refcount.metrics_snapshot().items():
+    print(
+        type_id,
+        m.release.count,
+        m.release.total_ns,
+        m.release.quantile(0.99),
+        m.lifetime.quantile(0.5),
+    )
+```
+
+Durations are kept in histograms with power of two buckets, in fixed memory per type identifier.
+Lifetimes are measured from the creation to the release of the native resource, for handles created while metrics are enabled.
+Creation times are kept for a bounded number of live handles; handles created beyond that bound have no lifetime recorded.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Tuple
+
+from refcount.interop import LifecycleObserver, add_lifecycle_observer, remove_lifecycle_observer
+
+NUM_BUCKETS = 64
+"""Number of buckets of the histograms. Bucket `i > 0` counts durations in [2**(i-1), 2**i) nanoseconds; bucket 0 counts zero durations."""
+
+
+@dataclass
+class HistogramSnapshot:
+    """Dataclass with a copy of a histogram of durations in nanoseconds."""
+
+    count: int = 0
+    """Number of durations recorded."""
+    total_ns: int = 0
+    """Sum of the durations."""
+    min_ns: int = 0
+    """Shortest duration, 0 if none recorded."""
+    max_ns: int = 0
+    """Longest duration."""
+    buckets: List[int] = field(default_factory=lambda: [0] * NUM_BUCKETS)
+    """Number of durations per bucket, see `NUM_BUCKETS`."""
+
+    @property
+    def mean_ns(self) -> float:
+        """Mean duration, 0 if none recorded."""
+        return self.total_ns / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> int:
+        """Approximate quantile of the durations: the upper bound of the bucket it falls in, capped by the longest duration.
+
+        Args:
+            q (float): the probability, in [0, 1].
+
+        Returns:
+            int: the quantile in nanoseconds, 0 if no duration was recorded.
+        """
+        if self.count == 0:
+            return 0
+        rank = q * self.count
+        cumulated = 0
+        for i, n in enumerate(self.buckets):
+            cumulated += n
+            if n and cumulated >= rank:
+                return min((1 << i) - 1, self.max_ns) if i > 0 else 0
+        return self.max_ns
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "max_ns", "min_ns", "total_ns")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        self.buckets[min(ns.bit_length(), NUM_BUCKETS - 1)] += 1
+        if self.count == 0 or ns < self.min_ns:
+            self.min_ns = ns
+        self.max_ns = max(self.max_ns, ns)
+        self.count += 1
+        self.total_ns += ns
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self.count, self.total_ns, self.min_ns, self.max_ns, list(self.buckets))
+
+
+@dataclass
+class TypeMetrics:
+    """Dataclass with the metrics of the handles of a type identifier."""
+
+    release: HistogramSnapshot
+    """Time taken by native releases."""
+    lifetime: HistogramSnapshot
+    """Time from the creation of handles to the release of their native resource."""
+
+
+class MetricsCollector(LifecycleObserver):
+    """Records the time taken by native releases, and the lifetimes of handles, per type identifier."""
+
+    def __init__(self, track_lifetimes: bool = True, max_tracked_handles: int = 1 << 20) -> None:
+        """Records the time taken by native releases, and the lifetimes of handles, per type identifier.
+
+        Args:
+            track_lifetimes (bool, optional): record lifetimes, which needs the creation time of each live handle. Defaults to True.
+            max_tracked_handles (int, optional): maximum number of live handles whose creation time is kept. Defaults to 1048576.
+
+        Raises:
+            ValueError: if `max_tracked_handles` is negative.
+        """
+        if max_tracked_handles < 0:
+            raise ValueError(f"The maximum number of tracked handles must be positive, not {max_tracked_handles}")
+        self.track_lifetimes = track_lifetimes
+        self.max_tracked_handles = max_tracked_handles
+        self._lock = threading.Lock()
+        self._created: Dict[int, Tuple[int, Optional[str]]] = {}
+        self._untracked = 0
+        self._histograms: Dict[Optional[str], Tuple[_Histogram, _Histogram]] = {}
+
+    @property
+    def untracked_handles(self) -> int:
+        """Number of handles created without their creation time kept, as `max_tracked_handles` were already live."""
+        return self._untracked
+
+    def on_created(self, handle: Any) -> None:
+        """Record the creation time of a handle, unless the creation times of `max_tracked_handles` are already kept.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        if self.track_lifetimes:
+            created = self._created
+            if len(created) < self.max_tracked_handles:
+                created[handle._lifecycle_key()] = (perf_counter_ns(), handle._type_id)
+            else:
+                self._untracked += 1
+
+    def on_released(self, key: int, type_id: Optional[str], elapsed_ns: int) -> None:
+        """Record the time taken by a release, and the lifetime of the handle if its creation time was kept.
+
+        Args:
+            key (int): the lifecycle key of the wrapper.
+            type_id (Optional[str]): the type identifier of the wrapper.
+            elapsed_ns (int): time taken by the release in nanoseconds.
+        """
+        created = self._created.pop(key, None) if self.track_lifetimes else None
+        if created is not None and type_id is None:
+            type_id = created[1]
+        with self._lock:
+            histograms = self._histograms.get(type_id)
+            if histograms is None:
+                histograms = self._histograms[type_id] = (_Histogram(), _Histogram())
+            histograms[0].record(elapsed_ns)
+            if created is not None:
+                histograms[1].record(perf_counter_ns() - created[0])
+
+    def snapshot(self) -> Dict[Optional[str], TypeMetrics]:
+        """A copy of the metrics recorded so far.
+
+        Returns:
+            Dict[Optional[str], TypeMetrics]: the metrics per type identifier.
+        """
+        with self._lock:
+            return {
+                type_id: TypeMetrics(release.snapshot(), lifetime.snapshot())
+                for type_id, (release, lifetime) in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        """Clear the histograms. Creation times of live handles are kept."""
+        with self._lock:
+            self._histograms.clear()
+
+
+_collector: Optional[MetricsCollector] = None
+
+
+def enable_metrics(track_lifetimes: bool = True, max_tracked_handles: int = 1 << 20) -> MetricsCollector:
+    """Record the time taken by native releases, and the lifetimes of handles, from now on. Restarts if already enabled.
+
+    Args:
+        track_lifetimes (bool, optional): record lifetimes, which needs the creation time of each live handle. Defaults to True.
+        max_tracked_handles (int, optional): maximum number of live handles whose creation time is kept. Defaults to 1048576.
+
+    Returns:
+        MetricsCollector: the collector in use.
+    """
+    global _collector  # noqa: PLW0603
+    disable_metrics()
+    collector = MetricsCollector(track_lifetimes, max_tracked_handles)
+    _collector = collector
+    add_lifecycle_observer(collector)
+    return collector
+
+
+def disable_metrics() -> None:
+    """Stop recording metrics, and discard them."""
+    global _collector  # noqa: PLW0603
+    collector = _collector
+    if collector is not None:
+        remove_lifecycle_observer(collector)
+        _collector = None
+
+
+def metrics_snapshot() -> Dict[Optional[str], TypeMetrics]:
+    """A copy of the metrics recorded so far, per type identifier. Empty if metrics are not enabled.
+
+    Returns:
+        Dict[Optional[str], TypeMetrics]: the metrics per type identifier.
+    """
+    collector = _collector
+    return {} if collector is None else collector.snapshot()
@@ -0,0 +1,195 @@
+"""Registry of the live native handles, with counts and native bytes per type identifier.
+
+When native memory runs short, the registry tells which types of native objects are alive, and how many.
+
+```python
+from refcount.registry import enable_handle_registry, register_size_of
+
+registry = enable_handle_registry()
+register_size_of("SERIES_PTR", lambda ptr: native_lib.series_length(ptr) * 8)
+# ...
+for type_id, s in registry.stats().by_type.items():
+    print(type_id, s.count, s.bytes, s.peak_count, s.peak_bytes)
+```
+
+All `CffiNativeHandle` wrappers created while the registry is enabled are registered, and unregistered when their
+native resource is released or, for `FinalizerCffiNativeHandle`, when they are collected.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from refcount.interop import LifecycleObserver, add_lifecycle_observer, remove_lifecycle_observer
+
+SizeOfFunction = Callable[[Any], int]
+"""A function returning the number of native bytes used by the object a pointer points to."""
+
+
+@dataclass
+class LiveHandleStats:
+    """Dataclass with the counts of live handles and their native bytes."""
+
+    count: int = 0
+    """Number of live handles."""
+    bytes: int = 0
+    """Native bytes of the live handles, as reported by the size functions registered."""
+    peak_count: int = 0
+    """Highest number of live handles since the registry was enabled or reset."""
+    peak_bytes: int = 0
+    """Highest number of native bytes since the registry was enabled or reset."""
+
+
+@dataclass
+class RegistrySnapshot:
+    """Dataclass with a snapshot of the live handles, overall and per type identifier."""
+
+    total: LiveHandleStats
+    """Statistics for all handles."""
+    by_type: Dict[Optional[str], LiveHandleStats] = field(default_factory=dict)
+    """Statistics per type identifier."""
+
+
+class HandleRegistry(LifecycleObserver):
+    """Counts of the live native handles, and of their native bytes, per type identifier.
+
+    Registration and unregistration are constant time. Handles themselves are not referenced.
+    """
+
+    def __init__(self) -> None:
+        """Counts of the live native handles, and of their native bytes, per type identifier."""
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[Optional[str], int]] = {}
+        # per type identifier: count, bytes, peak count, peak bytes
+        self._counters: Dict[Optional[str], List[int]] = {}
+        self._total = [0, 0, 0, 0]
+        self._size_of: Dict[str, SizeOfFunction] = {}
+
+    def register_size_of(self, type_id: str, size_of: Optional[SizeOfFunction]) -> None:
+        """Register the function reporting the native bytes of objects of a type, for handles created from now on.
+
+        Args:
+            type_id (str): the type identifier of the handles.
+            size_of (Optional[SizeOfFunction]): a function taking the native pointer and returning a number of bytes, or None to unregister.
+        """
+        if size_of is None:
+            self._size_of.pop(type_id, None)
+        else:
+            self._size_of[type_id] = size_of
+
+    def on_created(self, handle: Any) -> None:
+        """Register a live handle.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+        """
+        key = handle._lifecycle_key()
+        type_id = handle._type_id
+        size_of = self._size_of.get(type_id)  # type: ignore[arg-type]
+        nbytes = size_of(handle._handle) if size_of is not None else 0
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                # a key reused by a new handle, the previous one having been collected without release
+                self._subtract(*previous)
+            self._entries[key] = (type_id, nbytes)
+            counters = self._counters.get(type_id)
+            if counters is None:
+                counters = self._counters[type_id] = [0, 0, 0, 0]
+            for c in (counters, self._total):
+                c[0] += 1
+                c[1] += nbytes
+                c[2] = max(c[2], c[0])
+                c[3] = max(c[3], c[1])
+
+    def on_released(self, key: int, type_id: Optional[str], elapsed_ns: int) -> None:  # noqa: ARG002
+        """Unregister a handle whose native resource has been released.
+
+        Args:
+            key (int): the lifecycle key of the wrapper.
+            type_id (Optional[str]): the type identifier of the wrapper.
+            elapsed_ns (int): time taken by the release in nanoseconds.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._subtract(*entry)
+
+    def _subtract(self, type_id: Optional[str], nbytes: int) -> None:
+        for c in (self._counters[type_id], self._total):
+            c[0] -= 1
+            c[1] -= nbytes
+
+    def stats(self) -> RegistrySnapshot:
+        """A snapshot of the counts of live handles and their native bytes, overall and per type identifier.
+
+        Returns:
+            RegistrySnapshot: the snapshot.
+        """
+        with self._lock:
+            return RegistrySnapshot(
+                total=LiveHandleStats(*self._total),
+                by_type={type_id: LiveHandleStats(*c) for type_id, c in self._counters.items()},
+            )
+
+    def reset_peaks(self) -> None:
+        """Reset the high-water marks to the current values."""
+        with self._lock:
+            for c in [self._total, *self._counters.values()]:
+                c[2] = c[0]
+                c[3] = c[1]
+
+
+_registry: Optional[HandleRegistry] = None
+_size_of: Dict[str, SizeOfFunction] = {}
+
+
+def register_size_of(type_id: str, size_of: Optional[SizeOfFunction]) -> None:
+    """Register the function reporting the native bytes of objects of a type, for the current and future registries.
+
+    Args:
+        type_id (str): the type identifier of the handles.
+        size_of (Optional[SizeOfFunction]): a function taking the native pointer and returning a number of bytes, or None to unregister.
+    """
+    if size_of is None:
+        _size_of.pop(type_id, None)
+    else:
+        _size_of[type_id] = size_of
+    registry = _registry
+    if registry is not None:
+        registry.register_size_of(type_id, size_of)
+
+
+def enable_handle_registry() -> HandleRegistry:
+    """Register live handles from now on. Does nothing if the registry is already enabled.
+
+    Returns:
+        HandleRegistry: the registry in use.
+    """
+    global _registry  # noqa: PLW0603
+    registry = _registry
+    if registry is None:
+        registry = HandleRegistry()
+        for type_id, size_of in _size_of.items():
+            registry.register_size_of(type_id, size_of)
+        _registry = registry
+        add_lifecycle_observer(registry)
+    return registry
+
+
+def disable_handle_registry() -> None:
+    """Stop registering live handles, and discard the registry."""
+    global _registry  # noqa: PLW0603
+    registry = _registry
+    if registry is not None:
+        remove_lifecycle_observer(registry)
+        _registry = None
+
+
+def handle_registry() -> Optional[HandleRegistry]:
+    """The registry of live handles, if enabled.
+
+    Returns:
+        Optional[HandleRegistry]: the registry, or None.
+    """
+    return _registry
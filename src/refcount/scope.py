@@ -0,0 +1,185 @@
+"""Handle scopes, releasing all the wrappers created within a block of code when it exits.
+
+Intermediate wrappers are otherwise released whenever the garbage collector gets round to them,
+so that the native memory in use may peak well above what a block of code needs at any one time.
+
+```python
+import refcount
+
+with refcount.scope() as s:
+    a = wrap_cffi_native_handle(
+        native_lib.create_a(), "A_PTR", native_lib.release
+    )
+    b = wrap_cffi_native_handle(
+        native_lib.derive_b(a.ptr), "B_PTR", native_lib.release
+    )
+    result = s.escape(b)
+# `a` is released here; `result` is not
+```
+
+Wrappers created by `wrap_cffi_native_handle` and `CffiWrapperFactory` inside the block, including in functions it calls,
+are tracked by the innermost scope of the current thread or asyncio task. On exit, the scope releases them in reverse order of creation.
+"""
+
+import threading
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import Any, List, Optional, Type
+
+from typing_extensions import Self
+
+from refcount import interop
+from refcount.interop import CffiNativeHandle
+
+_current_scope: ContextVar[Optional["HandleScope"]] = ContextVar("refcount_handle_scope", default=None)
+
+# Number of scopes open, in all threads. Creating wrappers is only slowed down while it is not zero.
+_num_open_scopes = 0
+_lock = threading.Lock()
+
+
+def _track(handle: Any) -> None:
+    scope = _current_scope.get()
+    # a scope closed from another context is still the current one in the context that entered it
+    while scope is not None and scope._closed:
+        scope = scope._parent
+    if scope is not None and isinstance(handle, CffiNativeHandle):
+        scope._handles.append(handle)
+
+
+class HandleScope:
+    """Tracks wrappers created within a block of code, and releases them when the block exits.
+
+    Scopes can be nested; wrappers are tracked by the innermost one.
+    """
+
+    def __init__(self) -> None:
+        """Tracks wrappers created within a block of code, and releases them when the block exits."""
+        self._handles: List[CffiNativeHandle] = []
+        self._parent: Optional[HandleScope] = None
+        self._token: Optional[Token] = None
+        self._closed = False
+
+    @property
+    def num_tracked(self) -> int:
+        """Number of references to wrappers this scope will release on exit."""
+        return len(self._handles)
+
+    @property
+    def closed(self) -> bool:
+        """Has this scope exited."""
+        return self._closed
+
+    def track(self, handle: CffiNativeHandle) -> CffiNativeHandle:
+        """Release a wrapper on exit of this scope, e.g. a wrapper created directly with its class constructor.
+
+        Args:
+            handle (CffiNativeHandle): the wrapper.
+
+        Raises:
+            RuntimeError: if this scope has already exited.
+
+        Returns:
+            CffiNativeHandle: the wrapper, for convenience.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot track a handle in a scope that has exited")
+        self._handles.append(handle)
+        return handle
+
+    def escape(self, handle: Any) -> Any:
+        """Do not release a wrapper on exit of this scope, typically because it is returned out of the block.
+
+        The wrapper is handed over to the enclosing scope, if any. Objects not tracked by this scope are returned unchanged.
+
+        Args:
+            handle (Any): the wrapper.
+
+        Returns:
+            Any: the wrapper, for convenience, e.g. `return s.escape(result)`.
+        """
+        n = len(self._handles)
+        self._handles = [h for h in self._handles if h is not handle]
+        parent = self._parent
+        if parent is not None and not parent._closed:
+            parent._handles.extend([handle] * (n - len(self._handles)))
+        return handle
+
+    def __enter__(self) -> Self:
+        global _num_open_scopes  # noqa: PLW0603
+        if self._closed or self._token is not None:
+            raise RuntimeError("A handle scope can only be entered once")
+        self._parent = _current_scope.get()
+        self._token = _current_scope.set(self)
+        with _lock:
+            _num_open_scopes += 1
+            interop._scope_tracker = _track
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # the exception raised in the block takes precedence over a failed release
+        try:
+            self.close()
+        except Exception as e:  # noqa: BLE001
+            add_note = getattr(exc_value, "add_note", None)  # Python 3.11 and later
+            if add_note is not None:
+                add_note(f"Releasing the wrappers of the handle scope also failed: {e!r}")
+
+    def close(self) -> None:
+        """Exit this scope, releasing the wrappers tracked in reverse order of creation. Does nothing if already closed.
+
+        Raises:
+            Exception: the first exception raised by the release of a wrapper, once all wrappers have been released.
+        """
+        global _num_open_scopes  # noqa: PLW0603
+        if self._closed or self._token is None:
+            return
+        self._closed = True
+        try:
+            _current_scope.reset(self._token)
+        except ValueError:
+            # closed from another context than the one that entered it, e.g. by another task
+            if _current_scope.get() is self:
+                _current_scope.set(self._parent)
+        with _lock:
+            _num_open_scopes -= 1
+            if _num_open_scopes == 0:
+                interop._scope_tracker = None
+        handles, self._handles = self._handles, []
+        error: Optional[Exception] = None
+        for h in reversed(handles):
+            if h._handle is None:
+                continue
+            try:
+                h.release()
+            except Exception as e:  # noqa: BLE001
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+
+def scope() -> HandleScope:
+    """A new handle scope, to use in a `with` statement: wrappers created in the block are released when it exits.
+
+    Returns:
+        HandleScope: the scope.
+    """
+    return HandleScope()
+
+
+def current_scope() -> Optional[HandleScope]:
+    """The innermost handle scope open in the current thread or asyncio task.
+
+    Returns:
+        Optional[HandleScope]: the scope, or None.
+    """
+    return _current_scope.get()
@@ -0,0 +1,171 @@
+"""A cache of encoded strings, for the `char*` arguments of native calls that get the same identifiers over and over.
+
+`wrap_as_pointer_handle` encodes `str` arguments to `bytes`, which cffi passes as `char*` without copy. Bindings passing
+the same series or library identifiers millions of times can keep the encoded strings instead:
+
+```python
+from refcount import strings
+
+strings.enable_string_cache(max_entries=4096)
+# the same wrapper, holding b"catchment_1", is returned for each call; no encoding
+native_lib.load_ensemble_dataset(
+    wrap_as_pointer_handle(library_id).ptr, wrap_as_pointer_handle(path).ptr
+)
+strings.disable_string_cache()
+```
+
+The cache is bounded by its number of entries and by the bytes of the encoded strings; the least recently used are
+evicted first. Native functions must not modify nor keep the `char*` they get, as the bytes are shared between calls.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from refcount import interop
+from refcount.interop import GenericWrapper
+
+
+@dataclass
+class StringCacheStatistics:
+    """Dataclass with the counters of a string cache."""
+
+    hits: int = 0
+    """Number of strings found in the cache."""
+    misses: int = 0
+    """Number of strings encoded."""
+    evictions: int = 0
+    """Number of entries evicted."""
+    entries: int = 0
+    """Number of strings in the cache."""
+    nbytes: int = 0
+    """Bytes of the encoded strings in the cache."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Proportion of the strings found in the cache, 0 if none were looked up."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class StringCache:
+    """Least recently used cache of `GenericWrapper` objects holding encoded strings, by string."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 1 << 20, encoding: str = "utf-8") -> None:
+        """Least recently used cache of `GenericWrapper` objects holding encoded strings, by string.
+
+        Args:
+            max_entries (int, optional): maximum number of strings kept. Defaults to 1024.
+            max_bytes (int, optional): maximum total size of the encoded strings kept; longer strings are encoded but not kept. Defaults to 1 MiB.
+            encoding (str, optional): the encoding of the strings. Defaults to "utf-8".
+
+        Raises:
+            ValueError: if `max_entries` or `max_bytes` is negative.
+        """
+        if max_entries < 0 or max_bytes < 0:
+            raise ValueError(f"The bounds of a string cache must be positive, not {max_entries} and {max_bytes}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.encoding = encoding
+        self._entries: OrderedDict[str, GenericWrapper] = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def wrap(self, s: str) -> GenericWrapper:
+        """The wrapper of the encoded string, from the cache if there, else encoded and added to the cache.
+
+        Args:
+            s (str): the string.
+
+        Returns:
+            GenericWrapper: a wrapper of the encoded `bytes`, to be passed as C `char*`.
+        """
+        with self._lock:
+            wrapper = self._entries.get(s)
+            if wrapper is not None:
+                self._hits += 1
+                self._entries.move_to_end(s)
+                return wrapper
+        # encode outside of the lock; another thread may add the same string meanwhile
+        wrapper = GenericWrapper(s.encode(self.encoding))
+        nbytes = len(wrapper._handle)
+        with self._lock:
+            self._misses += 1
+            if nbytes > self.max_bytes or self.max_entries == 0 or s in self._entries:
+                return wrapper
+            entries = self._entries
+            entries[s] = wrapper
+            self._nbytes += nbytes
+            while len(entries) > self.max_entries or self._nbytes > self.max_bytes:
+                _, evicted = entries.popitem(last=False)
+                self._nbytes -= len(evicted._handle)
+                self._evictions += 1
+        return wrapper
+
+    def clear(self) -> None:
+        """Remove all the strings from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def statistics(self) -> StringCacheStatistics:
+        """Counters of the cache since it was created.
+
+        Returns:
+            StringCacheStatistics: a copy of the counters.
+        """
+        with self._lock:
+            return StringCacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                nbytes=self._nbytes,
+            )
+
+
+_string_cache: Optional[StringCache] = None
+
+
+def enable_string_cache(max_entries: int = 1024, max_bytes: int = 1 << 20, encoding: str = "utf-8") -> StringCache:
+    """Have `wrap_as_pointer_handle` get encoded strings from a new cache, replacing the one in use if any.
+
+    Args:
+        max_entries (int, optional): maximum number of strings kept. Defaults to 1024.
+        max_bytes (int, optional): maximum total size of the encoded strings kept. Defaults to 1 MiB.
+        encoding (str, optional): the encoding of the strings. Defaults to "utf-8".
+
+    Returns:
+        StringCache: the cache in use.
+    """
+    global _string_cache  # noqa: PLW0603
+    cache = StringCache(max_entries, max_bytes, encoding)
+    _string_cache = cache
+    interop._pointer_handle_functions.register(str, cache.wrap)
+    return cache
+
+
+def disable_string_cache() -> Optional[StringCache]:
+    """Have `wrap_as_pointer_handle` encode strings on each call again.
+
+    Returns:
+        Optional[StringCache]: the cache that was in use, if any.
+    """
+    global _string_cache  # noqa: PLW0603
+    cache = _string_cache
+    _string_cache = None
+    interop._pointer_handle_functions.register(str, interop._encoded_string)
+    return cache
+
+
+def string_cache() -> Optional[StringCache]:
+    """The cache in use by `wrap_as_pointer_handle`, if any.
+
+    Returns:
+        Optional[StringCache]: the cache.
+    """
+    return _string_cache
@@ -0,0 +1,117 @@
+"""Tests for the thread-affine release of native resources."""
+
+import asyncio
+import threading
+
+from refcount.affinity import ThreadAffineCffiNativeHandle, current_release_owner, drain_pending_releases
+from tests.test_native_handle import Dog, ut_dll
+
+
+class ReleaseRecorder:
+    def __init__(self):
+        self.threads = []
+
+    def __call__(self, pointer):
+        self.threads.append(threading.current_thread())
+        ut_dll.release(pointer)
+
+
+def release_from_other_thread(handle):
+    t = threading.Thread(target=handle.release)
+    t.start()
+    t.join()
+
+
+def test_release_routed_to_owner_thread():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+    dog = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+    assert dog.owner is current_release_owner()
+    assert dog.owner.is_current()
+    release_from_other_thread(dog)
+    assert dog.disposed
+    assert dog.owner.pending == 1
+    assert (init_dog_count + 1) == Dog.num_native_instances()
+    assert drain_pending_releases() == 1
+    assert release.threads == [threading.current_thread()]
+    assert init_dog_count == Dog.num_native_instances()
+    # released straight away on the owning thread
+    dog = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+    dog.release()
+    assert init_dog_count == Dog.num_native_instances()
+    assert drain_pending_releases() == 0
+
+
+def test_pending_releases_drained_at_safe_points():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+    dog = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+    release_from_other_thread(dog)
+    assert (init_dog_count + 1) == Dog.num_native_instances()
+    # creating another handle is a safe point
+    other = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+    assert (init_dog_count + 1) == Dog.num_native_instances()
+    release_from_other_thread(other)
+    dog = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+    # and so is a release on the owner thread
+    dog.release()
+    assert init_dog_count == Dog.num_native_instances()
+    assert release.threads == [threading.current_thread()] * 3
+
+
+def test_release_routed_to_owner_event_loop():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+
+    async def main():
+        dog = ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release, "DOG_PTR")
+        assert dog.owner.loop is asyncio.get_running_loop()
+        await asyncio.get_running_loop().run_in_executor(None, dog.release)
+        assert dog.disposed
+        for _ in range(10):
+            if Dog.num_native_instances() == init_dog_count:
+                break
+            await asyncio.sleep(0)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(main())
+    assert init_dog_count == Dog.num_native_instances()
+    assert release.threads == [loop_thread]
+
+
+def test_release_when_owner_thread_terminated():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+    dogs = []
+    t = threading.Thread(target=lambda: dogs.append(ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release)))
+    t.start()
+    t.join()
+    dogs[0].release()
+    assert init_dog_count == Dog.num_native_instances()
+    assert release.threads == [threading.current_thread()]
+
+
+def test_releases_queued_before_owner_thread_terminated():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+    dogs = []
+    created = threading.Event()
+    finish = threading.Event()
+
+    def owner():
+        dogs.extend(ThreadAffineCffiNativeHandle(ut_dll.create_dog(), release) for _ in range(2))
+        created.set()
+        finish.wait()
+
+    t = threading.Thread(target=owner)
+    t.start()
+    created.wait()
+    dogs[0].release()
+    assert dogs[0].owner.pending == 1
+    finish.set()
+    t.join()
+    # the owner is gone: the queued release is run along with the new one
+    dogs[1].release()
+    assert dogs[1].owner.pending == 0
+    assert init_dog_count == Dog.num_native_instances()
+    assert release.threads == [threading.current_thread()] * 2
@@ -0,0 +1,77 @@
+"""Tests for the allocation tracing of native handles."""
+
+import pytest
+
+from refcount import alloctrace
+from refcount.interop import wrap_cffi_native_handle
+from tests.test_native_handle import ut_dll
+
+
+def create_dogs(n):
+    return [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(n)]
+
+
+def create_other_dogs(n):
+    return [wrap_cffi_native_handle(ut_dll.create_dog(), "OTHER_DOG_PTR", ut_dll.release) for _ in range(n)]
+
+
+def test_snapshots_group_surviving_handles_by_site():
+    assert not alloctrace.is_tracing()
+    with pytest.raises(RuntimeError):
+        alloctrace.take_snapshot()
+    tracer = alloctrace.start(max_frames=3)
+    try:
+        assert alloctrace.is_tracing()
+        before = alloctrace.take_snapshot()
+        dogs = create_dogs(5)
+        others = create_other_dogs(2)
+        for d in dogs[:3]:
+            d.release()
+        after = alloctrace.take_snapshot()
+        stats = sorted(after.statistics(), key=lambda s: s.type_id)
+        assert [(s.type_id, s.count) for s in stats] == [("DOG_PTR", 2), ("OTHER_DOG_PTR", 2)]
+        site = stats[0].traceback[0]
+        assert site.name == "<listcomp>" or site.name == "create_dogs"
+        assert site.filename == __file__
+        full = after.statistics("traceback")
+        assert all(1 <= len(s.traceback) <= 3 for s in full)
+        assert "create_dogs" in after.format_report(group_by="traceback")
+        diffs = after.compare_to(before)
+        assert sorted(d.count_diff for d in diffs) == [2, 2]
+        for d in [*dogs[3:], *others]:
+            d.release()
+        diffs = alloctrace.take_snapshot().compare_to(after)
+        assert sorted(d.count_diff for d in diffs) == [-2, -2]
+        assert all(d.count == 0 for d in diffs)
+        assert tracer.stats()["live"] == 0
+        with pytest.raises(ValueError):
+            after.statistics("filename")
+    finally:
+        alloctrace.stop()
+    assert not alloctrace.is_tracing()
+
+
+def test_sampling_and_memory_budget():
+    tracer = alloctrace.start(sample_rate=0.1)
+    try:
+        dogs = create_dogs(2000)
+        sampled = tracer.stats()["sampled"]
+        assert 100 < sampled < 300
+        assert sum(s.count for s in alloctrace.take_snapshot().statistics()) == sampled
+        for d in dogs:
+            d.release()
+    finally:
+        alloctrace.stop()
+    tracer = alloctrace.start(memory_limit=5000)
+    try:
+        dogs = create_dogs(100)
+        stats = tracer.stats()
+        assert stats["dropped"] > 0
+        assert stats["memory"] <= 5000
+        assert stats["sampled"] + stats["dropped"] == 100
+        for d in dogs:
+            d.release()
+    finally:
+        alloctrace.stop()
+    with pytest.raises(ValueError):
+        alloctrace.start(sample_rate=0.0)
@@ -0,0 +1,135 @@
+"""Tests for the views without copies of native arrays."""
+
+import gc
+
+import pytest
+
+from refcount.arrays import NativeArrayHandle, RowPointerMatrixHandle, StridedArrayHandle
+from tests.test_native_handle import ut_ffi
+
+np = pytest.importorskip("numpy")
+
+
+class NativeBuffer:
+    """Memory standing for a native array, with a release function recording its calls."""
+
+    def __init__(self, ctype, n):
+        self.memory = ut_ffi.new(f"{ctype}[{n}]")
+        self.pointer = ut_ffi.cast(f"{ctype}*", self.memory)
+        self.released = 0
+
+    def release(self, pointer):
+        assert pointer == self.pointer
+        self.released += 1
+
+
+def test_views_keep_native_memory_alive():
+    native = NativeBuffer("double", 6)
+    for i in range(6):
+        native.memory[i] = i * 1.5
+    h = NativeArrayHandle(native.pointer, 6, native.release)
+    assert h.shape == (6,)
+    assert h.dtype == "float64"
+    assert h.nbytes == 48
+    assert len(h) == 6
+    a = h.as_array()
+    assert a.tolist() == [0.0, 1.5, 3.0, 4.5, 6.0, 7.5]
+    # a view, not a copy
+    a[0] = 42.0
+    assert native.memory[0] == 42.0
+    view = a[2:4]
+    matrix = np.asarray(h).reshape(2, 3)
+    mv = memoryview(h.buffer()).cast("d")
+    assert mv[1] == 1.5
+    h.release()
+    assert native.released == 0
+    del a
+    gc.collect()
+    assert view.tolist() == [3.0, 4.5]
+    del view, matrix
+    gc.collect()
+    assert native.released == 0
+    del mv
+    gc.collect()
+    assert native.released == 1
+    assert h.disposed
+    with pytest.raises(RuntimeError):
+        h.as_array()
+
+
+def test_dtypes_and_shapes():
+    native = NativeBuffer("int", 6)
+    h = NativeArrayHandle(native.pointer, (2, 3), native.release)
+    assert h.dtype == "int32"
+    a = h.as_array(writeable=False)
+    assert a.shape == (2, 3)
+    assert a.dtype == np.int32
+    with pytest.raises(ValueError):
+        a[0, 0] = 1
+    assert np.asarray(h, dtype="float64").dtype == np.float64
+    del a
+    h.release()
+    assert native.released == 1
+    void_pointer = ut_ffi.cast("void*", native.pointer)
+    with pytest.raises(TypeError, match="specify the dtype"):
+        NativeArrayHandle(void_pointer, 6, None)
+    f = NativeArrayHandle(void_pointer, 3, None, dtype="float64")
+    assert f.as_array().shape == (3,)
+    with pytest.raises(ValueError):
+        NativeArrayHandle(native.pointer, (2, -1), None)
+
+
+def test_strided_blocks():
+    native = NativeBuffer("double", 6)
+    for i in range(6):
+        native.memory[i] = float(i)
+    # a 2x3 matrix in column major order
+    h = StridedArrayHandle(native.pointer, (2, 3), (8, 16), native.release)
+    assert h.nbytes == 48
+    a = h.as_array()
+    assert a.tolist() == [[0.0, 2.0, 4.0], [1.0, 3.0, 5.0]]
+    assert a.flags.f_contiguous
+    # every other element of the first row
+    every_other = StridedArrayHandle(native.pointer, (2,), (32,), None)
+    assert every_other.nbytes == 40
+    assert every_other.as_array().tolist() == [0.0, 4.0]
+    with pytest.raises(ValueError):
+        StridedArrayHandle(native.pointer, (2, 3), (8,), None)
+    h.release()
+    assert native.released == 0
+    del a
+    gc.collect()
+    assert native.released == 1
+
+
+def test_row_pointer_matrices():
+    row_memory = [ut_ffi.new("double[4]", [10.0 * r + c for c in range(4)]) for r in range(3)]
+    native = NativeBuffer("double*", 3)
+    for r, row in enumerate(row_memory):
+        native.memory[r] = row
+    native.pointer = ut_ffi.cast("double**", native.memory)
+    h = RowPointerMatrixHandle(native.pointer, 3, 4, native.release)
+    assert h.shape == (3, 4)
+    assert h.dtype == "float64"
+    copy = h.to_array()
+    assert copy.tolist() == [[0.0, 1.0, 2.0, 3.0], [10.0, 11.0, 12.0, 13.0], [20.0, 21.0, 22.0, 23.0]]
+    assert np.array_equal(np.asarray(h), copy)
+    rows = h.rows()
+    assert len(rows) == 3
+    last = rows[-1]
+    assert last.tolist() == [20.0, 21.0, 22.0, 23.0]
+    last[0] = -1.0
+    assert row_memory[2][0] == -1.0
+    assert [r[1] for r in rows[:2]] == [1.0, 11.0]
+    with pytest.raises(IndexError):
+        rows[3]
+    h.release()
+    assert native.released == 0
+    del rows
+    gc.collect()
+    assert native.released == 0
+    del last
+    gc.collect()
+    assert native.released == 1
+    with pytest.raises(TypeError):
+        RowPointerMatrixHandle(ut_ffi.cast("double*", row_memory[0]), 1, 4, None)
@@ -0,0 +1,130 @@
+"""Tests for the base reference counting classes."""
+
+import sys
+import threading
+
+import pytest
+
+from refcount.base import (
+    NativeHandle,
+    ReferenceCounter,
+    _enable_atomic_ref_counting_if_free_threaded,
+    atomic_ref_counting_enabled,
+    disable_atomic_ref_counting,
+    enable_atomic_ref_counting,
+)
+
+
+@pytest.fixture
+def atomic_counting():
+    was_enabled = atomic_ref_counting_enabled()
+    enable_atomic_ref_counting(stripes=5)
+    yield
+    if not was_enabled:
+        disable_atomic_ref_counting()
+
+
+def test_atomic_ref_counting_switch():
+    was_enabled = atomic_ref_counting_enabled()
+    enable_atomic_ref_counting()
+    assert atomic_ref_counting_enabled()
+    disable_atomic_ref_counting()
+    assert not atomic_ref_counting_enabled()
+    with pytest.raises(ValueError):
+        enable_atomic_ref_counting(stripes=0)
+    if was_enabled:
+        enable_atomic_ref_counting()
+
+
+def test_counting_modes_agree():
+    for atomic in [False, True]:
+        if atomic:
+            enable_atomic_ref_counting(stripes=1)
+        rc = ReferenceCounter()
+        rc.add_ref()
+        rc.add_ref()
+        rc.decrement_ref()
+        assert rc.reference_count == 2
+        assert not rc._decrement_and_test()
+        assert rc._decrement_and_test()
+        assert rc.reference_count == 0
+        disable_atomic_ref_counting()
+
+
+def test_concurrent_counting(atomic_counting):
+    counters = [ReferenceCounter() for _ in range(8)]
+    n_threads = 8
+    n_iter = 2000
+    barrier = threading.Barrier(n_threads)
+
+    def work():
+        barrier.wait()
+        for _ in range(n_iter):
+            for c in counters:
+                c.add_ref()
+            for c in counters:
+                c.decrement_ref()
+            for c in counters:
+                c.add_ref()
+
+    threads = [threading.Thread(target=work) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for c in counters:
+        assert c.reference_count == 1 + n_threads * n_iter
+
+
+def test_excess_decrements_agree():
+    # a resource that could not be released when the count got to zero is released on a later decrement
+    for atomic in [False, True]:
+        if atomic:
+            enable_atomic_ref_counting(stripes=1)
+        rc = ReferenceCounter()
+        assert rc._decrement_and_test()
+        assert rc._decrement_and_test()
+        assert rc.reference_count == -1
+        disable_atomic_ref_counting()
+
+
+def test_concurrent_release_claim(atomic_counting):
+    n_threads = 8
+    for _ in range(50):
+        h = NativeHandle()
+        barrier = threading.Barrier(n_threads)
+        claims = []
+
+        def work(h=h, barrier=barrier, claims=claims):
+            barrier.wait()
+            if h._decrement_and_test() and h._begin_release():
+                claims.append(1)
+
+        threads = [threading.Thread(target=work) for _ in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(claims) == 1
+        assert h.reference_count == 1 - n_threads
+        h._end_release()
+        assert h._begin_release()
+        h._end_release()
+
+
+def test_free_threaded_interpreter_enables_atomic_counting(monkeypatch):
+    was_enabled = atomic_ref_counting_enabled()
+    disable_atomic_ref_counting()
+    try:
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+        _enable_atomic_ref_counting_if_free_threaded()
+        assert not atomic_ref_counting_enabled()
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+        _enable_atomic_ref_counting_if_free_threaded()
+        assert atomic_ref_counting_enabled()
+        rc = ReferenceCounter()
+        assert rc._decrement_and_test()
+        assert rc._decrement_and_test()
+    finally:
+        if not was_enabled:
+            disable_atomic_ref_counting()
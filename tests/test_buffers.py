@@ -0,0 +1,96 @@
+"""Tests for the pools of reusable cffi buffers."""
+
+import threading
+
+import pytest
+
+from refcount.buffers import BufferPool, PooledBuffer, thread_buffer_pool
+from refcount.interop import GenericWrapper, unwrap_cffi_native_handle, unwrap_many, wrap_as_pointer_handle
+from refcount.marshalling import marshalled
+from tests.test_native_handle import ut_dll, ut_ffi
+
+
+def test_buffers_are_reused_and_zeroed():
+    pool = BufferPool(ut_ffi)
+    with pool.acquire("date_time_interop*") as date:
+        assert date.nbytes == ut_ffi.sizeof("date_time_interop")
+        ut_dll.create_date(date.ptr, 2024, 2, 29, 1, 2, 3)
+        assert ut_dll.test_date(date.ptr, 2024, 2, 29, 1, 2, 3)
+        first = date.ptr
+    with pool.acquire("date_time_interop*") as date:
+        assert date.ptr == first
+        assert date.ptr.year == 0
+        ut_dll.create_date(date.ptr, 2024, 2, 29, 1, 2, 3)
+    with pool.acquire("date_time_interop*", zero=False) as date:
+        assert date.ptr.year == 2024
+    stats = pool.statistics()
+    assert (stats.hits, stats.misses, stats.discarded) == (2, 1, 0)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert stats.pooled_buffers == 1
+    assert stats.pooled_bytes == ut_ffi.sizeof("date_time_interop")
+
+
+def test_array_size_classes():
+    pool = BufferPool(ut_ffi)
+    a = pool.acquire("double[]", 3)
+    assert a.length == 3
+    assert a.nbytes == 8 * 8
+    a.release()
+    b = pool.acquire("double[]", 5)
+    assert b is a
+    assert b.length == 5
+    c = pool.acquire("double[]", 9)
+    assert c.nbytes == 16 * 8
+    d = pool.acquire("int[]", 5)
+    assert d is not a
+    with pytest.raises(ValueError):
+        BufferPool(ut_ffi).release(b)
+    b.release()
+    with pytest.raises(ValueError):
+        b.release()
+    assert pool.statistics().misses == 3
+
+
+def test_bounded_footprint():
+    pool = BufferPool(ut_ffi, max_bytes=100)
+    buffers = [pool.acquire("double[]", 8) for _ in range(3)]
+    for b in buffers:
+        b.release()
+    stats = pool.statistics()
+    assert stats.pooled_buffers == 1
+    assert stats.pooled_bytes == 64
+    assert stats.discarded == 2
+    pool.clear()
+    assert pool.statistics().pooled_bytes == 0
+    with pytest.raises(ValueError):
+        BufferPool(ut_ffi, max_bytes=-1)
+
+
+def test_pooled_buffers_flow_into_native_calls():
+    pool = BufferPool(ut_ffi)
+    with pool.acquire("date_time_interop*") as date:
+        assert isinstance(date, GenericWrapper)
+        assert wrap_as_pointer_handle(date, True) is date
+        assert unwrap_cffi_native_handle(date, True) is date.ptr
+        assert unwrap_many([date, 1])[0] is date.ptr
+        create_date = marshalled(ut_dll.create_date, [""] + [None] * 6)
+        create_date(date, 2000, 1, 2, 3, 4, 5)
+        assert ut_dll.test_date(date.ptr, 2000, 1, 2, 3, 4, 5)
+    with pytest.raises(TypeError, match="neither a CffiNativeHandle nor a CFFI external pointer, nor bytes"):
+        wrap_as_pointer_handle(1.0, True)
+    # other generic wrappers are left as they were
+    plain = GenericWrapper(b"id")
+    assert unwrap_cffi_native_handle(plain) is plain
+    with pytest.raises(TypeError):
+        unwrap_cffi_native_handle(plain, True)
+
+
+def test_thread_buffer_pools():
+    pool = thread_buffer_pool(ut_ffi)
+    assert thread_buffer_pool(ut_ffi) is pool
+    others = []
+    t = threading.Thread(target=lambda: others.append(thread_buffer_pool(ut_ffi)))
+    t.start()
+    t.join()
+    assert others[0] is not pool
+    assert isinstance(pool.acquire("char**"), PooledBuffer)
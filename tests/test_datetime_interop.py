@@ -0,0 +1,113 @@
+"""Tests for the conversions of arrays of date_time_interop structs."""
+
+import datetime
+
+import pytest
+
+from tests.test_native_handle import ut_dll, ut_ffi
+
+np = pytest.importorskip("numpy")
+
+from refcount.arrays import NativeArrayHandle  # noqa: E402
+from refcount.datetime_interop import (  # noqa: E402
+    date_time_interop_dtype,
+    from_datetime64,
+    interval_interop_dtype,
+    regular_time_axis,
+    structured_view,
+    time_axis_to_structs,
+    to_datetime64,
+)
+
+
+def test_dtypes_match_native_layout():
+    assert date_time_interop_dtype().itemsize == ut_ffi.sizeof("date_time_interop")
+    assert interval_interop_dtype().itemsize == ut_ffi.sizeof("interval_interop")
+    assert interval_interop_dtype().fields["end"][1] == ut_ffi.offsetof("interval_interop", "end")
+
+
+def test_structured_view_of_native_structs():
+    n = 3
+    dates = ut_ffi.new(f"date_time_interop[{n}]")
+    for i in range(n):
+        ut_dll.create_date(dates + i, 2000 + i, 2, 29 - i, 23, 59, 58)
+    a = structured_view(dates, n, date_time_interop_dtype())
+    assert a["year"].tolist() == [2000, 2001, 2002]
+    assert a["day"].tolist() == [29, 28, 27]
+    assert to_datetime64(a).tolist() == [
+        datetime.datetime(2000, 2, 29, 23, 59, 58),
+        datetime.datetime(2001, 2, 28, 23, 59, 58),
+        datetime.datetime(2002, 2, 27, 23, 59, 58),
+    ]
+    # writing to the view writes to native memory
+    from_datetime64(np.array(["1969-12-31T01:02:03"], dtype="datetime64[s]"), a[1:2])
+    assert ut_dll.test_date(dates + 1, 1969, 12, 31, 1, 2, 3)
+    with pytest.raises(ValueError):
+        structured_view(dates, n, interval_interop_dtype())
+
+
+def test_native_array_handle_of_structs():
+    n = 4
+    dates = ut_ffi.new(f"date_time_interop[{n}]")
+    released = []
+    h = NativeArrayHandle(ut_ffi.cast("date_time_interop*", dates), n, released.append, dtype=date_time_interop_dtype())
+    values = regular_time_axis("2024-02-28T22:00", np.timedelta64(90, "m"), n)
+    from_datetime64(values, h.as_array())
+    assert ut_dll.test_date(dates + 3, 2024, 2, 29, 2, 30, 0)
+    assert (to_datetime64(h.as_array()) == values).all()
+    h.release()
+    assert len(released) == 1
+
+
+@pytest.mark.parametrize("start", ["1600-03-01T00:00:00", "1899-12-31T23:59:59", "1970-01-01", "2100-02-28T12:00"])
+def test_round_trip_matches_numpy_calendar(start):
+    n = 200_000  # spans several conversion chunks
+    values = np.datetime64(start, "s") + np.arange(n, dtype=np.int64) * np.timedelta64(3601 * 7, "s")
+    structs = from_datetime64(values)
+    expected = values[::997].astype(datetime.datetime)
+    sample = structs[::997]
+    assert [datetime.datetime(*(int(s[f]) for f in date_time_interop_dtype().names)) for s in sample] == list(expected)
+    assert (to_datetime64(structs) == values).all()
+
+
+@pytest.mark.parametrize(
+    "step",
+    [
+        np.timedelta64(1, "h"),
+        np.timedelta64(15, "m"),
+        np.timedelta64(1, "D"),
+        np.timedelta64(7, "D"),
+        np.timedelta64(7, "h"),
+        np.timedelta64(61, "s"),
+    ],
+)
+def test_time_axis_to_structs(step):
+    start = np.datetime64("2023-12-31T21:15:00")
+    n = 5000
+    expected = from_datetime64(regular_time_axis(start, step, n))
+    assert (time_axis_to_structs(start, step, n) == expected).all()
+    out = np.zeros(n, dtype=date_time_interop_dtype())
+    assert time_axis_to_structs(start, step, n, out) is out
+    assert (out == expected).all()
+    with pytest.raises(ValueError):
+        time_axis_to_structs(start, step, n - 1, out)
+
+
+def test_to_datetime64_regular():
+    values = regular_time_axis(datetime.datetime(2020, 1, 1), datetime.timedelta(hours=6), 1000)
+    structs = from_datetime64(values)
+    assert (to_datetime64(structs, regular=True) == values).all()
+    structs[-1]["hour"] += 1
+    with pytest.raises(ValueError):
+        to_datetime64(structs, regular=True)
+    assert len(to_datetime64(structs[:0], regular=True)) == 0
+
+
+def test_nat_rejected():
+    values = np.array(["2020-01-01T00:00", "NaT"], dtype="datetime64[m]")
+    with pytest.raises(ValueError, match="NaT"):
+        from_datetime64(values)
+    with pytest.raises(ValueError, match="NaT"):
+        time_axis_to_structs(np.datetime64("NaT"), np.timedelta64(1, "h"), 10)
+    with pytest.raises(ValueError, match="NaT"):
+        time_axis_to_structs(np.datetime64("2020-01-01"), np.timedelta64("NaT"), 10)
@@ -0,0 +1,154 @@
+"""Tests for the deferred release of native resources."""
+
+import gc
+import threading
+import time
+
+import pytest
+
+from refcount.deferred import (
+    DeferredReleaseQueue,
+    deferred_release_queue,
+    disable_deferred_release,
+    enable_deferred_release,
+    flush,
+)
+from refcount.interop import register_bulk_release, wrap_cffi_native_handle
+from tests.test_native_handle import Dog, ut_dll
+
+
+@pytest.fixture
+def deferred_release():
+    queue = enable_deferred_release(max_queue_depth=100, batch_size=10)
+    yield queue
+    disable_deferred_release()
+
+
+def test_deferred_release_worker(deferred_release):
+    init_dog_count = Dog.num_native_instances()
+    assert deferred_release_queue() is deferred_release
+    released_on = []
+    main_thread = threading.current_thread()
+
+    def release(pointer):
+        released_on.append(threading.current_thread())
+        ut_dll.release(pointer)
+
+    dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "dog", release) for _ in range(50)]
+    for dog in dogs:
+        dog.release()
+        # from the point of view of Python, the handle is disposed of straight away
+        assert dog.disposed
+    dogs = wrap_cffi_native_handle(ut_dll.create_dog(), "dog", release)
+    dogs = None
+    gc.collect()
+    assert flush(timeout=10)
+    assert init_dog_count == Dog.num_native_instances()
+    assert len(released_on) == 51
+    assert main_thread not in released_on
+    stats = deferred_release.stats()
+    assert stats["submitted"] == 51
+    assert stats["released"] == 51
+    assert stats["pending"] == 0
+    assert stats["errors"] == 0
+
+
+def test_deferred_release_coalesces_bulk_releases(deferred_release):
+    init_dog_count = Dog.num_native_instances()
+    bulk_calls = []
+
+    def bulk_release(pointers, n):
+        bulk_calls.append(n)
+        ut_dll.release_many(pointers, n)
+
+    released = []
+
+    def release_dog(pointer):
+        released.append(pointer)
+        ut_dll.release(pointer)
+
+    register_bulk_release("DOG_PTR", bulk_release, ut_dll.release)
+    try:
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(30)]
+        # same type id, another release function: released on its own
+        other_dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", release_dog) for _ in range(5)]
+        for dog in [*dogs, *other_dogs]:
+            dog.release()
+        assert flush(timeout=10)
+    finally:
+        register_bulk_release("DOG_PTR", None)
+    assert sum(bulk_calls) == 30
+    assert len(released) == 5
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_deferred_release_backpressure():
+    gate = threading.Event()
+    released = []
+
+    def slow_release(pointer):
+        gate.wait()
+        released.append(pointer)
+
+    queue = DeferredReleaseQueue(max_queue_depth=2, batch_size=1)
+    try:
+        submitter = threading.Thread(target=lambda: [queue.submit(slow_release, i) for i in range(5)])
+        submitter.start()
+        time.sleep(0.2)
+        # one item taken by the worker, the queue is full, the submitting thread is blocked
+        assert submitter.is_alive()
+        assert queue.pending == 3
+        assert not queue.flush(timeout=0.05)
+        gate.set()
+        submitter.join(timeout=10)
+        assert queue.flush(timeout=10)
+        assert released == [0, 1, 2, 3, 4]
+    finally:
+        gate.set()
+        queue.close()
+    assert queue.closed
+    # once closed, releases happen synchronously
+    queue.submit(released.append, 5)
+    assert released[-1] == 5
+
+
+def test_deferred_release_errors_raised_at_flush():
+    def failing_release(pointer):
+        raise ValueError("cannot release")
+
+    queue = DeferredReleaseQueue()
+    try:
+        queue.submit(failing_release, 1)
+        with pytest.raises(RuntimeError, match="1 deferred native release"):
+            queue.flush(timeout=10)
+        assert queue.flush(timeout=10)
+    finally:
+        queue.close()
+    with pytest.raises(ValueError):
+        DeferredReleaseQueue(max_queue_depth=0)
+    with pytest.raises(ValueError):
+        DeferredReleaseQueue(batch_size=0)
+
+
+def test_disable_deferred_release_drains_queue():
+    init_dog_count = Dog.num_native_instances()
+    gate = threading.Event()
+
+    def release(pointer):
+        gate.wait()
+        ut_dll.release(pointer)
+
+    queue = enable_deferred_release()
+    dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "dog", release) for _ in range(5)]
+    for dog in dogs:
+        dog.release()
+    gate.set()
+    disable_deferred_release()
+    assert queue.closed
+    assert deferred_release_queue() is None
+    assert flush()
+    assert init_dog_count == Dog.num_native_instances()
+    # synchronous release again
+    dog = wrap_cffi_native_handle(ut_dll.create_dog(), "dog", ut_dll.release)
+    dog.release()
+    assert init_dog_count == Dog.num_native_instances()
@@ -0,0 +1,72 @@
+"""Tests for the lifecycle event ring buffer and its Chrome trace export."""
+
+import gc
+import io
+import json
+
+import pytest
+
+from refcount import events
+from refcount.interop import FinalizerCffiNativeHandle, _ffi, wrap_cffi_native_handle
+from tests.test_native_handle import Dog, ut_dll
+
+
+def test_events_and_chrome_trace(tmp_path):
+    init_dog_count = Dog.num_native_instances()
+    with pytest.raises(ValueError):
+        events.EventRecorder(0)
+    recorder = events.start_recording(capacity=100)
+    try:
+        pointer = ut_dll.create_dog()
+        dog = wrap_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+        dog.add_ref()
+        dog.release()
+        dog.release()
+        finalized = FinalizerCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, "FINALIZED_DOG_PTR")
+        del finalized
+        gc.collect()
+    finally:
+        events.stop_recording()
+    # not recorded once stopped
+    wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release).release()
+    assert init_dog_count == Dog.num_native_instances()
+    recorded = recorder.events()
+    assert [e.event for e in recorded] == ["create", "add_ref", "release", "release", "dispose", "create", "dispose"]
+    assert [e.type_id for e in recorded[:5]] == ["DOG_PTR"] * 5
+    assert recorded[5].type_id == "FINALIZED_DOG_PTR"
+    assert recorded[6].type_id is None
+    address = int(_ffi.cast("uintptr_t", pointer))
+    assert [e.address for e in recorded[:5]] == [address] * 4 + [0]
+    assert len({e.key for e in recorded[:5]}) == 1
+    assert recorded[5].key == recorded[6].key
+    timestamps = [e.timestamp_ns for e in recorded]
+    assert timestamps == sorted(timestamps)
+
+    stream = io.StringIO()
+    assert events.export_chrome_trace(stream) == 7
+    trace = json.loads(stream.getvalue())["traceEvents"]
+    assert [e["ph"] for e in trace] == ["b", "n", "n", "n", "e", "b", "e"]
+    assert trace[0]["name"] == "DOG_PTR"
+    assert trace[0]["args"]["address"] == hex(address)
+    assert trace[0]["id"] == trace[4]["id"]
+    assert trace[6]["name"] == "handle"
+    path = tmp_path / "trace.json"
+    events.export_chrome_trace(str(path))
+    assert len(json.loads(path.read_text())["traceEvents"]) == 7
+
+
+def test_ring_buffer_keeps_latest_events():
+    recorder = events.start_recording(capacity=10)
+    try:
+        for _ in range(6):
+            wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release).release()
+    finally:
+        events.stop_recording()
+    assert recorder.num_recorded == 18
+    recorded = recorder.events()
+    assert len(recorded) == 10
+    assert [e.event for e in recorded[-3:]] == ["create", "release", "dispose"]
+    timestamps = [e.timestamp_ns for e in recorded]
+    assert timestamps == sorted(timestamps)
+    recorder.clear()
+    assert recorder.events() == []
@@ -0,0 +1,106 @@
+"""Tests for the marshalling of native function calls from declarative signatures."""
+
+import pytest
+
+from refcount.interop import (
+    CffiNativeHandle,
+    CffiWrapperFactory,
+    DeletableCffiNativeHandle,
+    register_unwrap_function,
+    wrap_cffi_native_handle,
+)
+from refcount.marshalling import marshalled, native_function
+from tests.test_native_handle import Dog, DogOwner, ut_dll, ut_ffi
+
+
+class Owner(DeletableCffiNativeHandle):
+    pass
+
+
+def test_marshalled_calls():
+    init_dog_count = Dog.num_native_instances()
+    init_owner_count = DogOwner.num_native_instances()
+    create_owner = marshalled(ut_dll.create_owner, ["DOG_PTR"], returns="DOG_OWNER_PTR", release_native=ut_dll.release)
+    get_dog_refcount = marshalled(ut_dll.get_dog_refcount, ["DOG_PTR"])
+    any_refcount = marshalled(ut_dll.get_dog_refcount, [""])
+    create_date = marshalled(ut_dll.create_date, [None] * 7)
+    # nothing to marshal: the native function itself
+    assert create_date is ut_dll.create_date
+    dog = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    owner = create_owner(dog)
+    assert isinstance(owner, CffiNativeHandle)
+    assert owner.type_id == "DOG_OWNER_PTR"
+    assert get_dog_refcount(dog) == 1
+    assert get_dog_refcount(dog.ptr) == 1
+    assert any_refcount(dog) == 1
+    with pytest.raises(
+        TypeError, match="with underlying type id 'DOG_PTR' but instead got one with type id 'DOG_OWNER_PTR'"
+    ):
+        get_dog_refcount(owner)
+    with pytest.raises(TypeError, match="of type '<class 'int'>'"):
+        get_dog_refcount(1)
+    with pytest.raises(TypeError):
+        any_refcount(1)
+    with pytest.raises(TypeError):
+        get_dog_refcount(dog, dog)
+    owner.release()
+    dog.release()
+    assert init_dog_count == Dog.num_native_instances()
+    assert init_owner_count == DogOwner.num_native_instances()
+
+
+def test_native_function_decorator():
+    init_dog_count = Dog.num_native_instances()
+    factory = CffiWrapperFactory({"DOG_OWNER_PTR": Owner}, strict_wrapping=True)
+
+    @native_function(ut_dll.create_owner, ["DOG_PTR"], "DOG_OWNER_PTR", ut_dll.release, factory)
+    def create_owner(dog):
+        """Create the owner of a dog."""
+
+    @native_function(ut_dll.create_date, [None, None, None, None, None, None, None])
+    def create_date(date, year, month, day, hour, minute, second):
+        """Fill a date."""
+
+    @native_function(ut_dll.test_date, [None] * 7)
+    def test_date(date, year, month, day, hour, minute, second):
+        """Check a date."""
+
+    assert create_owner.__name__ == "create_owner"
+    assert create_owner.__doc__ == "Create the owner of a dog."
+    assert create_date.__name__ == "create_date"
+    dog = Dog()
+    owner = create_owner(dog)
+    assert isinstance(owner, Owner)
+    owner.release()
+    dog.release()
+    date = ut_ffi.new("date_time_interop*")
+    create_date(date, 2000, 1, 2, 3, 4, 5)
+    assert test_date(date, 2000, 1, 2, 3, 4, 5)
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_marshalled_registered_unwrap_functions():
+    class Custom:
+        def __init__(self, ptr):
+            self.ptr = ptr
+
+    class CustomDog(DeletableCffiNativeHandle):
+        pass
+
+    get_dog_refcount = marshalled(ut_dll.get_dog_refcount, ["DOG_PTR"])
+    pointer = ut_dll.create_dog()
+    custom = Custom(pointer)
+    with pytest.raises(TypeError):
+        get_dog_refcount(custom)
+    register_unwrap_function(Custom, lambda c: c.ptr)
+    register_unwrap_function(CustomDog, lambda d: d._handle)
+    try:
+        # as unwrap_cffi_native_handle does, with the type identifier of handles checked
+        assert get_dog_refcount(custom) == 1
+        assert get_dog_refcount(CustomDog(pointer, None, "DOG_PTR")) == 1
+        with pytest.raises(TypeError, match="with underlying type id 'DOG_PTR'"):
+            get_dog_refcount(CustomDog(pointer, None, "DOG_OWNER_PTR"))
+    finally:
+        register_unwrap_function(Custom, None)
+        register_unwrap_function(CustomDog, None)
+    ut_dll.release(pointer)
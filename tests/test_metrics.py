@@ -0,0 +1,87 @@
+"""Tests for the release and lifetime metrics."""
+
+import gc
+import time
+
+import pytest
+
+import refcount
+from refcount.interop import FinalizerCffiNativeHandle, register_bulk_release, release_many, wrap_cffi_native_handle
+from refcount.metrics import HistogramSnapshot
+from tests.test_native_handle import Dog, ut_dll
+
+
+def slow_release(pointer):
+    time.sleep(0.002)
+    ut_dll.release(pointer)
+
+
+def test_metrics_per_type():
+    init_dog_count = Dog.num_native_instances()
+    assert refcount.metrics_snapshot() == {}
+    refcount.enable_metrics()
+    try:
+        slow = [wrap_cffi_native_handle(ut_dll.create_dog(), "SLOW_DOG_PTR", slow_release) for _ in range(3)]
+        fast = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(4)]
+        for d in slow:
+            d.release()
+        register_bulk_release("DOG_PTR", ut_dll.release_many, ut_dll.release)
+        try:
+            release_many(fast[:2])
+        finally:
+            register_bulk_release("DOG_PTR", None)
+        release_many(fast[2:])
+        metrics = refcount.metrics_snapshot()
+        slow_release_times = metrics["SLOW_DOG_PTR"].release
+        assert slow_release_times.count == 3
+        assert slow_release_times.min_ns >= 2_000_000
+        assert slow_release_times.quantile(0.5) >= 2_000_000
+        assert slow_release_times.mean_ns >= 2_000_000
+        assert metrics["SLOW_DOG_PTR"].lifetime.count == 3
+        assert metrics["SLOW_DOG_PTR"].lifetime.min_ns > 0
+        fast_release_times = metrics["DOG_PTR"].release
+        assert fast_release_times.count == 4
+        assert fast_release_times.quantile(0.99) < slow_release_times.quantile(0.01)
+        assert sum(fast_release_times.buckets) == 4
+        # handles released after their wrapper is collected
+        dog = FinalizerCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, "FINALIZED_DOG_PTR")
+        del dog
+        gc.collect()
+        assert refcount.metrics_snapshot()["FINALIZED_DOG_PTR"].lifetime.count == 1
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        refcount.disable_metrics()
+    assert refcount.metrics_snapshot() == {}
+
+
+def test_histogram_quantiles():
+    empty = HistogramSnapshot()
+    assert empty.quantile(0.5) == 0
+    assert empty.mean_ns == 0.0
+    h = HistogramSnapshot(count=4, total_ns=1000 + 3 * 3000, min_ns=1000, max_ns=3000)
+    h.buckets[(1000).bit_length()] = 1
+    h.buckets[(3000).bit_length()] = 3
+    assert h.quantile(0.25) == 1023
+    assert h.quantile(0.5) == 3000
+    assert h.quantile(1.0) == 3000
+
+
+def test_metrics_bounded_lifetime_tracking():
+    init_dog_count = Dog.num_native_instances()
+    collector = refcount.enable_metrics(max_tracked_handles=2)
+    try:
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(5)]
+        assert collector.untracked_handles == 3
+        for d in dogs:
+            d.release()
+        metrics = refcount.metrics_snapshot()["DOG_PTR"]
+        assert metrics.release.count == 5
+        assert metrics.lifetime.count == 2
+        # room is made by releases
+        wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release).release()
+        assert refcount.metrics_snapshot()["DOG_PTR"].lifetime.count == 3
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        refcount.disable_metrics()
+    with pytest.raises(ValueError):
+        refcount.enable_metrics(max_tracked_handles=-1)
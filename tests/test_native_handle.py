@@ -12,14 +12,31 @@ if TYPE_CHECKING:
     from refcount.interop import CffiData
 
 from refcount.interop import (
+    adopt_cffi_native_handle,
+    BorrowError,
     CffiNativeHandle,
     CffiWrapperFactory,
     DeletableCffiNativeHandle,
+    FinalizerCffiNativeHandle,
     GenericWrapper,
+    NativeCountedCffiNativeHandle,
     OwningCffiNativeHandle,
     cffi_arg_error_external_obj_type,
+    disable_borrow_debug,
+    disable_identity_map,
+    disable_native_count_tracking,
+    enable_borrow_debug,
+    enable_identity_map,
+    enable_native_count_tracking,
+    identity_map_stats,
     is_cffi_native_handle,
+    reconcile_native_counts,
+    register_bulk_release,
+    release_many,
+    register_unwrap_function,
+    set_release_dispatcher,
     unwrap_cffi_native_handle,
+    unwrap_many,
     wrap_as_pointer_handle,
     wrap_cffi_native_handle,
 )
@@ -86,6 +103,7 @@ ut_ffi.cdef("extern int num_dogs();")
 ut_ffi.cdef("extern int num_owners();")
 ut_ffi.cdef("extern void say_walk( void* owner);")
 ut_ffi.cdef("extern void release( void* obj);")
+ut_ffi.cdef("extern void release_many( void** objects, int n);")
 
 ut_ffi.cdef("extern void register_exception_callback(const void* callback);")
 ut_ffi.cdef("extern void trigger_callback();")
@@ -414,6 +432,44 @@ def test_wrapper_helper_functions():
     gc.collect()
 
 
+def test_unwrap_many():
+    pointer = ut_dll.create_dog()
+    dog = Dog(pointer)
+    x = datetime(2000, 1, 1, 1, 1)
+    assert unwrap_many([]) == ()
+    assert unwrap_many((dog, pointer, None, 3, x)) == (pointer, pointer, None, 3, x)
+    with pytest.raises(TypeError):
+        unwrap_many((dog, x), True)
+
+    class Handle:
+        def __init__(self, ptr):
+            self.ptr = ptr
+
+    class DerivedHandle(Handle):
+        pass
+
+    # types not known to the dispatch table, and their subclasses
+    handle, derived = Handle(pointer), DerivedHandle(pointer)
+    assert unwrap_many((handle, derived)) == (handle, derived)
+    register_unwrap_function(Handle, lambda h: h.ptr)
+    try:
+        assert unwrap_cffi_native_handle(derived, True) == pointer
+        assert unwrap_many((handle, derived, dog), True) == (pointer, pointer, pointer)
+    finally:
+        register_unwrap_function(Handle, None)
+    assert unwrap_cffi_native_handle(derived) is derived
+
+    class RedirectingDog(Dog):
+        def get_handle(self):
+            return pointer
+
+    redirecting = RedirectingDog(ut_ffi.NULL)
+    assert unwrap_many((redirecting,)) == (pointer,)
+    assert unwrap_cffi_native_handle(redirecting) == pointer
+    redirecting._handle = None
+    dog.release()
+
+
 def test_wrap_as_pointer_handle():
     pointer = ut_dll.create_dog()
     dog = wrap_cffi_native_handle(pointer, "dog", ut_dll.release)
@@ -598,6 +654,117 @@ def test_cffi_wrapper_factory_various_ctors():
     gc.collect()
 
 
+def test_cffi_wrapper_factory_caches_constructors(monkeypatch) -> None:
+    import refcount.interop
+
+    analysed = []
+    original_signature = refcount.interop.signature
+
+    def counting_signature(obj):
+        analysed.append(obj)
+        return original_signature(obj)
+
+    monkeypatch.setattr(refcount.interop, "signature", counting_signature)
+    _api_type_wrapper = {"CROC_PTR": CrocTwoParameters, "DOG_PTR": Dog}
+    wf = CffiWrapperFactory(_api_type_wrapper, True)
+    crocs = [wf.create_wrapper(ut_dll.create_croc(), "CROC_PTR", ut_dll.release) for _ in range(3)]
+    assert all(isinstance(c, CrocTwoParameters) for c in crocs)
+    assert analysed == [CrocTwoParameters]
+    # failures are cached too, and raised on every call
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            wf.create_wrapper(ut_dll.create_croc(), "CROC_PTR", release_native=None)
+    assert analysed == [CrocTwoParameters]
+    # mutating the mapping is taken into account
+    _api_type_wrapper["CROC_PTR"] = CrocThreeParameters
+    croc = wf.create_wrapper(ut_dll.create_croc(), "CROC_PTR", ut_dll.release)
+    assert isinstance(croc, CrocThreeParameters)
+    assert analysed == [CrocTwoParameters, CrocThreeParameters]
+    wf.invalidate()
+    wf.precompile()
+    assert sorted(analysed[2:], key=lambda x: x.__name__) == [CrocThreeParameters, Dog]
+    wf.create_wrapper(ut_dll.create_croc(), "CROC_PTR", ut_dll.release)
+    assert len(analysed) == 4
+    del crocs, croc
+    gc.collect()
+
+
+def test_cffi_wrapper_factory_cached_failures_raise_new_exceptions() -> None:
+    wf = CffiWrapperFactory({"CROC_PTR": CrocFourParametersWrongFourthParameter}, True)
+    pointer = ut_dll.create_croc()
+    errors = []
+    for _ in range(3):
+        with pytest.raises(TypeError, match="must be an integer") as info:
+            wf.create_wrapper(pointer, "CROC_PTR", ut_dll.release)
+        errors.append(info.value)
+    # a shared exception would accumulate the frames of every failed call in its traceback
+    assert len({id(e) for e in errors}) == 3
+    depths = []
+    for e in errors:
+        tb, depth = e.__traceback__, 0
+        while tb is not None:
+            tb, depth = tb.tb_next, depth + 1
+        depths.append(depth)
+    assert depths[0] == depths[1] == depths[2]
+    ut_dll.release(pointer)
+
+
+def test_cffi_wrapper_factory_create_wrappers() -> None:
+    init_dog_count = Dog.num_native_instances()
+    wf = CffiWrapperFactory({"DOG_PTR": Dog}, False)
+    pointers = ut_ffi.new("void*[]", [ut_dll.create_dog() for _ in range(5)])
+    dogs = wf.create_wrappers(pointers, 5, "DOG_PTR", ut_dll.release)
+    assert len(dogs) == 5
+    assert all(isinstance(d, Dog) for d in dogs)
+    assert [d.ptr for d in dogs] == list(pointers)
+    # type identifiers without a specific wrapper class
+    generic = wf.create_wrappers([ut_dll.create_dog()], 1, "THE_THING_PTR", ut_dll.release)
+    assert isinstance(generic[0], DeletableCffiNativeHandle)
+    assert wf.create_wrappers(pointers, 0, "DOG_PTR", ut_dll.release) == []
+    with pytest.raises(ValueError):
+        wf.create_wrappers(pointers, -1, "DOG_PTR", ut_dll.release)
+    with pytest.raises(ValueError):
+        CffiWrapperFactory({"DOG_PTR": Dog}, True).create_wrappers(pointers, 5, "THE_THING_PTR", ut_dll.release)
+    del dogs, generic
+    gc.collect()
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_cffi_wrapper_factory_create_wrappers_lazy() -> None:
+    init_dog_count = Dog.num_native_instances()
+    wf = CffiWrapperFactory({"DOG_PTR": Dog}, True)
+    pointers = ut_ffi.new("void*[]", [ut_dll.create_dog() for _ in range(6)])
+    dogs = wf.create_wrappers(pointers, 6, "DOG_PTR", ut_dll.release, lazy=True)
+    assert len(dogs) == 6
+    assert dogs.num_materialized == 0
+    first = dogs[0]
+    assert isinstance(first, Dog)
+    assert dogs[0] is first
+    assert dogs[-1] is dogs[5]
+    assert dogs[1:3] == [dogs[1], dogs[2]]
+    assert dogs.num_materialized == 4
+    with pytest.raises(IndexError):
+        dogs[6]
+    # the sequence releases the native objects never wrapped
+    dogs.dispose()
+    assert (init_dog_count + 4) == Dog.num_native_instances()
+    with pytest.raises(RuntimeError):
+        dogs[3]
+    assert dogs[5].ptr == pointers[5]
+    del dogs, first
+    gc.collect()
+    assert init_dog_count == Dog.num_native_instances()
+    # and does so as well when collected
+    pointers = ut_ffi.new("void*[]", [ut_dll.create_dog() for _ in range(3)])
+    dogs = wf.create_wrappers(pointers, 3, "DOG_PTR", ut_dll.release, lazy=True)
+    assert len(dogs.materialize()) == 3
+    assert dogs.num_materialized == 3
+    dogs = wf.create_wrappers(ut_ffi.new("void*[]", [ut_dll.create_dog()]), 1, "DOG_PTR", ut_dll.release, lazy=True)
+    del dogs
+    gc.collect()
+    assert init_dog_count == Dog.num_native_instances()
+
+
 def test_nativehandle_default_check_valid() -> None:
     # mostly added to increase UT coverage
     # locks in the behavior of the default implementation
@@ -614,6 +781,410 @@ def test_nativehandle_default_check_valid() -> None:
     gc.collect()
 
 
+def test_slotted_handles_layout() -> None:
+    import weakref
+
+    pointer = ut_dll.create_dog()
+    dog = wrap_cffi_native_handle(pointer, "dog", ut_dll.release)
+    assert not hasattr(dog, "__dict__")
+    with pytest.raises(AttributeError):
+        dog.some_new_attribute = 1
+    # handles must remain usable as weak reference targets
+    assert weakref.ref(dog)() is dog
+    o_wrapper = OwningCffiNativeHandle(ut_ffi.new("char[10]"))
+    assert not hasattr(o_wrapper, "__dict__")
+    assert not hasattr(GenericWrapper(b"foo"), "__dict__")
+    # subclasses that do not declare __slots__ still get an instance dictionary
+    croc = CrocOneParameters(ut_dll.create_croc())
+    croc.some_new_attribute = 1
+    assert croc.__dict__ == {"_release_native_handle": ut_dll.release, "some_new_attribute": 1}
+    croc = None
+    dog = None
+    gc.collect()
+
+
+def test_concurrent_release_atomic_counting() -> None:
+    import threading
+
+    from refcount.base import atomic_ref_counting_enabled, disable_atomic_ref_counting, enable_atomic_ref_counting
+
+    was_enabled = atomic_ref_counting_enabled()
+    enable_atomic_ref_counting()
+    released = []
+    n_threads = 8
+    init_dog_count = Dog.num_native_instances()
+    try:
+        for _ in range(20):
+            dog = wrap_cffi_native_handle(ut_dll.create_dog(), "dog", lambda p: released.append(ut_dll.release(p)))
+            for _ in range(n_threads - 1):
+                dog.add_ref()
+            barrier = threading.Barrier(n_threads)
+
+            def work(dog=dog, barrier=barrier):
+                barrier.wait()
+                dog.release()
+                dog.release()
+
+            threads = [threading.Thread(target=work) for _ in range(n_threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert dog.disposed
+        assert len(released) == 20
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        if not was_enabled:
+            disable_atomic_ref_counting()
+
+
+def test_release_retried_atomic_counting() -> None:
+    from refcount.base import atomic_ref_counting_enabled, disable_atomic_ref_counting, enable_atomic_ref_counting
+
+    was_enabled = atomic_ref_counting_enabled()
+    for atomic in [False, True]:
+        if atomic:
+            enable_atomic_ref_counting()
+        else:
+            disable_atomic_ref_counting()
+        init_dog_count = Dog.num_native_instances()
+        dog = DeletableCffiNativeHandle(ut_dll.create_dog(), None, "dog")
+        dog.release()
+        # no release function: nothing released, and the release is attempted again later on
+        assert not dog.disposed
+        dog._release_native = ut_dll.release
+        dog.release()
+        assert dog.disposed
+        assert init_dog_count == Dog.num_native_instances()
+    if was_enabled:
+        enable_atomic_ref_counting()
+    else:
+        disable_atomic_ref_counting()
+
+
+class CyclicFinalizerHandle(FinalizerCffiNativeHandle):
+    """A handle with an instance dictionary, to create reference cycles in tests."""
+
+
+def test_finalizer_handle_dispose() -> None:
+    init_dog_count = Dog.num_native_instances()
+    dog = FinalizerCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+    assert isinstance(dog, DeletableCffiNativeHandle)
+    assert dog.reference_count == 1
+    dog.add_ref()
+    dog.release()
+    assert not dog.disposed
+    assert (init_dog_count + 1) == Dog.num_native_instances()
+    dog.dispose()
+    assert dog.disposed
+    assert dog.reference_count == 0
+    assert init_dog_count == Dog.num_native_instances()
+    # neither a second dispose nor the collection of the wrapper release the native object again
+    dog.dispose()
+    dog = None
+    gc.collect()
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_finalizer_handle_collected_in_cycles() -> None:
+    init_dog_count = Dog.num_native_instances()
+    gc.disable()
+    try:
+        for _ in range(10):
+            a = CyclicFinalizerHandle(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+            b = CyclicFinalizerHandle(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+            a.peer = b
+            b.peer = a
+        a = b = None
+        assert (init_dog_count + 20) == Dog.num_native_instances()
+        gc.collect()
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        gc.enable()
+
+
+def test_finalizer_handle_honours_reference_count() -> None:
+    released = []
+    pointer = ut_dll.create_dog()
+    # some other party holds a reference, so collecting the wrapper must not release
+    dog = FinalizerCffiNativeHandle(pointer, released.append, "DOG_PTR", prior_ref_count=1)
+    assert dog.reference_count == 2
+    dog = None
+    gc.collect()
+    assert released == []
+    dog = FinalizerCffiNativeHandle(pointer, released.append, "DOG_PTR")
+    dog = None
+    gc.collect()
+    assert released == [pointer]
+    ut_dll.release(pointer)
+
+
+def test_release_many() -> None:
+    init_dog_count = Dog.num_native_instances()
+    bulk_calls = []
+
+    def bulk_release(pointers, n):
+        bulk_calls.append(n)
+        ut_dll.release_many(pointers, n)
+
+    register_bulk_release("DOG_PTR", bulk_release, ut_dll.release)
+    try:
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(10)]
+        dogs[0].add_ref()
+        # a class with a custom release is released on its own, even with a matching type id
+        custom_dog = Dog()
+        other_dog = wrap_cffi_native_handle(ut_dll.create_dog(), "OTHER_DOG_PTR", ut_dll.release)
+        assert (init_dog_count + 12) == Dog.num_native_instances()
+        # the duplicate must not lead to a double release
+        released = release_many([*dogs, dogs[1], custom_dog, other_dog])
+        assert released == 11
+        assert bulk_calls == [9]
+        assert (init_dog_count + 1) == Dog.num_native_instances()
+        assert not dogs[0].disposed
+        assert all(d.disposed for d in dogs[1:])
+        assert dogs[1].reference_count == 0
+        assert custom_dog.disposed
+        assert other_dog.disposed
+        assert release_many(dogs) == 1
+        assert bulk_calls == [9, 1]
+        assert init_dog_count == Dog.num_native_instances()
+        with pytest.raises(TypeError):
+            release_many([1])
+    finally:
+        register_bulk_release("DOG_PTR", None)
+    dog = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    assert release_many([dog]) == 1
+    assert bulk_calls == [9, 1]
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_release_many_bulk_pairing() -> None:
+    init_dog_count = Dog.num_native_instances()
+    bulk_calls = []
+    released = []
+
+    def bulk_release(pointers, n):
+        bulk_calls.append(n)
+        ut_dll.release_many(pointers, n)
+
+    def release_dog(pointer):
+        released.append(pointer)
+        ut_dll.release(pointer)
+
+    with pytest.raises(ValueError):
+        register_bulk_release("DOG_PTR", bulk_release)
+    register_bulk_release("DOG_PTR", bulk_release, ut_dll.release)
+    try:
+        # only handles released by the function the bulk release stands for are released in bulk
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(3)]
+        other = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", release_dog)
+        pointer = ut_dll.create_dog()
+        unowned = wrap_cffi_native_handle(pointer, "DOG_PTR", None)
+        assert release_many([*dogs, other, unowned]) == 4
+        assert bulk_calls == [3]
+        assert len(released) == 1
+        ut_dll.release(pointer)
+        # releases go through the dispatcher, one by one
+        dispatched = []
+
+        def dispatcher(release_native, handle, type_id):
+            dispatched.append(type_id)
+            release_native(handle)
+
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(3)]
+        previous = set_release_dispatcher(dispatcher)
+        try:
+            assert release_many(dogs) == 3
+        finally:
+            set_release_dispatcher(previous)
+        assert dispatched == ["DOG_PTR"] * 3
+        assert bulk_calls == [3]
+        assert init_dog_count == Dog.num_native_instances()
+
+        # handles of a failed bulk release are left as they were, and can be released again
+        def failing_bulk_release(pointers, n):
+            raise RuntimeError("bulk release failed")
+
+        register_bulk_release("DOG_PTR", failing_bulk_release, ut_dll.release)
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(3)]
+        other = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", release_dog)
+        with pytest.raises(RuntimeError, match="bulk release failed"):
+            release_many([*dogs, other])
+        assert other.disposed
+        assert not any(d.disposed for d in dogs)
+        assert all(d.reference_count == 1 for d in dogs)
+        register_bulk_release("DOG_PTR", None)
+        assert release_many(dogs) == 3
+    finally:
+        register_bulk_release("DOG_PTR", None)
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_identity_map() -> None:
+    init_dog_count = Dog.num_native_instances()
+    assert identity_map_stats() is None
+    pointer = ut_dll.create_dog()
+    assert wrap_cffi_native_handle(pointer, "DOG_PTR", None) is not wrap_cffi_native_handle(pointer, "DOG_PTR", None)
+    enable_identity_map()
+    try:
+        dog = wrap_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+        same_dog = wrap_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+        assert same_dog is dog
+        assert dog.reference_count == 2
+        # a distinct type identifier leads to a distinct wrapper
+        other = wrap_cffi_native_handle(pointer, "OTHER_DOG_PTR", None)
+        assert other is not dog
+        wf = CffiWrapperFactory({"DOG_PTR": None}, strict_wrapping=False)
+        assert wf.create_wrapper(pointer, "DOG_PTR", ut_dll.release) is dog
+        assert dog.reference_count == 3
+        stats = identity_map_stats()
+        assert (stats.hits, stats.misses, stats.size) == (2, 2, 2)
+        for _ in range(3):
+            dog.release()
+        assert init_dog_count == Dog.num_native_instances()
+        # a wrapper whose resource is released is not returned anymore
+        pointer = ut_dll.create_dog()
+        dog = wrap_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+        dog.release()
+        pointer = ut_dll.create_dog()
+        new_dog = wrap_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+        assert new_dog.reference_count == 1
+        # custom wrapper classes of a factory, eager and lazy array wrapping
+        wf = CffiWrapperFactory({"CROC_PTR": CrocFourParameters}, strict_wrapping=True)
+        croc_pointer = ut_dll.create_croc()
+        croc = wf.create_wrapper(croc_pointer, "CROC_PTR", ut_dll.release)
+        pointers = ut_ffi.new("void*[]", [croc_pointer, croc_pointer])
+        assert wf.create_wrappers(pointers, 2, "CROC_PTR", ut_dll.release) == [croc, croc]
+        assert wf.create_wrappers(pointers, 2, "CROC_PTR", ut_dll.release, lazy=True).materialize() == [croc, croc]
+        assert croc.reference_count == 5
+        for _ in range(4):
+            croc.release()
+        assert not croc.disposed
+        del new_dog, dog, same_dog, other
+        gc.collect()
+        assert init_dog_count == Dog.num_native_instances()
+        # wrappers are not kept alive by the map
+        assert identity_map_stats().size == 1
+        croc.release()
+        del croc
+        gc.collect()
+        assert identity_map_stats().size == 0
+    finally:
+        disable_identity_map()
+    assert identity_map_stats() is None
+
+
+def native_counted_dog(pointer: Any = None) -> NativeCountedCffiNativeHandle:
+    return NativeCountedCffiNativeHandle(
+        ut_dll.create_dog() if pointer is None else pointer,
+        ut_dll.add_dog_reference,
+        ut_dll.release,
+        ut_dll.get_dog_refcount,
+        "DOG_PTR",
+    )
+
+
+def test_native_counted_handle() -> None:
+    init_dog_count = Dog.num_native_instances()
+    dog = native_counted_dog()
+    pointer = dog.get_handle()
+    assert dog.reference_count == 1
+    dog.add_ref()
+    assert ut_dll.get_dog_refcount(pointer) == 2
+    assert dog.wrapper_ref_count == 2
+    # native code sharing the object
+    ut_dll.add_dog_reference(pointer)
+    assert dog.reference_count == 3
+    dog.release()
+    dog.release()
+    assert dog.disposed
+    assert dog.reference_count == 0
+    assert ut_dll.get_dog_refcount(pointer) == 1
+    # no native call on a pointer the wrapper no longer holds
+    with pytest.raises(RuntimeError, match="already been disposed of"):
+        dog.add_ref()
+    assert ut_dll.get_dog_refcount(pointer) == 1
+    assert dog.wrapper_ref_count == 0
+    # the wrapper must not release more references than it acquired
+    del dog
+    gc.collect()
+    assert ut_dll.get_dog_refcount(pointer) == 1
+    ut_dll.release(pointer)
+    assert init_dog_count == Dog.num_native_instances()
+    dog = native_counted_dog()
+    del dog
+    gc.collect()
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_native_counted_handle_cleared_during_release(monkeypatch) -> None:
+    init_dog_count = Dog.num_native_instances()
+    dog = native_counted_dog()
+    pointer = dog.get_handle()
+    dog.add_ref()
+    decrement_and_test = CffiNativeHandle._decrement_and_test
+
+    def racing_decrement_and_test(self):
+        last = decrement_and_test(self)
+        # another thread releases the last reference in the meantime
+        self._handle = None
+        return last
+
+    monkeypatch.setattr(CffiNativeHandle, "_decrement_and_test", racing_decrement_and_test)
+    dog.release()
+    monkeypatch.undo()
+    # the native reference was dropped on the pointer held before the decrement, not on None
+    assert ut_dll.get_dog_refcount(pointer) == 1
+    ut_dll.release(pointer)
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_identity_map_native_counted_handle() -> None:
+    init_dog_count = Dog.num_native_instances()
+    wf = CffiWrapperFactory({"DOG_PTR": native_counted_dog}, strict_wrapping=True)
+    enable_identity_map()
+    try:
+        pointer = ut_dll.create_dog()
+        dog = wf.create_wrapper(pointer, "DOG_PTR", ut_dll.release)
+        assert isinstance(dog, NativeCountedCffiNativeHandle)
+        # a native getter returning the same object with a new native reference
+        ut_dll.add_dog_reference(pointer)
+        assert wf.create_wrapper(pointer, "DOG_PTR", ut_dll.release) is dog
+        assert dog.reference_count == 2
+        assert dog.wrapper_ref_count == 2
+        dog.release()
+        dog.release()
+        assert dog.disposed
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        disable_identity_map()
+
+
+def test_reconcile_native_counts() -> None:
+    init_dog_count = Dog.num_native_instances()
+    assert reconcile_native_counts() == []
+    enable_native_count_tracking()
+    try:
+        dog = native_counted_dog()
+        pointer = dog.get_handle()
+        ut_dll.add_dog_reference(pointer)
+        other = native_counted_dog(pointer)
+        assert reconcile_native_counts() == []
+        ut_dll.add_dog_reference(pointer)
+        assert len(reconcile_native_counts(include_foreign_references=True)) == 1
+        ut_dll.remove_dog_reference(pointer)
+        ut_dll.remove_dog_reference(pointer)
+        (discrepancy,) = reconcile_native_counts()
+        assert (discrepancy.python_count, discrepancy.native_count, discrepancy.type_id) == (2, 1, "DOG_PTR")
+        ut_dll.add_dog_reference(pointer)
+        other.release()
+        dog.release()
+        assert reconcile_native_counts() == []
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        disable_native_count_tracking()
+
+
 def test_callback_via_cffi() -> None:
     # https://github.com/csiro-hydroinformatics/uchronia-time-series/issues/1
     global _message_from_c
@@ -622,5 +1193,79 @@ def test_callback_via_cffi() -> None:
     assert _message_from_c != b"<none>"
 
 
+def test_borrowed_views():
+    dog = Dog()
+    view = dog.borrow()
+    with pytest.raises(BorrowError):
+        view.ptr
+    with view as v:
+        assert v is view
+        assert dog.native_reference_count == 1
+        for _ in range(3):
+            assert ut_dll.get_dog_refcount(v.ptr) == 1
+        assert dog.reference_count == 1
+    with pytest.raises(BorrowError, match="only valid inside its 'with' block"):
+        view.ptr
+    with pytest.raises(AttributeError):
+        view.other
+    enable_borrow_debug()
+    try:
+        with dog.borrow() as escaped:
+            pass
+        with pytest.raises(BorrowError, match="test_native_handle.py"):
+            escaped.ptr
+        # an exception raised in the block is not masked
+        other_dog = Dog()
+        with pytest.raises(ValueError, match="in the block"):
+            with other_dog.borrow():
+                other_dog.release()
+                raise ValueError("in the block")
+        with pytest.raises(BorrowError, match="disposed of while borrowed"):
+            with dog.borrow():
+                dog.release()
+    finally:
+        disable_borrow_debug()
+    with pytest.raises(BorrowError, match="already been disposed of"):
+        with dog.borrow():
+            pass
+
+
+def test_detach_and_adopt():
+    init_dog_count = Dog.num_native_instances()
+    dog = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    dog.add_ref()
+    with pytest.raises(RuntimeError, match="holds 2 references"):
+        dog.detach()
+    dog.release()
+    pointer = dog.detach()
+    assert dog.disposed
+    assert dog.reference_count == 0
+    with pytest.raises(RuntimeError, match="already been disposed of"):
+        dog.detach()
+    dog.release()
+    del dog
+    gc.collect()
+    assert Dog.num_native_instances() == init_dog_count + 1
+    adopted = adopt_cffi_native_handle(pointer, "DOG_PTR", ut_dll.release)
+    assert adopted.reference_count == 1
+    assert ut_dll.get_dog_refcount(adopted.ptr) == 1
+    with pytest.raises(TypeError):
+        adopt_cffi_native_handle(1, "DOG_PTR", ut_dll.release)
+    with pytest.raises(ValueError):
+        adopt_cffi_native_handle(ut_ffi.NULL, "DOG_PTR", ut_dll.release)
+    factory = CffiWrapperFactory({"DOG_PTR": FinalizerCffiNativeHandle}, strict_wrapping=True)
+    finalized = factory.adopt(adopted.detach(), "DOG_PTR", ut_dll.release)
+    assert isinstance(finalized, FinalizerCffiNativeHandle)
+    # a detached finalizer handle releases nothing when collected
+    pointer = finalized.detach()
+    del finalized
+    gc.collect()
+    assert Dog.num_native_instances() == init_dog_count + 1
+    with pytest.raises(TypeError):
+        factory.adopt(None, "DOG_PTR", ut_dll.release)
+    factory.adopt(pointer, "DOG_PTR", ut_dll.release).release()
+    assert Dog.num_native_instances() == init_dog_count
+
+
 if __name__ == "__main__":
     test_callback_via_cffi()
@@ -117,6 +117,12 @@ void release(TEST_COUNTED_PTR obj)
 	if (refCount <= 0) delete obj;
 }
 
+void release_many(TEST_COUNTED_PTR* objects, int n)
+{
+	for (int i = 0; i < n; i++)
+		release(objects[i]);
+}
+
 int num_dogs()
 {
 	return testnative::dog::num_dogs;
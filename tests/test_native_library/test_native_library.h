@@ -77,6 +77,7 @@ extern "C" {
 
 	TESTLIB_API void say_walk(TEST_OWNER_PTR owner);
 	TESTLIB_API void release(TEST_COUNTED_PTR obj);
+	TESTLIB_API void release_many(TEST_COUNTED_PTR* objects, int n);
 
 	TESTLIB_API void register_exception_callback(const void* callback);
 	TESTLIB_API void trigger_callback();
@@ -0,0 +1,63 @@
+"""Tests for the registry of live handles."""
+
+import gc
+
+from refcount.interop import FinalizerCffiNativeHandle, register_bulk_release, release_many, wrap_cffi_native_handle
+from refcount.registry import disable_handle_registry, enable_handle_registry, handle_registry, register_size_of
+from tests.test_native_handle import Dog, DogOwner, ut_dll
+
+
+def test_registry_counts_and_bytes():
+    init_dog_count = Dog.num_native_instances()
+    assert handle_registry() is None
+    before = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+    register_size_of("DOG_PTR", lambda ptr: 100)
+    registry = enable_handle_registry()
+    try:
+        assert enable_handle_registry() is registry
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release) for _ in range(3)]
+        owner = DogOwner(Dog())
+        stats = registry.stats()
+        assert (stats.total.count, stats.total.bytes) == (5, 400)
+        dog_stats = stats.by_type["DOG_PTR"]
+        assert (dog_stats.count, dog_stats.bytes, dog_stats.peak_count) == (4, 400, 4)
+        assert stats.by_type["DOG_OWNER_PTR"].count == 1
+        dogs[0].add_ref()
+        dogs[0].release()
+        assert registry.stats().by_type["DOG_PTR"].count == 4
+        dogs[0].release()
+        before.release()
+        owner.release()
+        stats = registry.stats()
+        assert (stats.total.count, stats.total.peak_count) == (3, 5)
+        assert (stats.by_type["DOG_PTR"].count, stats.by_type["DOG_PTR"].bytes) == (3, 300)
+        registry.reset_peaks()
+        assert registry.stats().total.peak_count == 3
+        register_bulk_release("DOG_PTR", ut_dll.release_many, ut_dll.release)
+        try:
+            release_many(dogs)
+        finally:
+            register_bulk_release("DOG_PTR", None)
+        owner.dog.release()
+        stats = registry.stats()
+        assert (stats.total.count, stats.total.bytes, stats.by_type["DOG_PTR"].peak_bytes) == (0, 0, 300)
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        disable_handle_registry()
+        register_size_of("DOG_PTR", None)
+    assert handle_registry() is None
+
+
+def test_registry_finalizer_handles():
+    registry = enable_handle_registry()
+    try:
+        dog = FinalizerCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+        other = FinalizerCffiNativeHandle(ut_dll.create_dog(), ut_dll.release, "DOG_PTR")
+        assert registry.stats().total.count == 2
+        other.release()
+        assert registry.stats().total.count == 1
+        del dog, other
+        gc.collect()
+        assert registry.stats().total.count == 0
+    finally:
+        disable_handle_registry()
@@ -0,0 +1,170 @@
+"""Tests for handle scopes."""
+
+import asyncio
+import contextvars
+import sys
+
+import pytest
+
+import refcount
+from refcount import interop
+from refcount.interop import CffiWrapperFactory, disable_identity_map, enable_identity_map, wrap_cffi_native_handle
+from refcount.scope import current_scope
+from tests.test_native_handle import CrocFourParameters, Dog, ut_dll
+
+
+class ReleaseRecorder:
+    def __init__(self):
+        self.released = []
+
+    def __call__(self, pointer):
+        self.released.append(pointer)
+        ut_dll.release(pointer)
+
+
+def test_scope_releases_in_reverse_order():
+    init_dog_count = Dog.num_native_instances()
+    release = ReleaseRecorder()
+    assert interop._scope_tracker is None
+    with refcount.scope() as s:
+        assert current_scope() is s
+        dogs = [wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", release) for _ in range(3)]
+        pointers = [d.get_handle() for d in dogs]
+        shared = dogs[0]
+        shared.add_ref()
+        kept = s.escape(dogs[2])
+        assert s.num_tracked == 2
+        assert (init_dog_count + 3) == Dog.num_native_instances()
+    assert current_scope() is None
+    assert s.closed
+    assert interop._scope_tracker is None
+    assert release.released == [pointers[1]]
+    assert shared.reference_count == 1
+    shared.release()
+    assert not kept.disposed
+    kept.release()
+    assert init_dog_count == Dog.num_native_instances()
+    with pytest.raises(RuntimeError):
+        s.track(kept)
+
+
+def test_scope_release_error_does_not_mask_block_error():
+    init_dog_count = Dog.num_native_instances()
+
+    def failing_release(pointer):
+        ut_dll.release(pointer)
+        raise OSError("release failed")
+
+    with pytest.raises(KeyError) as info:
+        with refcount.scope():
+            wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", failing_release)
+            raise KeyError("in the block")
+    if sys.version_info >= (3, 11):
+        assert "release failed" in info.value.__notes__[0]
+    assert current_scope() is None
+    assert init_dog_count == Dog.num_native_instances()
+    # without an exception in the block, the release error is raised
+    with pytest.raises(OSError, match="release failed"):
+        with refcount.scope():
+            wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", failing_release)
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_scope_tracks_factory_wrappers():
+    init_dog_count = Dog.num_native_instances()
+    wf = CffiWrapperFactory({"CROC_PTR": CrocFourParameters, "DOG_PTR": None})
+    with refcount.scope() as s:
+        croc = wf.create_wrapper(ut_dll.create_croc(), "CROC_PTR", ut_dll.release)
+        dog = wf.create_wrapper(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+        pointers = interop._ffi.new("void*[]", [ut_dll.create_dog() for _ in range(2)])
+        dogs = wf.create_wrappers(pointers, 2, "DOG_PTR", ut_dll.release)
+        lazy_pointers = interop._ffi.new("void*[]", [ut_dll.create_dog() for _ in range(2)])
+        lazy = wf.create_wrappers(lazy_pointers, 2, "DOG_PTR", ut_dll.release, lazy=True)
+        first = lazy[0]
+        assert s.num_tracked == 5
+    assert croc.disposed
+    assert dog.disposed
+    assert all(d.disposed for d in dogs)
+    assert first.disposed
+    assert (init_dog_count + 1) == Dog.num_native_instances()
+    lazy.dispose()
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_lazy_wrappers_resolved_on_access():
+    init_dog_count = Dog.num_native_instances()
+    wf = CffiWrapperFactory({"CROC_PTR": CrocFourParameters}, strict_wrapping=True)
+    pointer = ut_dll.create_croc()
+    lazy = wf.create_wrappers(
+        interop._ffi.new("void*[]", [pointer, ut_dll.create_croc()]), 2, "CROC_PTR", ut_dll.release, lazy=True
+    )
+    # the identity map and the scope active on access apply, not those at the creation of the sequence
+    enable_identity_map()
+    try:
+        croc = wf.create_wrapper(pointer, "CROC_PTR", ut_dll.release)
+        with refcount.scope() as s:
+            assert lazy[0] is croc
+            second = lazy[1]
+            assert s.num_tracked == 2
+        assert croc.reference_count == 1
+        assert second.disposed
+        croc.release()
+    finally:
+        disable_identity_map()
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_nested_scopes_and_identity_map():
+    init_dog_count = Dog.num_native_instances()
+    enable_identity_map()
+    try:
+        with refcount.scope() as outer:
+            dog = wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+            with refcount.scope() as inner:
+                same_dog = wrap_cffi_native_handle(dog.get_handle(), "DOG_PTR", ut_dll.release)
+                assert same_dog is dog
+                assert dog.reference_count == 2
+                returned = inner.escape(wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release))
+                assert current_scope() is inner
+            assert dog.reference_count == 1
+            assert not returned.disposed
+            assert outer.num_tracked == 2
+        assert dog.disposed
+        assert returned.disposed
+        assert init_dog_count == Dog.num_native_instances()
+    finally:
+        disable_identity_map()
+
+
+def test_scope_per_task():
+    init_dog_count = Dog.num_native_instances()
+
+    async def handler(n):
+        with refcount.scope() as s:
+            for _ in range(n):
+                wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+                await asyncio.sleep(0)
+            return s.num_tracked
+
+    async def main():
+        return await asyncio.gather(handler(2), handler(3))
+
+    assert asyncio.run(main()) == [2, 3]
+    assert init_dog_count == Dog.num_native_instances()
+
+
+def test_scope_closed_from_another_context():
+    init_dog_count = Dog.num_native_instances()
+    with refcount.scope() as outer:
+        s = refcount.scope()
+        s.__enter__()
+        wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+        other = contextvars.copy_context()
+        other.run(s.close)
+        assert s.closed
+        assert other.run(current_scope) is outer
+        assert init_dog_count == Dog.num_native_instances()
+        # still current in this context, but closed: wrappers go to the enclosing scope
+        wrap_cffi_native_handle(ut_dll.create_dog(), "DOG_PTR", ut_dll.release)
+        assert outer.num_tracked == 1
+    assert init_dog_count == Dog.num_native_instances()
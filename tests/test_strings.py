@@ -0,0 +1,84 @@
+"""Tests for the cache of encoded strings."""
+
+import threading
+
+import pytest
+
+from refcount import strings
+from refcount.interop import GenericWrapper, wrap_as_pointer_handle
+from refcount.strings import StringCache, disable_string_cache, enable_string_cache, string_cache
+
+
+@pytest.fixture(autouse=True)
+def no_string_cache():
+    yield
+    disable_string_cache()
+
+
+def test_strings_are_wrapped_as_char_pointers():
+    w = wrap_as_pointer_handle("Ünïcode", True)
+    assert isinstance(w, GenericWrapper)
+    assert w.ptr == "Ünïcode".encode()
+    # encoded on each call, without the cache
+    assert wrap_as_pointer_handle("Ünïcode", True) is not w
+    with pytest.raises(TypeError, match="neither a CffiNativeHandle nor a CFFI external pointer, nor bytes, nor str"):
+        wrap_as_pointer_handle(1.0, True)
+
+
+def test_enable_disable_string_cache():
+    assert string_cache() is None
+    cache = enable_string_cache(max_entries=10)
+    assert string_cache() is cache
+    w = wrap_as_pointer_handle("library_id")
+    assert w.ptr == b"library_id"
+    assert wrap_as_pointer_handle("library_id") is w
+    stats = cache.statistics()
+    assert (stats.hits, stats.misses, stats.entries, stats.nbytes) == (1, 1, 1, 10)
+    assert stats.hit_rate == 0.5
+    assert disable_string_cache() is cache
+    assert strings.string_cache() is None
+    assert wrap_as_pointer_handle("library_id") is not w
+
+
+def test_least_recently_used_eviction():
+    cache = StringCache(max_entries=2, max_bytes=10)
+    a = cache.wrap("a")
+    b = cache.wrap("b")
+    assert cache.wrap("a") is a
+    cache.wrap("c")  # evicts "b", the least recently used
+    assert cache.wrap("a") is a
+    assert cache.wrap("b") is not b
+    assert cache.statistics().evictions == 2
+    # bounded by bytes too
+    cache.wrap("0123456789")
+    stats = cache.statistics()
+    assert (stats.entries, stats.nbytes) == (1, 10)
+    # strings longer than the bound are encoded, not kept
+    long_id = "x" * 11
+    assert cache.wrap(long_id).ptr == long_id.encode()
+    assert cache.statistics().entries == 1
+    cache.clear()
+    assert cache.statistics().nbytes == 0
+    assert StringCache(encoding="utf-16-le").wrap("id").ptr == b"i\x00d\x00"
+    with pytest.raises(ValueError):
+        StringCache(max_entries=-1)
+
+
+def test_concurrent_lookups_counted():
+    cache = StringCache(max_entries=4)
+    identifiers = [f"id_{i}" for i in range(8)]
+    n = 2000
+
+    def lookups():
+        for i in range(n):
+            s = identifiers[i % len(identifiers)]
+            assert cache.wrap(s).ptr == s.encode()
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.statistics()
+    assert stats.hits + stats.misses == 4 * n
+    assert stats.entries <= 4